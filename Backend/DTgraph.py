@@ -4,6 +4,7 @@ import os
 from datetime import datetime, timedelta
 from PyQt5.QtWidgets import QComboBox, QVBoxLayout, QWidget, QPushButton, QHBoxLayout, QLabel
 from PyQt5.QtCore import Qt
+from Backend.distance_rollups import HOURLY, DAILY, HOUR_FORMAT, DAY_FORMAT, get_rollups
 
 class DTGraphEmbed(QWidget):
     def __init__(self, profile: dict):
@@ -92,37 +93,26 @@ class DTGraphEmbed(QWidget):
         else:
             max_days_ago = 1  # Default to 1 day
         
-        # Temporary storage for aggregating data by day
-        daily_data = {}  # date -> total distance
-            
-        for entry in self.profile["session_total_distance"]:
-            date_info = datetime.strptime(entry["timestamp"], "%Y-%m-%d %H:%M:%S")
-            
-            if time_frame == "24 hours":
-                # For 24-hour view, check if the timestamp is within the last 24 hours
-                if date_info >= time_threshold:
-                    # Store the full datetime object for 24-hour view
+        # Distances are already totaled per hour and per day, so only the buckets are read here
+        rollups = get_rollups(self.profile)
+
+        if time_frame == "24 hours":
+            # For 24-hour view, one bar per hour that overlaps the last 24 hours
+            for hour, total_distance in rollups[HOURLY].items():
+                hour_start = datetime.strptime(hour, HOUR_FORMAT)
+                if hour_start + timedelta(hours=1) > time_threshold:
                     # Use hours as the x value for sorting
-                    hours_ago = (current_datetime - date_info).total_seconds() / 3600.0
-                    data_points.append((hours_ago, entry["total_distance"], date_info))
-            else:
-                # For week and month views, aggregate by day
-                date_info_date = date_info.date()
-                date_diff = (current_date - date_info_date).days
-                
+                    hours_ago = (current_datetime - hour_start).total_seconds() / 3600.0
+                    data_points.append((hours_ago, total_distance, hour_start))
+        else:
+            # For week and month views, one bar per day
+            for day, total_distance in rollups[DAILY].items():
+                date = datetime.strptime(day, DAY_FORMAT).date()
+                date_diff = (current_date - date).days
+
                 # Only include data points within the selected time frame
                 if date_diff <= max_days_ago:
-                    # Aggregate data by day
-                    if date_info_date in daily_data:
-                        daily_data[date_info_date] += entry["total_distance"]
-                    else:
-                        daily_data[date_info_date] = entry["total_distance"]
-
-        # For weekly and monthly views, convert the aggregated daily data to data points
-        if time_frame != "24 hours":
-            for date, total_distance in daily_data.items():
-                date_diff = (current_date - date).days
-                data_points.append((date_diff, total_distance, date))
+                    data_points.append((date_diff, total_distance, date))
 
         # Sort data by date/time (oldest entries first for consistent display)
         data_points.sort(key=lambda item: item[0], reverse=True)
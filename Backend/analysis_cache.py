@@ -0,0 +1,174 @@
+import os
+import json
+import hashlib
+from Backend import analyze_module, kernels, validation_module
+
+DEFAULT_MAX_ENTRIES = 256
+INDEX_FILE = "index.json"
+
+
+def get_analysis_parameters() -> dict:
+    # Everything a cached result depends on besides the log and the screen size
+    return {
+        "version": analyze_module.ANALYSIS_VERSION,
+        "pause_threshold": analyze_module.PAUSE_THRESHOLD,
+        "pause_min_duration_ns": analyze_module.PAUSE_MIN_DURATION_NS,
+        "click_debounce_ns": analyze_module.CLICK_DEBOUNCE_NS,
+        "segment_window": kernels.SEGMENT_WINDOW,
+        "trace_pause_threshold": kernels.TRACE_PAUSE_THRESHOLD,
+        "overshoot_angle": kernels.OVERSHOOT_ANGLE,
+        "start_angle": kernels.START_ANGLE,
+        "min_sample_count": validation_module.MIN_SAMPLE_COUNT,
+        "abrupt_movement_squared": validation_module.ABRUPT_MOVEMENT_SQUARED
+    }
+
+
+def get_hash(data) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Stores analysis results on disk so that a session is only analyzed once.
+
+    Entries are keyed by the log file's path, size and modification time and
+    by the analysis parameters, so editing a log or changing a threshold (or
+    ANALYSIS_VERSION) makes old entries miss. Entries made with other
+    parameters are dropped when the cache is opened. At most max_entries
+    entries are kept; the least recently used ones are evicted first.
+
+    Each entry is a dict with the keys error, validation_summary,
+    pause_segments, end_points and movement_data (the output of
+    analyze_tracking_data; None when the log is invalid).
+    """
+
+    def __init__(self, cache_dir: str = None, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        if cache_dir is None:
+            current_dir = os.path.dirname(os.path.realpath(__file__))
+            cache_dir = os.path.join(current_dir, "storage", "cache")
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.__index_file = os.path.join(self.cache_dir, INDEX_FILE)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # Keys in least to most recently used order, each with the hash of the parameters it was made with
+        self.__entries = {}
+        if os.path.exists(self.__index_file):
+            try:
+                with open(self.__index_file, "r") as file:
+                    self.__entries = json.load(file)
+            except (OSError, ValueError):
+                self.__entries = {}
+
+        self.__drop_stale_entries()
+
+    def __drop_stale_entries(self) -> None:
+        parameters_hash = get_hash(get_analysis_parameters())
+        stale = [key for key, entry_hash in self.__entries.items() if entry_hash != parameters_hash]
+        for key in stale:
+            self.__remove(key)
+        if stale:
+            self.__save_index()
+
+    def get_key(self, log_file: str, screen_width: int, screen_height: int) -> str:
+        stat = os.stat(log_file)
+        fingerprint = {
+            "log_file": os.path.abspath(log_file),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "screen_width": screen_width,
+            "screen_height": screen_height,
+            "parameters": get_analysis_parameters()
+        }
+        return get_hash(fingerprint)
+
+    def get(self, log_file: str, screen_width: int, screen_height: int):
+        """Returns the cached entry for the log, or None."""
+        if not os.path.exists(log_file):
+            return None
+
+        key = self.get_key(log_file, screen_width, screen_height)
+        if key not in self.__entries:
+            return None
+
+        try:
+            with open(self.__get_entry_file(key), "r") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            self.__remove(key)
+            self.__save_index()
+            return None
+
+        # Mark as most recently used
+        self.__entries[key] = self.__entries.pop(key)
+        self.__save_index()
+        return entry
+
+    def put(self, log_file: str, screen_width: int, screen_height: int, entry: dict) -> None:
+        key = self.get_key(log_file, screen_width, screen_height)
+        self.__write_json(self.__get_entry_file(key), entry)
+
+        self.__entries.pop(key, None)
+        self.__entries[key] = get_hash(get_analysis_parameters())
+
+        # Evict the least recently used entries
+        while len(self.__entries) > self.max_entries:
+            self.__remove(next(iter(self.__entries)))
+
+        self.__save_index()
+
+    def clear(self) -> None:
+        for key in list(self.__entries):
+            self.__remove(key)
+        self.__save_index()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__entries
+
+    def __get_entry_file(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def __remove(self, key: str) -> None:
+        self.__entries.pop(key, None)
+        try:
+            os.remove(self.__get_entry_file(key))
+        except FileNotFoundError:
+            pass
+
+    def __save_index(self) -> None:
+        self.__write_json(self.__index_file, self.__entries)
+
+    def __write_json(self, path: str, data) -> None:
+        # Write to a temporary file first so a crash never leaves a half-written file behind
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump(data, file)
+        os.replace(temp_path, path)
+
+
+def make_cache_entry(error, validation_summary, pause_segments=None, end_points=None, movement_data=None) -> dict:
+    # An invalid session keeps its error and validation summary, and nothing else
+    if error:
+        return {"error": error, "validation_summary": validation_summary,
+                "pause_segments": None, "end_points": None, "movement_data": None}
+
+    return {
+        "error": None,
+        "validation_summary": validation_summary,
+        "pause_segments": pause_segments,
+        "end_points": end_points,
+        "movement_data": movement_data
+    }
+
+
+def build_cache_entry(analyzer, movement_data, pause_segments=None, end_points=None) -> dict:
+    """
+    Collects what is cached for a session from an AnalyzeModule and the results
+    already computed with it, so that no stage runs a second time.
+    """
+    return make_cache_entry(analyzer.handle_error().get("error"), analyzer.get_validation_summary(),
+                            pause_segments, end_points, movement_data)
@@ -0,0 +1,111 @@
+import threading
+from PyQt5.QtCore import QThread, pyqtSignal  # To analyze off the GUI thread
+from Backend.analyze_module import AnalyzeModule, AnalysisCancelled, get_session_log_file
+from Backend.analysis_cache import build_cache_entry
+
+# Analysis stages, reported in this order through AnalysisWorker.progress
+LOADING_STAGE = "loading"
+VALIDATING_STAGE = "validating"
+PAUSES_STAGE = "pauses"
+ENDPOINTS_STAGE = "endpoints"
+SEGMENTS_STAGE = "segments"
+ANALYSIS_STAGES = (LOADING_STAGE, VALIDATING_STAGE, PAUSES_STAGE, ENDPOINTS_STAGE, SEGMENTS_STAGE)
+
+
+class AnalysisWorker(QThread):
+    """
+    Analyzes a tracking session on its own thread.
+
+    The stage about to run is emitted through progress before each stage.
+    cancel() can be called at any time from the GUI thread; the worker stops
+    between stages (or between chunks while loading) and emits cancelled.
+    Otherwise exactly one of analysis_finished (with the same dict as
+    AnalyzeModule.analyze_tracking_data) or analysis_failed is emitted.
+
+    With an AnalysisCache, a session analyzed before is answered from the
+    cache right after the loading stage, and new results are stored in it.
+    An Instrumentation passed in is handed to the AnalyzeModule.
+    """
+
+    progress = pyqtSignal(str)
+    analysis_finished = pyqtSignal(dict)
+    analysis_failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, profile_id: int, session: str, screen_width: int, screen_height: int, cache=None,
+                 instrumentation=None) -> None:
+        super().__init__()
+        self.__profile_id = profile_id
+        self.__session = session
+        self.__screen_width = screen_width
+        self.__screen_height = screen_height
+        self.__cache = cache
+        self.__instrumentation = instrumentation
+        self.__cancel_event = threading.Event()
+        self.analyzer = None
+
+    def run(self) -> None:
+        try:
+            movement_data = self.__analyze()
+        except AnalysisCancelled:
+            self.cancelled.emit()
+            return
+        except Exception as e:
+            self.analysis_failed.emit(str(e))
+            return
+
+        if movement_data is not None:
+            self.analysis_finished.emit(movement_data)
+
+    def __analyze(self):
+        # Reading and validating happen in one pass, so "validating" only reports the result of that pass
+        self.__start_stage(LOADING_STAGE)
+        if self.__cache is not None:
+            entry = self.__cache.get(get_session_log_file(self.__profile_id, self.__session), self.__screen_width, self.__screen_height)
+            if entry is not None:
+                if entry["error"]:
+                    self.analysis_failed.emit(entry["error"])
+                    return None
+                return entry["movement_data"]
+
+        self.analyzer = AnalyzeModule(self.__profile_id, self.__session, self.__screen_width, self.__screen_height,
+                                      should_cancel=self.is_cancelled, instrumentation=self.__instrumentation)
+
+        self.__start_stage(VALIDATING_STAGE)
+        if 'error' in self.analyzer.handle_error():
+            self.__store(None)
+            self.analysis_failed.emit(self.analyzer.handle_error()['error'])
+            return None
+
+        self.__start_stage(PAUSES_STAGE)
+        pause_segments = self.analyzer.get_pause_segments()
+
+        self.__start_stage(ENDPOINTS_STAGE)
+        end_positions = self.analyzer.find_end_points()
+
+        self.__start_stage(SEGMENTS_STAGE)
+        all_segment = self.analyzer.analyze_all_segment(end_positions)
+        self.analyzer.total_distance = self.analyzer.get_total_distance()
+
+        # A cancel that came in during the last stage still wins
+        self.__start_stage(None)
+        movement_data = {"analysis_result": all_segment, "total_distance": self.analyzer.total_distance}
+        self.__store(movement_data, pause_segments, end_positions)
+        return movement_data
+
+    def __store(self, movement_data, pause_segments=None, end_points=None) -> None:
+        if self.__cache is not None:
+            self.__cache.put(self.analyzer.get_log_file(), self.__screen_width, self.__screen_height,
+                             build_cache_entry(self.analyzer, movement_data, pause_segments, end_points))
+
+    def __start_stage(self, stage) -> None:
+        if self.is_cancelled():
+            raise AnalysisCancelled()
+        if stage is not None:
+            self.progress.emit(stage)
+
+    def cancel(self) -> None:
+        self.__cancel_event.set()
+
+    def is_cancelled(self) -> bool:
+        return self.__cancel_event.is_set()
@@ -1,149 +1,197 @@
 import os
-from datetime import datetime
 import csv
 import math
+import bisect
+import numpy as np
+from Backend.session_log import find_log_file, is_binary_log, read_binary_log, FLAG_CLICKED
+from Backend.validation_module import StreamingValidator
+from Backend.cursor_log import CursorLog
+from Backend.instrumentation import (
+    NO_INSTRUMENTATION, LOAD_STAGE, VALIDATE_FEED_STAGE, VALIDATE_FINISH_STAGE, PAUSE_SEGMENTS_STAGE, END_POINTS_STAGE,
+    SEGMENTS_STAGE, TOTAL_DISTANCE_STAGE,
+)
+from Backend.kernels import (
+    SEGMENT_WINDOW, NO_INDEX, get_angle_from_delta, angle_diff, is_paused, trace_segment_kernel, find_pause_runs,
+)
+
+ANALYSIS_VERSION = 1                    # Bump whenever a change to the analysis changes its results
+PAUSE_THRESHOLD = 15                    # Steps of at most 15 pixels count as paused
+PAUSE_MIN_DURATION_NS = 100_000_000     # A pause must last longer than 0.1 seconds
+CLICK_DEBOUNCE_NS = 400_000_000         # Clicks within 0.4 seconds of the previous click are ignored
+LOAD_CHUNK_SIZE = 65536                 # Samples read and validated at a time
+
+
+class AnalysisCancelled(Exception):
+    pass
 
-class AnalyzeModule:
-    def __init__(self, profile_id: int, session: str, screen_width: int, screen_height: int) -> None:
-        self.screen_width = screen_width
-        self.screen_height = screen_height
 
-        current_dir = os.path.dirname(os.path.realpath(__file__))
-        self.__storage_dir = os.path.join(current_dir, "storage", "logs")
-        self.__log_file = os.path.join(self.__storage_dir, f"id_{profile_id}_cursor_log_{session}.csv")
-        self.total_distance = 0
-        self.__error = None
+def get_session_log_file(profile_id: int, session: str) -> str:
+    current_dir = os.path.dirname(os.path.realpath(__file__))
+    return find_log_file(os.path.join(current_dir, "storage", "logs"), profile_id, session)
 
-        # If self.__log_file is not found, raise an error (Test Case 9)
-        if not os.path.exists(self.__log_file):
-            raise Exception(f"Tracking log file not found: {self.__log_file}")
 
-        self.__cursor_log = []
+def iter_log_chunks(log_file: str, parse_rows, chunk_size: int = LOAD_CHUNK_SIZE):
+    """
+    Reads a session log chunk by chunk.
 
-        try:
-            with open(self.__log_file, "r") as file:
-                reader = csv.reader(file)
-                
-                next(reader) # Skip the first row (header)
+    CSV rows are converted with parse_rows (StreamingValidator.parse_rows).
 
-                for row in reader:
-                    if len(row) != 4:
-                        continue
+    Yields:
+        tuple: (timestamps, x, y, clicked) as NumPy arrays of at most chunk_size samples.
+    """
+    if is_binary_log(log_file):
+        _, records = read_binary_log(log_file)
 
-                    cursor_log = {}
-                    cursor_log['timestamp'] = row[0]
-                    cursor_log['x'] = row[1]
-                    cursor_log['y'] = row[2]
-                    cursor_log['clicked'] = row[3]
+        # Binary logs are already typed, so the columns only need widening
+        for start in range(0, len(records), chunk_size):
+            chunk = records[start:start + chunk_size]
+            yield (chunk["t_ns"].astype(np.int64), chunk["x"].astype(np.int64), chunk["y"].astype(np.int64),
+                   (chunk["flags"] & FLAG_CLICKED).astype(np.int8))
+        return
 
-                    self.__cursor_log.append(cursor_log)
+    with open(log_file, "r") as file:
+        reader = csv.reader(file)
+        
+        next(reader, None) # Skip the first row (header)
 
-            file.close()
+        rows = []
+        for row in reader:
+            if len(row) != 4:
+                continue
 
-            if (not self.validate_data_length()):
-                raise Exception("Cursor tracking data is not sufficient. Please make sure the tracking persists for at least 10 second.")
+            rows.append(row)
+            if len(rows) == chunk_size:
+                yield parse_rows(rows)
+                rows = []
 
-            if (not self.validate_timestamps()):
-                raise Exception("The timestamp of the tracking data is missing or invalid. Please try again.")
+        if rows:
+            yield parse_rows(rows)
 
-            if (not self.validate_cursor_positions()):
-                raise Exception("The data points of the tracking data are missing, invalid, or out of range. Please try again.")
-            
-            check_extreme_movements = self.validate_extreme_movements()
-            if ("error" in check_extreme_movements):
-                raise Exception(check_extreme_movements["error"] + " Please try again with natural movement behavior.")
 
-        except Exception as e:
-            self.__error = str(e)
+def trace_segment(xs, ys, end_position: int, prev_click_point: int, offset: int = 0):
+    """
+    Walks back from a click to find where the movement towards it started.
 
-    def validate_data_length(self) -> bool:
-        # The tracking data must have at least 1000 data points
-        return len(self.__cursor_log) >= 100 # Have 100 for testing purposes; TODO, change back to 1000
+    xs and ys hold the points from index offset on. Only points from
+    prev_click_point - 1 on are read, which is what lets the chunked analysis
+    drop everything before the previous click.
 
-    def validate_timestamps(self) -> bool:
+    Returns:
+        tuple: (start_index, end_index, OS_index) where end_index is the click
+        without its trailing stationary points and OS_index is the index where
+        an overshoot was detected (or None).
+    """
+    start_index, end_index, OS_index = trace_segment_kernel(xs, ys, end_position, prev_click_point, offset)
+    return int(start_index), int(end_index), (None if OS_index == NO_INDEX else int(OS_index))
 
-        data_points = self.__cursor_log
 
-        # Phase 1: Check if the timestamp is missing or invalid
-        for i in range(len(data_points)):
-            if (not data_points[i]['timestamp']):
-                return False
-            else:
-                try:
-                    datetime.strptime(data_points[i]['timestamp'], "%Y-%m-%d %H:%M:%S.%f")
-                except ValueError:
-                    return False
-        
-        # Phase 2: Check if the timestamps are consistent
-        for i in range(1, len(data_points)):
-            timestamp_current = datetime.strptime(data_points[i]['timestamp'], "%Y-%m-%d %H:%M:%S.%f")
-            timestamp_before = datetime.strptime(data_points[i - 1]['timestamp'], "%Y-%m-%d %H:%M:%S.%f")
+def get_pause_distance(pause_points: list, pause_starts: list, pause_ends: list, startpoint: int, endpoint: int,
+                       OS_index: int, get_distance) -> list[float]:
+    """
+    Distances between consecutive pauses of a segment, starting from its start point.
+
+    pause_starts and pause_ends are the sorted start and end indices of
+    pause_points; get_distance(index1, index2) is the straight-line distance.
+    """
+    PDList = []
+
+    # Only the pauses that start at or after startpoint and end at or before endpoint
+    first = bisect.bisect_left(pause_starts, startpoint)
+    last = bisect.bisect_right(pause_ends, endpoint)
+
+    paused_points_within_segment = [startpoint]
+    for each in pause_points[first:last]:
+        # Skip OS_index check if OS_index is None
+        if OS_index is None or (not (each["start_index"] <= OS_index <= each["end_index"])
+            and not (each["start_index"] <= endpoint <= each["end_index"])):
+            paused_points_within_segment.append(each["start_index"])
+
+    for i in range(1, len(paused_points_within_segment)):
+        distance = get_distance(paused_points_within_segment[i-1], paused_points_within_segment[i])
+        # Only add non-zero distances to avoid 0.0 in PDList
+        if distance > 0:
+            PDList.append(distance)
+
+    return PDList
+
+
+class AnalyzeModule:
+    def __init__(self, profile_id: int, session: str, screen_width: int, screen_height: int, should_cancel=None,
+                 log_file: str = None, instrumentation=None) -> None:
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.__should_cancel = should_cancel    # Optional callable; loading stops between chunks once it returns True
+        self.__instrumentation = instrumentation or NO_INSTRUMENTATION
+
+        # The session's log in Backend/storage/logs, unless a log file is given
+        self.__log_file = log_file or get_session_log_file(profile_id, session)
+        self.total_distance = 0
+        self.__error = None
 
-            if (timestamp_current < timestamp_before):
-                return False
-        return True
+        # If self.__log_file is not found, raise an error (Test Case 9)
+        if not os.path.exists(self.__log_file):
+            raise Exception(f"Tracking log file not found: {self.__log_file}")
+
+        # The session is kept as a CursorLog (one compact NumPy array per column)
+        self.__log = None
+        self.__step_distances = None
+        self.__cumulative_distances = None
+        self.__pause_points_list = None
+        self.__pause_threshold = None           # Threshold __pause_points_list was computed with
 
-    def validate_cursor_positions(self) -> bool:
-        data_points = self.__cursor_log
+        # Every validation rule is checked in a single pass while the log is read
+        self.__validator = StreamingValidator(screen_width, screen_height)
+        self.__chunks = []
 
-        # Check if the cursor position exists and is in integers
         try:
-            for data_point in data_points:
-                if (not data_point['x'] or not data_point['y']):
-                    return False
-                
-                # If the data point is not an integer, the assertion fails (see exception)
-                # Otherwise, the data point is type-casted to an integer
-                data_point['x'] = int(data_point['x'])
-                data_point['y'] = int(data_point['y'])
-
-                # if the "clicked" entry is not valid, set it to 0
-                if (data_point['clicked'] == '0' or data_point['clicked'] == '1'):
-                    data_point['clicked'] = int(data_point['clicked'])
-                else:
-                    data_point['clicked'] = 0
-
-                #Check if the cursor position is within the screen
-                if (data_point['x'] < 0 or data_point['x'] >= self.screen_width or data_point['y'] < 0 or data_point['y'] >= self.screen_height):
-                    return False
+            with self.__instrumentation.stage(LOAD_STAGE) as stage:
+                for timestamps, x, y, clicked in iter_log_chunks(self.__log_file, self.__validator.parse_rows):
+                    self.__add_chunk(timestamps, x, y, clicked)
+                stage.items = self.__validator.get_summary()["sample_count"]
+
+            with self.__instrumentation.stage(VALIDATE_FINISH_STAGE) as stage:
+                stage.items = self.__validator.get_summary()["sample_count"]
+                self.__validator.finish()
+
+        except AnalysisCancelled:
+            raise
 
         except Exception as e:
-            return False
-        return True
-    
-    def validate_extreme_movements(self) -> dict:
-        data_points = self.__cursor_log
+            self.__error = str(e)
 
-        cursor_moved_flag = False
-        cursor_paused_flag = False
+        finally:
+            # Whatever was read stays available, even when validation failed
+            self.__join_chunks()
 
-        for i in range(0,len(data_points)-1):
-                x_pos1 = data_points[i]['x']
-                y_pos1 = data_points[i]['y']
-                x_pos2 = data_points[i+1]['x']
-                y_pos2 = data_points[i+1]['y']
+    def __add_chunk(self, timestamps, x, y, clicked) -> None:
+        if self.__should_cancel is not None and self.__should_cancel():
+            raise AnalysisCancelled()
 
-                distance_traveled = (x_pos2-x_pos1)**2 + (y_pos2-y_pos1)**2
+        # The chunk is kept before it is validated so that a failing chunk is still available
+        self.__chunks.append((timestamps, x, y, clicked))
+        with self.__instrumentation.stage(VALIDATE_FEED_STAGE) as stage:
+            stage.items = len(timestamps)
+            self.__validator.feed(timestamps, x, y)
 
-                # for abrupt change in cursor position
-                if(distance_traveled >= 250000):
-                    return {"error": "Unusual cursor movement (Abrupt movement) detected."}
+    def __join_chunks(self) -> None:
+        self.__log = CursorLog.from_chunks(self.__chunks)
+        self.__chunks = []
 
-                # Check if the cursor positions have moved at all
-                if (x_pos1 != x_pos2 or y_pos1 != y_pos2):
-                    cursor_moved_flag = True
+    def get_log_file(self) -> str:
+        return self.__log_file
 
-                # Check if the cursor ever paused
-                if (x_pos1 == x_pos2 and y_pos1 == y_pos2):
-                    cursor_paused_flag = True
+    def get_validation_summary(self) -> dict:
+        """
+        Statistics collected while validating: sample count, bounding box, first and
+        last timestamp, moved/paused flags and the largest jump between two samples.
+        """
+        return self.__validator.get_summary()
 
-        if not cursor_moved_flag:
-            return {"error": "Unusual cursor movement (No movement) detected."}
-        
-        if not cursor_paused_flag:
-            return {"error": "Unusual cursor movement (Restless movement) detected."}
-        
-        return {"message": "Cursor movement is valid"}
+    def get_cursor_log(self) -> CursorLog:
+        return self.__log
+
+    def __sample_count(self) -> int:
+        return len(self.__log)
 
     # Error handler to be used in the frontend
     def handle_error(self):
@@ -152,7 +200,7 @@ class AnalyzeModule:
         else:
             return {"message": "Data points are valid!"}
 
-    def get_pause_segments(self, threshold: int = 15) -> list[dict]:
+    def get_pause_segments(self, threshold: int = PAUSE_THRESHOLD) -> list[dict]:
         """
         Finds all pause segments where the cursor moved within a small threshold
         (X and Y changes are less than or equal to the threshold).
@@ -163,148 +211,67 @@ class AnalyzeModule:
         Returns:
             list of dict: Each dict has 'start_index', 'end_index', 'x', 'y'.
         """
-        data_points = self.__cursor_log
-
-        pause_segments = []
-        start_idx = None
-
-        for i in range(1, len(data_points)):
-            dx = data_points[i]['x'] - data_points[i - 1]['x']
-            dy = data_points[i]['y'] - data_points[i - 1]['y']
-            distance = math.sqrt(dx**2 + dy**2)
-            within_threshold = distance <= threshold
-
-
-            if within_threshold:
-                if start_idx is None:
-                    start_idx = i - 1
-            else:
-                if start_idx is not None:
-
-                    timestamp_end = datetime.strptime(data_points[i - 1]['timestamp'], "%Y-%m-%d %H:%M:%S.%f")
-                    timestamp_start = datetime.strptime(data_points[start_idx]['timestamp'], "%Y-%m-%d %H:%M:%S.%f")
-
-                    if ((timestamp_end - timestamp_start).total_seconds() > 0.1):
-                        pause_segments.append({
-                            "start_index": start_idx,
-                            "end_index": i - 1,
-                            "x": int(data_points[start_idx]['x']),
-                            "y": int(data_points[start_idx]['y'])
-                        })
-
-                    start_idx = None
-
-        # Handle final pause at end
-        if start_idx is not None:
-            pause_segments.append({
-                "start_index": start_idx,
-                "end_index": len(data_points) - 1,
-                "x": int(data_points[start_idx]['x']),
-                "y": int(data_points[start_idx]['y'])
-            })
-
+        with self.__instrumentation.stage(PAUSE_SEGMENTS_STAGE) as stage:
+            starts, ends = find_pause_runs(self.__log.xs, self.__log.ys, self.__log.timestamps, threshold, PAUSE_MIN_DURATION_NS)
+            pause_starts = starts.tolist()
+            pause_ends = ends.tolist()
+
+            pause_segments = []
+            for start_idx, end_idx in zip(pause_starts, pause_ends):
+                pause_segments.append({
+                    "start_index": start_idx,
+                    "end_index": end_idx,
+                    "x": int(self.__log.xs[start_idx]),
+                    "y": int(self.__log.ys[start_idx])
+                })
+            stage.items = len(pause_segments)
+
+        # Pauses never overlap, so both the starts and the ends are sorted and can be searched with bisect
         self.__pause_points_list = pause_segments
+        self.__pause_starts = pause_starts
+        self.__pause_ends = pause_ends
+        self.__pause_threshold = threshold
         return pause_segments
 
     # Returns a list of indices of the 'valid' clicked positions
     def find_end_points(self) -> list[int]:
-        clicked_positions = []
+        with self.__instrumentation.stage(END_POINTS_STAGE) as stage:
+            clicked_positions = np.flatnonzero(self.__log.clicked == 1)
 
-        for i in range(len(self.__cursor_log)):
-            if self.__cursor_log[i]['clicked'] == 1:
-                clicked_positions.append({**self.__cursor_log[i], 'index': i})
-        
-        for i in range(1, len(clicked_positions)):
-            time_before = datetime.strptime(clicked_positions[i - 1]['timestamp'], "%Y-%m-%d %H:%M:%S.%f")
-            time_now = datetime.strptime(clicked_positions[i]['timestamp'], "%Y-%m-%d %H:%M:%S.%f")
-            if ((time_now - time_before).total_seconds() <= 0.4):
-                clicked_positions[i]['index'] = -1
+            # A click too close to the previous click is not a new end point
+            if len(clicked_positions) > 1:
+                spaced_out = np.diff(self.__log.timestamps[clicked_positions]) > CLICK_DEBOUNCE_NS
+                clicked_positions = clicked_positions[np.concatenate(([True], spaced_out))]
 
-        clicked_positions = [data_point['index'] for data_point in clicked_positions if data_point['index'] != -1]
-        
-        return clicked_positions
+            stage.items = len(clicked_positions)
+            return clicked_positions.tolist()
     
     def analyze_all_segment(self, end_positions) -> list[dict]:
+        with self.__instrumentation.stage(SEGMENTS_STAGE) as stage:
+            all_segment = self.__analyze_all_segment(end_positions)
+            stage.items = len(all_segment)
+            return all_segment
+
+    def __analyze_all_segment(self, end_positions) -> list[dict]:
         all_segment = []                                    # Return list of objects "segment"
-        data_points = self.__cursor_log                     # Call data points
-        i = 0                                               # Pointer for the nearer cursor data
-        j = 25                                              # Pointer for further cursor data
-        slope_before = None                                 # To compare two slopes
         prev_click_point = 0                                # Make sure the start for an end point comes after the previous end point
-        overshoot_flag = False                              # Detect overshoot existence
-        self.get_pause_segments()                           # Updates __pause_point_list
+        if self.__pause_threshold != PAUSE_THRESHOLD:
+            self.get_pause_segments()                       # Updates __pause_point_list
 
         # Each click point will become the end_position of a trajectory segment for analysis
         for end_position in end_positions:
-            segment = {"start_index": None, "end_index": None, "PD_list": [], "OS_distance": None, "TD": None}
-
-            # Remove consecutive identical coordinates at the end of the segment (where the cursor was stationary)
-            while (end_position > 0 and data_points[end_position]['x'] == data_points[end_position - 1]['x'] and data_points[end_position]['y'] == data_points[end_position - 1]['y']):
-                end_position -= 1
-
-            # Boundary check to prevent negative index
-            while end_position >= j:
-                # Boundary check to prevent duplicate starting points
-                if prev_click_point < end_position - j:
-                    dx = data_points[end_position - j]['x'] - data_points[end_position - i]['x']
-                    dy = data_points[end_position - j]['y'] - data_points[end_position - i]['y']
-                    
-                    # Check for pause points, and disregard these points
-                    if self.is_paused(dx,dy):
-                        i += 1
-                        j += 1
-                        continue
-
-                    slope_now = self.get_angle_from_delta(dx,dy)
-
-                    if slope_before is not None:
-                        # Check if the slope abruptly changes (meaning that the cursor is overshooting)
-                        if not overshoot_flag:
-                            if 130 <= self.angle_diff(slope_before, slope_now):
-                                overshoot_flag = True
-                                segment['OS_distance'] = (end_position - i) # temporily use index as distance
-                                slope_before = slope_now
-                                i += 25
-                                j += 25
-                                continue
-
-                        # If the angle diff is more than 30 degrees, the system identifies the second latest cursor data point as the start point for the corresponding endpoint
-                        if self.angle_diff(slope_before, slope_now) > 30:
-
-                            segment['start_index'] = (end_position - i)         #add second latest cursor data index as the segment's start index
-                            segment['end_index'] = end_position                 #add the current end point index to segment's end_index
-                            break
-
-                    # Update the slope before the next iteration
-                    slope_before = slope_now
-                    i += 25
-                    j += 25
-
-                # If goes beyond boundary save analyzed start_index and end_index for the segment
-                else:
-                    segment['start_index'] = (end_position - i)
-                    segment['end_index'] = end_position
-                    break
-            
-            # If index becomes negative, the start_index of the segment is 0
-            if end_position < j:
-                segment['start_index'] = 0
-                segment['end_index'] = end_position
+            start_index, end_index, OS_index = trace_segment(self.__log.xs, self.__log.ys, end_position, prev_click_point)
+            segment = {"start_index": start_index, "end_index": end_index, "PD_list": [], "OS_distance": None, "TD": None}
 
             # For counting pausepoints in one segment
-            segment["PD_list"] = self.get_pause_distance(segment["start_index"], segment["end_index"], segment["OS_distance"])
+            segment["PD_list"] = self.get_pause_distance(start_index, end_index, OS_index)
 
-            if segment['OS_distance'] is not None:
-                segment['OS_distance'] = self.get_distance(segment["end_index"], segment['OS_distance'])
+            if OS_index is not None:
+                segment['OS_distance'] = self.get_distance(end_index, OS_index)
 
-            segment['TD'] = self.get_distance(segment["start_index"], segment["end_index"])
+            segment['TD'] = self.get_distance(start_index, end_index)
 
-            # Reset the variables for the next segment
-            i = 0
-            j = 25
-            slope_before = None
-            prev_click_point = end_position
-            overshoot_flag = False
+            prev_click_point = end_index
             all_segment.append(segment)
 
         return all_segment
@@ -315,58 +282,68 @@ class AnalyzeModule:
         self.total_distance = self.get_total_distance()
         return {"analysis_result": all_segment, "total_distance": self.total_distance}
     
+    def get_step_distances(self) -> np.ndarray:
+        # Distance between every pair of consecutive points, computed once per session
+        if self.__step_distances is None:
+            # Differences in int64, so that squaring them cannot overflow
+            dx = np.subtract(self.__log.xs[1:], self.__log.xs[:-1], dtype=np.int64)
+            dy = np.subtract(self.__log.ys[1:], self.__log.ys[:-1], dtype=np.int64)
+            self.__step_distances = np.sqrt(dx * dx + dy * dy)
+        return self.__step_distances
+
+    def get_cumulative_distances(self) -> np.ndarray:
+        # Path length from the first point to every point, so path lengths between any two points are O(1)
+        if self.__cumulative_distances is None:
+            # cumsum adds strictly left to right, so the last entry is the same as a sequential loop
+            self.__cumulative_distances = np.cumsum(np.concatenate(([0.0], self.get_step_distances())))
+        return self.__cumulative_distances
+
     def get_total_distance(self) -> float:
-        TD = 0
-        for i in range(1, len(self.__cursor_log)):
-            TD += self.get_distance(i, i-1)
-        return TD
-    
+        with self.__instrumentation.stage(TOTAL_DISTANCE_STAGE) as stage:
+            stage.items = self.__sample_count()
+            if self.__sample_count() < 2:
+                return 0
+            return float(self.get_cumulative_distances()[-1])
+
+    def get_path_length(self, index1: int, index2: int) -> float:
+        """
+        Distance travelled along the trajectory between two points, as opposed to
+        get_distance, which is the straight-line distance between them.
+        """
+        cumulative_distances = self.get_cumulative_distances()
+        return abs(float(cumulative_distances[index2] - cumulative_distances[index1]))
+
+    def get_path_efficiency(self, index1: int, index2: int) -> float:
+        """
+        Straight-line distance divided by the path length between two points:
+        1.0 for a straight movement, lower the more the cursor wandered.
+        Returns None if the cursor did not move.
+        """
+        path_length = self.get_path_length(index1, index2)
+        if path_length == 0:
+            return None
+        return self.get_distance(index1, index2) / path_length
+
     def get_angle_from_delta(self,dx, dy):
-        angle = math.atan2(dy, dx) * (180 / math.pi)
-        if (angle < 0):
-            angle += 360
-        return angle
+        return get_angle_from_delta(dx, dy)
     
     def angle_diff(self, a1, a2):
-        diff = abs(a1 - a2)
-        if diff > 180:
-            diff = 360 - diff
-        return diff
+        return angle_diff(a1, a2)
     
     def is_paused(self, dx, dy):
-        distance = math.sqrt(dx**2 + dy**2)
-        threshold = 15
-        within_threshold = distance <= threshold
-        return within_threshold
+        return is_paused(dx, dy)
     
     def get_distance(self, index1, index2):
-        x1 = self.__cursor_log[index1]["x"]
-        x2 = self.__cursor_log[index2]["x"]
-        y1 = self.__cursor_log[index1]["y"]
-        y2 = self.__cursor_log[index2]["y"]
+        x1 = int(self.__log.xs[index1])
+        x2 = int(self.__log.xs[index2])
+        y1 = int(self.__log.ys[index1])
+        y2 = int(self.__log.ys[index2])
 
         return math.sqrt((x1-x2)**2 + (y1-y2)**2)
     
     def get_pause_distance(self, startpoint: int, endpoint: int, OS_index: int) -> list[int]:
-        paused_points = self.__pause_points_list                          #updates __pause_point_list
-        PDList = []
-        
-        paused_points_within_segment = [startpoint]
-        for each in paused_points:
-            if startpoint <= each["start_index"] and endpoint >= each["end_index"]:
-
-                # Skip OS_index check if OS_index is None
-                if OS_index is None or (not (each["start_index"] <= OS_index <= each["end_index"])
-                    and not (each["start_index"] <= endpoint <= each["end_index"])):
-                    paused_points_within_segment.append(each["start_index"])
-
-        for i in range(1, len(paused_points_within_segment)):
-            distance = self.get_distance(paused_points_within_segment[i-1], paused_points_within_segment[i])
-            # Only add non-zero distances to avoid 0.0 in PDList
-            if distance > 0:
-                PDList.append(distance)
-
-        return PDList
+        return get_pause_distance(self.__pause_points_list, self.__pause_starts, self.__pause_ends,
+                                  startpoint, endpoint, OS_index, self.get_distance)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,186 @@
+import os
+import re
+import sys
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from Backend.analysis_cache import AnalysisCache, make_cache_entry
+from Backend.calculate_module import DPICalculationModule
+from Backend.profile_handler import ProfileHandler
+from Backend.session_log import find_log_file
+from Backend.incremental_analysis import CheckpointStore, resume_analysis
+
+# id_<profile>_cursor_log_<session>.csv or .sflog
+SESSION_LOG_PATTERN = re.compile(r"^id_(\d+)_cursor_log_(.+)\.(csv|sflog)$")
+
+
+def get_logs_dir() -> str:
+    current_dir = os.path.dirname(os.path.realpath(__file__))
+    return os.path.join(current_dir, "storage", "logs")
+
+
+def find_sessions(profile_id: int, logs_dir: str = None) -> list[str]:
+    """Returns the sessions of a profile that have a log, oldest first."""
+    logs_dir = logs_dir or get_logs_dir()
+    if not os.path.isdir(logs_dir):
+        return []
+
+    sessions = set()
+    for file_name in os.listdir(logs_dir):
+        match = SESSION_LOG_PATTERN.match(file_name)
+        if match and int(match.group(1)) == profile_id:
+            sessions.add(match.group(2))
+
+    # Session names are "%Y-%m-%d_%H-%M-%S", so sorting by name sorts by time
+    return sorted(sessions)
+
+
+def analyze_session_log(profile_id: int, session: str, log_file: str, screen_width: int, screen_height: int,
+                        checkpoint_dir: str = None) -> dict:
+    """
+    Analyzes one session log chunk by chunk, so a long session is never in
+    memory at once. Runs in a worker process.
+
+    With a checkpoint_dir (see CheckpointStore), a log that was only appended
+    to since the last run is analyzed from its checkpoint, so only the new
+    part is read.
+
+    Returns:
+        dict: The cache entry of the session (see AnalysisCache), the same as
+        AnalyzeModule would give.
+    """
+    # A missing log has no validation summary, so it is never cached
+    if not os.path.exists(log_file):
+        return make_cache_entry(f"Tracking log file not found: {log_file}", None)
+
+    if checkpoint_dir is not None:
+        validator, analyzer, error = CheckpointStore(checkpoint_dir).resume(log_file, screen_width, screen_height)
+    else:
+        validator, analyzer, error, _ = resume_analysis(log_file, screen_width, screen_height)
+
+    if error is not None:
+        return make_cache_entry(error, validator.get_summary())
+    return make_cache_entry(None, validator.get_summary(), analyzer.pause_segments, analyzer.end_points,
+                            analyzer.get_result())
+
+
+def analyze_profiles(profile_ids: list[int], screen_width: int, screen_height: int, profiles: list[dict] = None,
+                     logs_dir: str = None, max_workers: int = None, cache: AnalysisCache = None,
+                     checkpoints: CheckpointStore = None) -> dict:
+    """
+    Analyzes every session of the given profiles, one session per worker process.
+
+    Sessions found in the cache are not analyzed again, and new results are
+    added to it. With checkpoints, a session whose log grew since it was last
+    analyzed only has its new part read. For every profile found in profiles,
+    the segments of all valid sessions are also combined into one DPI
+    recommendation.
+
+    Returns:
+        dict: {profile_id: {"sessions": {session: cache entry}, "dpi": DPICalculationModule.dpi or None}}
+    """
+    logs_dir = logs_dir or get_logs_dir()
+    results = {profile_id: {"sessions": {}, "dpi": None} for profile_id in profile_ids}
+
+    tasks = []
+    for profile_id in profile_ids:
+        for session in find_sessions(profile_id, logs_dir):
+            log_file = find_log_file(logs_dir, profile_id, session)
+            entry = cache.get(log_file, screen_width, screen_height) if cache is not None else None
+            if entry is not None:
+                results[profile_id]["sessions"][session] = entry
+            else:
+                tasks.append((profile_id, session, log_file))
+
+    if tasks:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            # Each log has its own checkpoint file, so the workers never write the same one
+            checkpoint_dir = checkpoints.checkpoint_dir if checkpoints is not None else None
+            futures = [executor.submit(analyze_session_log, profile_id, session, log_file, screen_width, screen_height,
+                                       checkpoint_dir)
+                       for profile_id, session, log_file in tasks]
+
+            # The cache is only touched from this process
+            for (profile_id, session, log_file), future in zip(tasks, futures):
+                entry = future.result()
+                results[profile_id]["sessions"][session] = entry
+                if cache is not None and entry["validation_summary"] is not None:
+                    cache.put(log_file, screen_width, screen_height, entry)
+
+    # Keep the sessions in time order
+    for profile_id in profile_ids:
+        results[profile_id]["sessions"] = dict(sorted(results[profile_id]["sessions"].items()))
+
+    profiles_by_id = {profile["_id"]: profile for profile in profiles or []}
+    for profile_id in profile_ids:
+        if profile_id not in profiles_by_id:
+            continue
+        all_segment = []
+        for entry in results[profile_id]["sessions"].values():
+            if entry["movement_data"] is not None:
+                all_segment.extend(entry["movement_data"]["analysis_result"])
+        results[profile_id]["dpi"] = DPICalculationModule(profiles_by_id[profile_id], all_segment).dpi
+
+    return results
+
+
+def write_results(results: dict, output_dir: str) -> list[str]:
+    """Writes one JSON file per session and one summary per profile. Returns the written paths."""
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+
+    for profile_id, result in results.items():
+        for session, entry in result["sessions"].items():
+            path = os.path.join(output_dir, f"id_{profile_id}_analysis_{session}.json")
+            with open(path, "w") as file:
+                json.dump(entry, file, indent=4)
+            written.append(path)
+
+        summary = {
+            "profile_id": profile_id,
+            "session_count": len(result["sessions"]),
+            "valid_session_count": sum(1 for entry in result["sessions"].values() if entry["movement_data"] is not None),
+            "errors": {session: entry["error"] for session, entry in result["sessions"].items() if entry["error"]},
+            "dpi": result["dpi"]
+        }
+        path = os.path.join(output_dir, f"id_{profile_id}_summary.json")
+        with open(path, "w") as file:
+            json.dump(summary, file, indent=4)
+        written.append(path)
+
+    return written
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Re-analyze every tracked session of one or more profiles.")
+    parser.add_argument("profile_ids", type=int, nargs="+", help="Profile ids to analyze")
+    parser.add_argument("--width", type=int, required=True, help="Screen width the sessions were tracked on")
+    parser.add_argument("--height", type=int, required=True, help="Screen height the sessions were tracked on")
+    parser.add_argument("--output", default=None, help="Directory for the results (default: Backend/storage/analysis)")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: one per CPU)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Analyze every session in full even if a cached result or checkpoint exists")
+    args = parser.parse_args(argv)
+
+    # Profiles are only read, for the current DPI
+    profile_handler = ProfileHandler()
+    profiles = profile_handler.get_profiles()
+    profile_handler.close()
+
+    cache = None if args.no_cache else AnalysisCache()
+    checkpoints = None if args.no_cache else CheckpointStore()
+    results = analyze_profiles(args.profile_ids, args.width, args.height, profiles=profiles,
+                               max_workers=args.workers, cache=cache, checkpoints=checkpoints)
+
+    output_dir = args.output or os.path.join(os.path.dirname(get_logs_dir()), "analysis")
+    write_results(results, output_dir)
+
+    for profile_id, result in results.items():
+        recommendation = result["dpi"]["DPI_recommendation"] if result["dpi"] else "profile not found"
+        print(f"Profile {profile_id}: {len(result['sessions'])} sessions, DPI recommendation: {recommendation}")
+    print(f"Results written to {output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
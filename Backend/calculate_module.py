@@ -1,15 +1,22 @@
 import os
 import csv
 import math
+from Backend.instrumentation import NO_INSTRUMENTATION, CALCULATE_DPI_STAGE
 
 class DPICalculationModule:
-    def __init__(self, current_profile, movement_data):
+    def __init__(self, current_profile, movement_data, instrumentation=None):
         self.__current_profile = current_profile
         self.__movement_data = movement_data
+        self.__instrumentation = instrumentation or NO_INSTRUMENTATION
         self.__error = None
         self.dpi = self.calculate_dpi()
                 
     def calculate_dpi(self) -> int:
+        with self.__instrumentation.stage(CALCULATE_DPI_STAGE) as stage:
+            stage.items = len(self.__movement_data)
+            return self.__calculate_dpi()
+
+    def __calculate_dpi(self) -> int:
         suggestion = 0
         count = 0
 
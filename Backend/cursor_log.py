@@ -0,0 +1,100 @@
+import numpy as np
+
+INT32_MIN = np.iinfo(np.int32).min
+INT32_MAX = np.iinfo(np.int32).max
+
+
+class CursorSample:
+    # One sample of a CursorLog; created on access, the log itself only stores columns
+    __slots__ = ("timestamp", "x", "y", "clicked")
+
+    def __init__(self, timestamp: int, x: int, y: int, clicked: int) -> None:
+        self.timestamp = timestamp
+        self.x = x
+        self.y = y
+        self.clicked = clicked
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CursorSample):
+            return NotImplemented
+        return (self.timestamp, self.x, self.y, self.clicked) == (other.timestamp, other.x, other.y, other.clicked)
+
+    def __repr__(self) -> str:
+        return f"CursorSample(timestamp={self.timestamp}, x={self.x}, y={self.y}, clicked={self.clicked})"
+
+
+def get_coordinate_dtype(*columns):
+    # int32 holds every screen coordinate; int64 only for logs with absurd values
+    for column in columns:
+        column = np.asarray(column)
+        if len(column) and (column.min() < INT32_MIN or column.max() > INT32_MAX):
+            return np.int64
+    return np.int32
+
+
+class CursorLog:
+    """
+    The samples of a session as typed NumPy columns: timestamps (int64
+    nanoseconds), x and y (int32, or int64 if a coordinate does not fit) and
+    clicked (int8), about 17 bytes per sample.
+
+    Indexing with an int returns a CursorSample, slicing returns a CursorLog
+    that shares the columns, and iterating yields CursorSamples. The columns
+    are read-only; code that works on whole sessions uses them directly.
+    """
+
+    __slots__ = ("timestamps", "xs", "ys", "clicked")
+
+    def __init__(self, timestamps, xs, ys, clicked) -> None:
+        if not (len(timestamps) == len(xs) == len(ys) == len(clicked)):
+            raise ValueError("Cursor log columns must have the same length")
+
+        coordinate_dtype = get_coordinate_dtype(xs, ys)
+        self.timestamps = self.__freeze(np.asarray(timestamps, dtype=np.int64))
+        self.xs = self.__freeze(np.asarray(xs, dtype=coordinate_dtype))
+        self.ys = self.__freeze(np.asarray(ys, dtype=coordinate_dtype))
+        self.clicked = self.__freeze(np.asarray(clicked, dtype=np.int8))
+
+    @staticmethod
+    def __freeze(column: np.ndarray) -> np.ndarray:
+        # A view, so that freezing never affects an array the caller still writes to
+        column = column.view()
+        column.flags.writeable = False
+        return column
+
+    @classmethod
+    def from_chunks(cls, chunks: list) -> "CursorLog":
+        """
+        Joins (timestamps, x, y, clicked) chunks as read by iter_log_chunks into one
+        log, converting each column straight into its compact type.
+        """
+        if not chunks:
+            return cls(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32),
+                       np.empty(0, dtype=np.int8))
+
+        timestamps, xs, ys, clicked = zip(*chunks)
+        coordinate_dtype = get_coordinate_dtype(*xs, *ys)
+        return cls(np.concatenate(timestamps, dtype=np.int64),
+                   np.concatenate(xs, dtype=coordinate_dtype, casting="same_kind"),
+                   np.concatenate(ys, dtype=coordinate_dtype, casting="same_kind"),
+                   np.concatenate(clicked, dtype=np.int8, casting="same_kind"))
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return CursorLog(self.timestamps[index], self.xs[index], self.ys[index], self.clicked[index])
+        return CursorSample(int(self.timestamps[index]), int(self.xs[index]), int(self.ys[index]), int(self.clicked[index]))
+
+    def __iter__(self):
+        # Converted a block at a time, so iterating does not pay NumPy's per-element indexing
+        for start in range(0, len(self), 4096):
+            block = slice(start, start + 4096)
+            for timestamp, x, y, clicked in zip(self.timestamps[block].tolist(), self.xs[block].tolist(),
+                                                self.ys[block].tolist(), self.clicked[block].tolist()):
+                yield CursorSample(timestamp, x, y, clicked)
+
+    @property
+    def nbytes(self) -> int:
+        return self.timestamps.nbytes + self.xs.nbytes + self.ys.nbytes + self.clicked.nbytes
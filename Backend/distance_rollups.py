@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+HOURLY = "hourly"
+DAILY = "daily"
+HOUR_FORMAT = "%Y-%m-%d %H:00:00"
+DAY_FORMAT = "%Y-%m-%d"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+DEFAULT_COMPACTION_DAYS = 30            # Session entries and hourly totals older than this only live on in the daily totals
+
+
+def get_hour_key(timestamp: str) -> str:
+    # Timestamps are "%Y-%m-%d %H:%M:%S", so the buckets are prefixes of them
+    return timestamp[:13] + ":00:00"
+
+
+def get_day_key(timestamp: str) -> str:
+    return timestamp[:10]
+
+
+def make_rollups(entries: list[dict] = ()) -> dict:
+    """
+    Totals the session_total_distance entries of a profile per hour and per day.
+
+    Returns:
+        dict: {"hourly": {hour: total}, "daily": {day: total}} keyed by HOUR_FORMAT
+        and DAY_FORMAT strings.
+    """
+    rollups = {HOURLY: {}, DAILY: {}}
+    for entry in entries:
+        add_to_rollups(rollups, entry)
+    return rollups
+
+
+def add_to_rollups(rollups: dict, entry: dict) -> None:
+    for period, key in ((HOURLY, get_hour_key(entry["timestamp"])), (DAILY, get_day_key(entry["timestamp"]))):
+        rollups[period][key] = rollups[period].get(key, 0) + entry["total_distance"]
+
+
+def get_rollups(profile: dict) -> dict:
+    # Profiles from ProfileHandler carry their rollups; others (older files, hand-made dicts) are totaled here
+    rollups = profile.get("session_distance_rollups")
+    if rollups is None:
+        rollups = make_rollups(profile["session_total_distance"])
+    return rollups
+
+
+def get_compaction_cutoff(compaction_days: int, now: datetime = None) -> str:
+    return ((now or datetime.now()) - timedelta(days=compaction_days)).strftime(TIMESTAMP_FORMAT)
+
+
+def compact_profile(profile: dict, cutoff: str) -> bool:
+    """
+    Drops the session entries older than cutoff, and the hourly totals of hours
+    that ended before it. Their distances stay in the daily totals.
+
+    Returns:
+        bool: Whether anything was dropped.
+    """
+    entries = profile["session_total_distance"]
+    hourly = profile["session_distance_rollups"][HOURLY]
+    cutoff_hour = get_hour_key(cutoff)
+
+    # Entries are appended in time order, so there is nothing to drop unless the oldest one is too old
+    old_entries = bool(entries) and entries[0]["timestamp"] < cutoff
+    old_hours = bool(hourly) and next(iter(hourly)) < cutoff_hour
+    if not (old_entries or old_hours):
+        return False
+
+    profile["session_total_distance"] = [entry for entry in entries if entry["timestamp"] >= cutoff]
+    profile["session_distance_rollups"][HOURLY] = {hour: total for hour, total in hourly.items() if hour >= cutoff_hour}
+    return True
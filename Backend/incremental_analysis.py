@@ -0,0 +1,281 @@
+import os
+import csv
+import json
+import hashlib
+import numpy as np
+from Backend.analysis_cache import get_analysis_parameters, get_hash
+from Backend.analyze_module import LOAD_CHUNK_SIZE
+from Backend.session_log import is_binary_log, read_binary_log, HEADER_STRUCT, RECORD_DTYPE, FLAG_CLICKED
+from Backend.streaming_analysis import StreamingAnalyzer
+from Backend.validation_module import StreamingValidator, ValidationError
+
+CHECKPOINT_VERSION = 2                  # Bump whenever the checkpoint contents change
+FINGERPRINT_BYTES = 4096                # Bytes at the start and before the checkpoint that must not change
+
+
+class TailValidationError(Exception):
+    """A ValidationError while feeding a log, with the byte offset up to which the log was read."""
+
+    def __init__(self, message: str, byte_offset: int) -> None:
+        super().__init__(message)
+        self.byte_offset = byte_offset
+
+
+def get_fingerprint(log_file: str, byte_offset: int, whole: bool = False) -> str:
+    # The start of the log and the bytes just before the checkpoint; an appended log keeps both
+    with open(log_file, "rb") as file:
+        if whole:
+            # Every byte up to the checkpoint, for checkpoints that must notice any change (see make_checkpoint)
+            return hashlib.sha256(file.read(byte_offset)).hexdigest()
+        head = file.read(min(byte_offset, FINGERPRINT_BYTES))
+        file.seek(max(byte_offset - FINGERPRINT_BYTES, 0))
+        before = file.read(byte_offset - max(byte_offset - FINGERPRINT_BYTES, 0))
+    return hashlib.sha256(head + before).hexdigest()
+
+
+def get_parameters_hash(screen_width: int, screen_height: int) -> str:
+    return get_hash({"parameters": get_analysis_parameters(), "screen": [screen_width, screen_height]})
+
+
+def make_checkpoint(log_file: str, screen_width: int, screen_height: int, byte_offset: int, validator, analyzer,
+                    error: str = None) -> dict:
+    """
+    Captures the analysis of the first byte_offset bytes of a log, as JSON values.
+
+    The state holds everything the validator and the analyzer carry between
+    chunks (see their get_state): the last validated sample and the
+    validation summary, the open pause run, the last click time, clicks
+    waiting for their next sample, the cumulative distance, the points still
+    needed and the results so far. error is set when the validation failed
+    for good, in which case only the validator's state is kept; such a
+    checkpoint covers the bytes up to and including the invalid chunk, and
+    its fingerprint covers all of them, so that fixing the log anywhere makes
+    it stale.
+    """
+    return {
+        "version": CHECKPOINT_VERSION,
+        "log_file": os.path.abspath(log_file),
+        "parameters": get_parameters_hash(screen_width, screen_height),
+        "byte_offset": byte_offset,
+        "fingerprint": get_fingerprint(log_file, byte_offset, whole=error is not None),
+        "sample_count": analyzer.sample_count if analyzer is not None else None,
+        "error": error,
+        "state": {
+            "validator": validator.get_state(),
+            "analyzer": analyzer.get_state() if error is None else None
+        }
+    }
+
+
+def is_checkpoint_usable(checkpoint: dict, log_file: str, screen_width: int, screen_height: int) -> bool:
+    # The log must be the same file, only appended to, and analyzed with the same settings
+    return (checkpoint is not None
+            and checkpoint.get("version") == CHECKPOINT_VERSION
+            and checkpoint["log_file"] == os.path.abspath(log_file)
+            and checkpoint["parameters"] == get_parameters_hash(screen_width, screen_height)
+            and os.path.getsize(log_file) >= checkpoint["byte_offset"]
+            and get_fingerprint(log_file, checkpoint["byte_offset"], whole=checkpoint["error"] is not None)
+            == checkpoint["fingerprint"])
+
+
+def feed_binary_tail(log_file: str, byte_offset: int, validator, analyzer, chunk_size: int) -> int:
+    _, records = read_binary_log(log_file)
+    first_record = max(byte_offset - HEADER_STRUCT.size, 0) // RECORD_DTYPE.itemsize
+
+    for start in range(first_record, len(records), chunk_size):
+        chunk = records[start:start + chunk_size]
+        columns = (chunk["t_ns"].astype(np.int64), chunk["x"].astype(np.int64), chunk["y"].astype(np.int64),
+                   (chunk["flags"] & FLAG_CLICKED).astype(np.int8))
+        try:
+            validator.feed(*columns[:3])
+        except ValidationError as e:
+            raise TailValidationError(str(e), HEADER_STRUCT.size + (start + len(chunk)) * RECORD_DTYPE.itemsize) from e
+        analyzer.feed(*columns)
+
+    # A partial record at the end is left for the next run
+    return HEADER_STRUCT.size + len(records) * RECORD_DTYPE.itemsize
+
+
+def feed_csv_tail(log_file: str, byte_offset: int, validator, analyzer, chunk_size: int):
+    """
+    Feeds the complete lines after byte_offset.
+
+    Returns:
+        tuple: (byte offset after the last complete line, the row of an unfinished last line or None)
+    """
+    rows = []
+    partial_row = None
+
+    with open(log_file, "rb") as file:
+        file.seek(byte_offset)
+        for line in file:
+            # A line without its line break is still being written
+            if not line.endswith(b"\n"):
+                row = next(csv.reader([line.decode()]), [])
+                if byte_offset > 0 and len(row) == 4:
+                    partial_row = row
+                break
+
+            first_line = byte_offset == 0
+            byte_offset += len(line)
+            if first_line:
+                continue # Skip the first row (header)
+
+            row = next(csv.reader([line.decode()]), [])
+            if len(row) != 4:
+                continue
+
+            rows.append(row)
+            if len(rows) == chunk_size:
+                feed_rows(rows, validator, analyzer, byte_offset)
+                rows = []
+
+    if rows:
+        feed_rows(rows, validator, analyzer, byte_offset)
+    return byte_offset, partial_row
+
+
+def feed_rows(rows: list, validator, analyzer, byte_offset: int = None) -> None:
+    # byte_offset is where the rows end in the log, reported if they are invalid
+    try:
+        timestamps, x, y, clicked = validator.parse_rows(rows)
+        validator.feed(timestamps, x, y)
+    except ValidationError as e:
+        if byte_offset is None:
+            raise
+        raise TailValidationError(str(e), byte_offset) from e
+    analyzer.feed(timestamps, x, y, clicked)
+
+
+def resume_analysis(log_file: str, screen_width: int, screen_height: int, checkpoint: dict = None,
+                    chunk_size: int = LOAD_CHUNK_SIZE) -> tuple:
+    """
+    Validates and analyzes a session log, starting from a checkpoint of an earlier run if it still applies.
+
+    Only the part of the log written after the checkpoint is read. A checkpoint
+    of another log, of a log that was rewritten rather than appended to, or of
+    other analysis settings is ignored and the log is analyzed from the start.
+
+    Returns:
+        tuple: (validator, analyzer, error, checkpoint). Unless error is set the
+        analyzer is finished; validator.get_summary() is the validation summary
+        either way. checkpoint is to be passed to the next run.
+    """
+    validator = analyzer = None
+    if is_checkpoint_usable(checkpoint, log_file, screen_width, screen_height):
+        try:
+            validator = StreamingValidator.from_state(checkpoint["state"]["validator"])
+            if checkpoint["error"] is None:
+                analyzer = StreamingAnalyzer.from_state(checkpoint["state"]["analyzer"])
+        except (KeyError, TypeError, ValueError):
+            # Written by a version that kept other state; the log is read from the start
+            validator = analyzer = None
+
+        if validator is not None and checkpoint["error"] is not None:
+            # The part already read is invalid, and appending to it cannot change that
+            return validator, None, checkpoint["error"], checkpoint
+
+    if analyzer is not None:
+        byte_offset = checkpoint["byte_offset"]
+    else:
+        validator = StreamingValidator(screen_width, screen_height)
+        analyzer = StreamingAnalyzer()
+        byte_offset = 0
+
+    partial_row = None
+    try:
+        if is_binary_log(log_file):
+            byte_offset = feed_binary_tail(log_file, byte_offset, validator, analyzer, chunk_size)
+        else:
+            byte_offset, partial_row = feed_csv_tail(log_file, byte_offset, validator, analyzer, chunk_size)
+    except TailValidationError as e:
+        if e.byte_offset == 0:
+            return validator, None, str(e), checkpoint
+        return validator, None, str(e), make_checkpoint(log_file, screen_width, screen_height, e.byte_offset,
+                                                         validator, None, str(e))
+    except Exception as e:
+        # The log could not be read this time; the old checkpoint still holds
+        return validator, None, str(e), checkpoint
+
+    # The checkpoint is taken before finishing, since finishing closes the open pause and the waiting clicks
+    checkpoint = make_checkpoint(log_file, screen_width, screen_height, byte_offset, validator, analyzer)
+
+    try:
+        # An unfinished last line counts for this result, like it does for AnalyzeModule
+        if partial_row is not None:
+            feed_rows([partial_row], validator, analyzer)
+        validator.finish()
+    except Exception as e:
+        return validator, None, str(e), checkpoint
+
+    analyzer.finish()
+    return validator, analyzer, None, checkpoint
+
+
+def analyze_incrementally(log_file: str, screen_width: int, screen_height: int, checkpoint: dict = None,
+                          chunk_size: int = LOAD_CHUNK_SIZE):
+    """
+    Like resume_analysis, but with only the analysis result.
+
+    Returns:
+        tuple: (result, checkpoint) where result is the same as analyze_log_in_chunks
+        (the dict of AnalyzeModule.analyze_tracking_data, or {"error": ...}) and
+        checkpoint is to be passed to the next run.
+    """
+    _, analyzer, error, checkpoint = resume_analysis(log_file, screen_width, screen_height, checkpoint, chunk_size)
+    if error is not None:
+        return {"error": error}, checkpoint
+    return analyzer.get_result(), checkpoint
+
+
+class CheckpointStore:
+    """
+    Keeps the latest checkpoint of every analyzed log on disk, one file per
+    log and screen size (Backend/storage/checkpoints unless another directory
+    is given).
+    """
+
+    def __init__(self, checkpoint_dir: str = None) -> None:
+        current_dir = os.path.dirname(os.path.realpath(__file__))
+        self.checkpoint_dir = checkpoint_dir or os.path.join(current_dir, "storage", "checkpoints")
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+
+    def get(self, log_file: str, screen_width: int, screen_height: int) -> dict:
+        try:
+            with open(self.__get_checkpoint_file(log_file, screen_width, screen_height), "r") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, log_file: str, screen_width: int, screen_height: int, checkpoint: dict) -> None:
+        # Write to a temporary file first so a crash never leaves a half-written checkpoint behind
+        path = self.__get_checkpoint_file(log_file, screen_width, screen_height)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump(checkpoint, file)
+        os.replace(temp_path, path)
+
+    def resume(self, log_file: str, screen_width: int, screen_height: int, chunk_size: int = LOAD_CHUNK_SIZE) -> tuple:
+        """
+        Runs resume_analysis from the stored checkpoint and stores the new one.
+
+        Returns:
+            tuple: (validator, analyzer, error) as returned by resume_analysis.
+        """
+        checkpoint = self.get(log_file, screen_width, screen_height)
+        validator, analyzer, error, new_checkpoint = resume_analysis(log_file, screen_width, screen_height, checkpoint,
+                                                                     chunk_size)
+        if new_checkpoint is not checkpoint:
+            self.put(log_file, screen_width, screen_height, new_checkpoint)
+        return validator, analyzer, error
+
+    def analyze(self, log_file: str, screen_width: int, screen_height: int, chunk_size: int = LOAD_CHUNK_SIZE) -> dict:
+        """Like resume, but returns the same as analyze_incrementally's result."""
+        _, analyzer, error = self.resume(log_file, screen_width, screen_height, chunk_size)
+        if error is not None:
+            return {"error": error}
+        return analyzer.get_result()
+
+    def __get_checkpoint_file(self, log_file: str, screen_width: int, screen_height: int) -> str:
+        key = get_hash([os.path.abspath(log_file), screen_width, screen_height])
+        return os.path.join(self.checkpoint_dir, f"{key}.json")
@@ -0,0 +1,154 @@
+import time
+import cProfile
+import tracemalloc
+
+# Stage names used by AnalyzeModule and DPICalculationModule
+LOAD_STAGE = "load"
+VALIDATE_FEED_STAGE = "validate_feed"
+VALIDATE_FINISH_STAGE = "validate_finish"
+PAUSE_SEGMENTS_STAGE = "get_pause_segments"
+END_POINTS_STAGE = "find_end_points"
+SEGMENTS_STAGE = "analyze_all_segment"
+TOTAL_DISTANCE_STAGE = "get_total_distance"
+CALCULATE_DPI_STAGE = "calculate_dpi"
+
+
+class _NullStage:
+    # Shared by every stage while instrumentation is off; setting items on it is harmless
+    __slots__ = ("items",)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+class NullInstrumentation:
+    """
+    Stand-in used when instrumentation is off. stage() hands out one shared
+    context manager that does nothing, so instrumented code pays a method
+    call per stage and nothing else.
+    """
+
+    enabled = False
+
+    def __init__(self) -> None:
+        self.__stage = _NullStage()
+
+    def stage(self, name: str):
+        return self.__stage
+
+
+NO_INSTRUMENTATION = NullInstrumentation()
+
+
+class _Stage:
+    __slots__ = ("instrumentation", "name", "items", "wall_start", "cpu_start", "memory_start", "memory_peak")
+
+    def __init__(self, instrumentation, name: str) -> None:
+        self.instrumentation = instrumentation
+        self.name = name
+        self.items = None           # Set inside the with block to report how many items the stage handled
+
+    def __enter__(self):
+        self.instrumentation._enter(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.instrumentation._exit(self)
+        return False
+
+
+class Instrumentation:
+    """
+    Records wall time, CPU time, peak traced memory and item counts per stage.
+
+    Pass an instance as the instrumentation argument of AnalyzeModule or
+    DPICalculationModule (or AnalysisWorker). A stage that runs more than once
+    (validate_feed runs once per chunk) is accumulated: times and item counts
+    add up, the peak is the largest of all runs. Stages can be nested, and a
+    stage's numbers include its nested stages (load includes validate_feed).
+
+    Peak memory is measured with tracemalloc, which is started for the duration
+    of the outermost stage unless it is already running. With profile=True every
+    stage also runs under cProfile, and dump_stats() writes a pstats file.
+    """
+
+    enabled = True
+
+    def __init__(self, trace_memory: bool = True, profile: bool = False) -> None:
+        self.__trace_memory = trace_memory
+        self.__profiler = cProfile.Profile() if profile else None
+        self.__stages = {}                  # Stage name -> record, in the order the stages first ran
+        self.__open = []                    # Stages currently running, innermost last
+        self.__started_tracemalloc = False
+
+    def stage(self, name: str):
+        return _Stage(self, name)
+
+    def _enter(self, stage) -> None:
+        if not self.__open:
+            if self.__trace_memory and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.__started_tracemalloc = True
+            if self.__profiler is not None:
+                self.__profiler.enable()
+
+        if self.__trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # The peak is reset for the new stage, so the enclosing stage keeps what it reached so far
+            if self.__open:
+                self.__open[-1].memory_peak = max(self.__open[-1].memory_peak, peak)
+            tracemalloc.reset_peak()
+            stage.memory_start = current
+            stage.memory_peak = current
+
+        self.__stages.setdefault(stage.name, {
+            "stage": stage.name, "calls": 0, "wall_time": 0.0, "cpu_time": 0.0, "peak_memory": 0, "items": None
+        })
+        self.__open.append(stage)
+        stage.cpu_start = time.process_time()
+        stage.wall_start = time.perf_counter()
+
+    def _exit(self, stage) -> None:
+        wall_time = time.perf_counter() - stage.wall_start
+        cpu_time = time.process_time() - stage.cpu_start
+        self.__open.pop()
+
+        peak_memory = 0
+        if self.__trace_memory:
+            peak = max(tracemalloc.get_traced_memory()[1], stage.memory_peak)
+            peak_memory = peak - stage.memory_start
+            if self.__open:
+                self.__open[-1].memory_peak = max(self.__open[-1].memory_peak, peak)
+
+        record = self.__stages[stage.name]
+        record["calls"] += 1
+        record["wall_time"] += wall_time
+        record["cpu_time"] += cpu_time
+        record["peak_memory"] = max(record["peak_memory"], peak_memory)
+        if stage.items is not None:
+            record["items"] = (record["items"] or 0) + stage.items
+
+        if not self.__open:
+            if self.__profiler is not None:
+                self.__profiler.disable()
+            if self.__started_tracemalloc:
+                tracemalloc.stop()
+                self.__started_tracemalloc = False
+
+    def get_report(self) -> dict:
+        """
+        Returns:
+            dict: 'stages' is a list with one dict per stage (stage, calls,
+            wall_time and cpu_time in seconds, peak_memory in bytes above the
+            memory in use when the stage started, items or None).
+        """
+        return {"stages": [dict(record) for record in self.__stages.values()]}
+
+    def dump_stats(self, file_path: str) -> None:
+        # Written in the pstats format, e.g. for python -m pstats or snakeviz
+        if self.__profiler is None:
+            raise ValueError("Profiling was not enabled for this instrumentation")
+        self.__profiler.dump_stats(file_path)
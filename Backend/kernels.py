@@ -0,0 +1,178 @@
+import math
+import numpy as np
+
+# Numba is optional; without it the same functions run as plain Python/NumPy with identical results
+try:
+    import numba
+except ImportError:
+    numba = None
+
+HAVE_NUMBA = numba is not None
+
+SEGMENT_WINDOW = 25                     # Samples between the two points compared when walking back from a click
+TRACE_PAUSE_THRESHOLD = 15              # Points at most 15 pixels apart are skipped as paused when walking back
+OVERSHOOT_ANGLE = 130                   # A turn of at least 130 degrees is an overshoot
+START_ANGLE = 30                        # A turn of more than 30 degrees is where the movement started
+NO_INDEX = -1                           # Stands in for None inside the kernels
+
+
+def jit(function):
+    # Compiles the function to machine code when Numba is installed; the original stays available as .py_func
+    if numba is None:
+        return function
+    return numba.njit(cache=True)(function)
+
+
+@jit
+def get_angle_from_delta(dx, dy):
+    angle = math.atan2(dy, dx) * (180 / math.pi)
+    if (angle < 0):
+        angle += 360
+    return angle
+
+
+@jit
+def angle_diff(a1, a2):
+    diff = abs(a1 - a2)
+    if diff > 180:
+        diff = 360 - diff
+    return diff
+
+
+@jit
+def is_paused(dx, dy):
+    distance = math.sqrt(dx**2 + dy**2)
+    within_threshold = distance <= TRACE_PAUSE_THRESHOLD
+    return within_threshold
+
+
+@jit
+def trace_segment_kernel(xs, ys, end_position, prev_click_point, offset):
+    """
+    The backward scan of analyze_module.trace_segment on integer arrays.
+
+    Returns:
+        tuple: (start_index, end_index, OS_index) with NO_INDEX for no overshoot.
+    """
+    i = 0                                               # Pointer for the nearer cursor data
+    j = SEGMENT_WINDOW                                  # Pointer for further cursor data
+    has_slope_before = False                            # To compare two slopes
+    slope_before = 0.0
+    overshoot_flag = False                              # Detect overshoot existence
+    start_index = NO_INDEX
+    OS_index = NO_INDEX
+
+    # Remove consecutive identical coordinates at the end of the segment (where the cursor was stationary)
+    while (end_position > 0 and xs[end_position - offset] == xs[end_position - 1 - offset]
+           and ys[end_position - offset] == ys[end_position - 1 - offset]):
+        end_position -= 1
+
+    # Boundary check to prevent negative index
+    while end_position >= j:
+        # Boundary check to prevent duplicate starting points
+        if prev_click_point < end_position - j:
+            dx = int(xs[end_position - j - offset]) - int(xs[end_position - i - offset])
+            dy = int(ys[end_position - j - offset]) - int(ys[end_position - i - offset])
+
+            # Check for pause points, and disregard these points
+            if is_paused(dx, dy):
+                i += 1
+                j += 1
+                continue
+
+            slope_now = get_angle_from_delta(dx, dy)
+
+            if has_slope_before:
+                # Check if the slope abruptly changes (meaning that the cursor is overshooting)
+                if not overshoot_flag:
+                    if OVERSHOOT_ANGLE <= angle_diff(slope_before, slope_now):
+                        overshoot_flag = True
+                        OS_index = (end_position - i)
+                        slope_before = slope_now
+                        i += SEGMENT_WINDOW
+                        j += SEGMENT_WINDOW
+                        continue
+
+                # If the angle diff is more than START_ANGLE, the system identifies the second latest cursor data point as the start point for the corresponding endpoint
+                if angle_diff(slope_before, slope_now) > START_ANGLE:
+                    start_index = (end_position - i)
+                    break
+
+            # Update the slope before the next iteration
+            has_slope_before = True
+            slope_before = slope_now
+            i += SEGMENT_WINDOW
+            j += SEGMENT_WINDOW
+
+        # If goes beyond boundary save analyzed start_index for the segment
+        else:
+            start_index = (end_position - i)
+            break
+
+    # If index becomes negative, the start_index of the segment is 0
+    if end_position < j:
+        start_index = 0
+
+    return start_index, end_position, OS_index
+
+
+@jit
+def _find_pause_runs_loop(xs, ys, timestamps, threshold, min_duration_ns):
+    count = len(xs)
+    starts = np.empty(count, dtype=np.int64)
+    ends = np.empty(count, dtype=np.int64)
+    found = 0
+
+    run_start = NO_INDEX
+    for k in range(count):
+        # Step k goes from point k to point k + 1; the last point closes any open run
+        within = False
+        if k < count - 1:
+            dx = np.int64(xs[k + 1]) - np.int64(xs[k])
+            dy = np.int64(ys[k + 1]) - np.int64(ys[k])
+            within = math.sqrt(dx * dx + dy * dy) <= threshold
+
+        if within:
+            if run_start == NO_INDEX:
+                run_start = k
+        elif run_start != NO_INDEX:
+            # A pause must last long enough, except for a final pause at the end of the data
+            if timestamps[k] - timestamps[run_start] > min_duration_ns or k == count - 1:
+                starts[found] = run_start
+                ends[found] = k
+                found += 1
+            run_start = NO_INDEX
+
+    return starts[:found], ends[:found]
+
+
+def _find_pause_runs_numpy(xs, ys, timestamps, threshold, min_duration_ns):
+    dx = np.subtract(xs[1:], xs[:-1], dtype=np.int64)
+    dy = np.subtract(ys[1:], ys[:-1], dtype=np.int64)
+    within_threshold = np.sqrt(dx * dx + dy * dy) <= threshold
+
+    # Runs of consecutive within-threshold steps; step k goes from point k to point k + 1,
+    # so a run of steps [start, end) covers the points start..end
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], within_threshold, [False])).astype(np.int8)))
+    run_starts = edges[0::2]
+    run_ends = edges[1::2]
+
+    # A pause must last long enough, except for a final pause at the end of the data
+    long_enough = (timestamps[run_ends] - timestamps[run_starts] > min_duration_ns) | (run_ends == len(xs) - 1)
+    return run_starts[long_enough], run_ends[long_enough]
+
+
+def find_pause_runs(xs: np.ndarray, ys: np.ndarray, timestamps: np.ndarray, threshold, min_duration_ns: int):
+    """
+    Finds the runs of points where each step moves at most threshold pixels.
+
+    Returns:
+        tuple: (starts, ends) int64 arrays with the first and last point of every pause.
+    """
+    if len(xs) < 2:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    # The loop only pays off compiled; without Numba the vectorized version is faster
+    if HAVE_NUMBA:
+        return _find_pause_runs_loop(xs, ys, timestamps, float(threshold), min_duration_ns)
+    return _find_pause_runs_numpy(xs, ys, timestamps, threshold, min_duration_ns)
@@ -0,0 +1,158 @@
+import os
+import csv
+import time
+import queue
+import threading
+
+
+# Durability modes for SessionLogWriter
+FLUSH_EACH_BATCH = "batch"       # Flush Python's buffer to the OS after every batch
+FSYNC_PERIODIC = "periodic"      # Flush every batch and fsync at a fixed interval
+FSYNC_ON_CLOSE = "close"         # Keep everything buffered, flush and fsync only on close
+
+DURABILITY_MODES = (FLUSH_EACH_BATCH, FSYNC_PERIODIC, FSYNC_ON_CLOSE)
+
+
+class SessionLogWriter:
+    """
+    Writes session log rows from a dedicated background thread.
+
+    The sampler hands rows over through a bounded queue with write(), so the
+    caller never touches the file. The writer keeps the file handle open for
+    the whole session and writes rows in batches, either when batch_size rows
+    are waiting or when flush_interval seconds have passed.
+
+    Args:
+        log_file (str): Path of the log file. It is created (truncated) on init.
+        header (list): Optional header row written synchronously on init.
+        batch_size (int): Number of rows that triggers a batch write.
+        flush_interval (float): Maximum seconds a row may wait before being written.
+        durability (str): One of FLUSH_EACH_BATCH, FSYNC_PERIODIC, FSYNC_ON_CLOSE.
+        fsync_interval (float): Seconds between fsyncs in FSYNC_PERIODIC mode.
+        max_queue_size (int): Capacity of the queue between sampler and writer.
+    """
+
+    _STOP = object()
+
+    def __init__(self, log_file: str, header: list = None, batch_size: int = 100, flush_interval: float = 1.0,
+                 durability: str = FLUSH_EACH_BATCH, fsync_interval: float = 5.0, max_queue_size: int = 10000) -> None:
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+
+        self.log_file = log_file
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.durability = durability
+        self.fsync_interval = fsync_interval
+        self.dropped_rows = 0   # Rows rejected because the queue was full
+        self.__error = None
+
+        self.__queue = queue.Queue(maxsize=max_queue_size)
+        self._file = self._open_file()
+        self.__last_fsync = time.monotonic()
+
+        # The header is written synchronously so the file is valid right away
+        if header is not None:
+            self._write_header(header)
+            self._file.flush()
+
+        self.__thread = threading.Thread(target=self.__run, name="SessionLogWriter", daemon=True)
+        self.__thread.start()
+
+    def _open_file(self):
+        file = open(self.log_file, "w", newline='')
+        self._csv_writer = csv.writer(file)
+        return file
+
+    def _write_header(self, header) -> None:
+        self._csv_writer.writerow(header)
+
+    def _write_rows(self, rows: list) -> None:
+        self._csv_writer.writerows(rows)
+
+    def write(self, row) -> bool:
+        """
+        Queues one row for writing. Never blocks the caller.
+
+        Returns:
+            bool: False if the writer is closed or the queue is full (the row is dropped).
+        """
+        if self._file is None:
+            return False
+        try:
+            self.__queue.put_nowait(row)
+            return True
+        except queue.Full:
+            self.dropped_rows += 1
+            return False
+
+    def close(self) -> None:
+        """Writes every queued row, flushes (and fsyncs if required) and closes the file."""
+        if self._file is None:
+            return
+
+        self.__queue.put(self._STOP)
+        self.__thread.join()
+
+        try:
+            self._file.flush()
+            if self.durability in (FSYNC_PERIODIC, FSYNC_ON_CLOSE):
+                os.fsync(self._file.fileno())
+        finally:
+            self._file.close()
+            self._file = None
+
+    def is_closed(self) -> bool:
+        return self._file is None
+
+    def handle_error(self) -> dict:
+        if self.__error:
+            return {"error": self.__error}
+        else:
+            return {}
+
+    def __run(self) -> None:
+        batch = []
+        batch_started = None
+        stopping = False
+
+        while not stopping:
+            # Wait for the next row, but never longer than the flush deadline of the current batch
+            if batch_started is None:
+                timeout = None
+            else:
+                timeout = max(0.0, self.flush_interval - (time.monotonic() - batch_started))
+
+            try:
+                row = self.__queue.get(timeout=timeout)
+                if row is self._STOP:
+                    stopping = True
+                else:
+                    batch.append(row)
+                    if batch_started is None:
+                        batch_started = time.monotonic()
+            except queue.Empty:
+                pass
+
+            if not batch:
+                continue
+
+            if stopping or len(batch) >= self.batch_size or time.monotonic() - batch_started >= self.flush_interval:
+                self.__write_batch(batch)
+                batch = []
+                batch_started = None
+
+    def __write_batch(self, batch: list) -> None:
+        try:
+            self._write_rows(batch)
+
+            if self.durability in (FLUSH_EACH_BATCH, FSYNC_PERIODIC):
+                self._file.flush()
+
+            if self.durability == FSYNC_PERIODIC and time.monotonic() - self.__last_fsync >= self.fsync_interval:
+                os.fsync(self._file.fileno())
+                self.__last_fsync = time.monotonic()
+
+        except Exception as e:
+            # Keep draining the queue so the sampler never blocks; report the failure later
+            self.__error = f"Error writing log file: {str(e)}"
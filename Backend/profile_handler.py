@@ -1,6 +1,8 @@
 import os
-import json
 from datetime import datetime
+from Backend.profile_storage import DEFAULT_BACKEND, DEFAULT_SAVE_DELAY, open_profile_storage
+from Backend.distance_rollups import (DEFAULT_COMPACTION_DAYS, make_rollups, add_to_rollups, compact_profile,
+                                      get_compaction_cutoff)
 
 
 def is_alphanumeric(char: str) -> bool:
@@ -16,26 +18,44 @@ def format_timestamp(timestamp: str) -> str:
 
 
 class ProfileHandler:
-    def __init__(self):
-        self.__profiles = []
-
+    def __init__(self, storage_dir: str = None, backend: str = DEFAULT_BACKEND, save_delay: float = DEFAULT_SAVE_DELAY,
+                 compaction_days: int = DEFAULT_COMPACTION_DAYS):
         current_dir = os.path.dirname(os.path.realpath(__file__))
 
-        self.__storage_dir = os.path.join(current_dir, "storage")
-        self.__profiles_file = os.path.join(self.__storage_dir, "profiles.json")
+        # Backend/storage unless another directory is given
+        self.__storage_dir = storage_dir or os.path.join(current_dir, "storage")
         
         # Create storage directory if it doesn't exist
         os.makedirs(self.__storage_dir, exist_ok=True)
         
-        # Load profiles from the file if it exists  
-        if os.path.exists(self.__profiles_file):
-            with open(self.__profiles_file, "r") as file:
-                self.__profiles = json.load(file)
+        # SQLite by default; an existing profiles.json is moved into the database on first use
+        self.__storage = open_profile_storage(self.__storage_dir, backend, save_delay)
+        self.__compaction_days = compaction_days    # None keeps every session entry
+        self.__profiles = []
+        self.__load_profiles()
 
-        # If file doesn't exist, create the file of an empty list
-        else:
-            with open(self.__profiles_file, "w") as file:
-                json.dump([], file, indent=4)
+    def __load_profiles(self) -> None:
+        # Refilled in place, since get_profiles hands out this list
+        self.__profiles[:] = self.__storage.load()
+
+        # Lookups by _id and by name; every change to the profiles keeps them up to date
+        self.__profiles_by_id = {profile['_id']: profile for profile in self.__profiles}
+        self.__profiles_by_name = {profile['name']: profile for profile in self.__profiles}
+
+        for profile in self.__profiles:
+            # Profiles saved before there were rollups get them from their session entries
+            if 'session_distance_rollups' not in profile:
+                profile['session_distance_rollups'] = make_rollups(profile['session_total_distance'])
+            self.__compact(profile)
+
+    def __compact(self, profile: dict) -> None:
+        # Session entries older than the horizon are dropped; their distances stay in the daily rollups
+        if self.__compaction_days is None:
+            return
+
+        cutoff = get_compaction_cutoff(self.__compaction_days)
+        if compact_profile(profile, cutoff):
+            self.__storage.session_distances_compacted(self.__profiles, profile, cutoff)
 
     def create_profile(self, name: str, initialDPI: str) -> dict:
         try:
@@ -68,9 +88,8 @@ class ProfileHandler:
                 raise ValueError("Initial DPI must be between 100 and 3200")
                 
             # Check if profile name already exists
-            for profile in self.__profiles:
-                if profile['name'] == name:
-                    raise ValueError("Profile already exists")
+            if name in self.__profiles_by_name:
+                raise ValueError("Profile already exists")
         
             # Check if there is at most 8 profiles
             if len(self.__profiles) >= 8:
@@ -91,87 +110,93 @@ class ProfileHandler:
         new_profile['DPI'] = initialDPI
         new_profile['DPI_history'] = [{"timestamp": get_current_timestamp(), "DPI": initialDPI}]
         new_profile['session_total_distance'] = []
-        self.__profiles.append(new_profile)
-
-        with open(self.__profiles_file, "w") as file:
-            json.dump(self.__profiles, file, indent=4)
+        new_profile['session_distance_rollups'] = make_rollups()
+        # The storage may be saving from another thread, so changes are made under its lock
+        with self.__storage.lock:
+            self.__profiles.append(new_profile)
+            self.__profiles_by_id[new_profile['_id']] = new_profile
+            self.__profiles_by_name[name] = new_profile
+            self.__storage.profile_created(self.__profiles, new_profile)
 
         return {"message": "Profile created successfully", "profile": self.__profiles[-1]}
     
     def delete_profile(self, name: str) -> dict:
-        for profile in self.__profiles:
-            if profile['name'] == name:
-                self.__profiles.remove(profile)
+        profile = self.__profiles_by_name.get(name)
+        if profile is None:
+            return {"error": "Profile not found"}
 
-                with open(self.__profiles_file, "w") as file:
-                    json.dump(self.__profiles, file, indent=4)
+        with self.__storage.lock:
+            self.__profiles.remove(profile)
+            del self.__profiles_by_id[profile['_id']]
+            del self.__profiles_by_name[name]
+            self.__storage.profile_deleted(self.__profiles, profile)
 
-                return {"message": "Profile deleted successfully"}
-            
-        return {"error": "Profile not found"}
+        return {"message": "Profile deleted successfully"}
         
     def refresh_profile(self, profile_id: int) -> dict:
-        if not os.path.exists(self.__profiles_file):
-            return {"error": "Profile storage file not found"}
-
-        with open(self.__profiles_file, "r") as file:
-            latest_profiles = json.load(file)
+        # Served from memory unless another process changed the stored profiles
+        if self.__storage.has_external_changes():
+            with self.__storage.lock:
+                self.__load_profiles()
 
-        for profile in latest_profiles:
-            if profile["_id"] == profile_id:
-                return profile
+        profile = self.__profiles_by_id.get(profile_id)
+        if profile is None:
+            return {"error": "Profile not found"}
 
-        return {"error": "Profile not found"}
+        return profile
 
     
     def get_profiles(self):
         return self.__profiles
     
     def find_profile(self, name: str) -> dict:
-        for profile in self.__profiles:
-            if profile['name'] == name:
-                return profile
-        return {"error": "Profile not found"}
+        return self.__profiles_by_name.get(name, {"error": "Profile not found"})
     
     def update_profile_dpi(self, name: str, new_dpi: int) -> dict:
-        for profile in self.__profiles:
-            if profile['name'] == name:
-                # Check if new_dpi is between 100 and 3200
-                if not (100 <= new_dpi <= 3200):
-                    raise ValueError("New DPI must be between 100 and 3200")
+        profile = self.__profiles_by_name.get(name)
+        if profile is None:
+            return {"error": "Profile not found"}
 
-                profile['DPI'] = new_dpi
+        # Check if new_dpi is between 100 and 3200
+        if not (100 <= new_dpi <= 3200):
+            raise ValueError("New DPI must be between 100 and 3200")
 
-                with open(self.__profiles_file, "w") as file:
-                    json.dump(self.__profiles, file, indent=4)
+        with self.__storage.lock:
+            profile['DPI'] = new_dpi
+            self.__storage.dpi_updated(self.__profiles, profile)
 
-                return {"message": "Profile updated successfully"}
-            
-        return {"error": "Profile not found"}
+        return {"message": "Profile updated successfully"}
     
     def update_dpi(self, profile_id: int, dpi: int) -> dict:
-        for profile in self.__profiles:
-            
-            if profile['_id'] == profile_id:
-                profile['DPI'] = dpi
-                profile['DPI_history'].append({"timestamp": get_current_timestamp(), "DPI": dpi})
+        profile = self.__profiles_by_id.get(profile_id)
+        if profile is None:
+            return {"error": "Profile not found"}
 
-                with open(self.__profiles_file, "w") as file:
-                    json.dump(self.__profiles, file, indent=4)
+        history_entry = {"timestamp": get_current_timestamp(), "DPI": dpi}
+        with self.__storage.lock:
+            profile['DPI'] = dpi
+            profile['DPI_history'].append(history_entry)
+            self.__storage.dpi_updated(self.__profiles, profile, history_entry)
 
-                return {"message": "Profile updated successfully"}
-            
-        return {"error": "Profile not found"}
+        return {"message": "Profile updated successfully"}
     
     def update_session_total_distance(self, profile_id: int, timestamp: str, total_distance: int) -> dict:
-        for profile in self.__profiles:
-            if profile['_id'] == profile_id:
-                profile['session_total_distance'].append({"timestamp": format_timestamp(timestamp), "total_distance": round(total_distance)})
+        profile = self.__profiles_by_id.get(profile_id)
+        if profile is None:
+            return {"error": "Profile not found"}
 
-                with open(self.__profiles_file, "w") as file:
-                    json.dump(self.__profiles, file, indent=4)
+        entry = {"timestamp": format_timestamp(timestamp), "total_distance": round(total_distance)}
+        with self.__storage.lock:
+            profile['session_total_distance'].append(entry)
+            add_to_rollups(profile['session_distance_rollups'], entry)
+            self.__storage.session_distance_added(self.__profiles, profile, entry)
+            self.__compact(profile)
 
-                return {"message": "Profile updated successfully"}
-            
-        return {"error": "Profile not found"}
+        return {"message": "Profile updated successfully"}
+
+    def flush(self) -> None:
+        # Saves changes the storage is still holding back; call before the application exits
+        self.__storage.flush()
 
+    def close(self) -> None:
+        self.__storage.close()
@@ -0,0 +1,571 @@
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from Backend.distance_rollups import (HOURLY, DAILY, get_rollups, get_hour_key, get_day_key, make_rollups,
+                                      add_to_rollups, compact_profile)
+
+JSON_BACKEND = "json"
+SQLITE_BACKEND = "sqlite"
+JOURNAL_BACKEND = "journal"
+DEFAULT_BACKEND = SQLITE_BACKEND
+
+PROFILES_FILE = "profiles.json"
+DATABASE_FILE = "profiles.db"
+SNAPSHOT_FILE = "profiles.snapshot.json"
+JOURNAL_FILE = "profiles.journal.jsonl"
+JOURNAL_SEGMENT_FILE = "profiles.journal.{:010d}.jsonl"     # A journal closed by a snapshot, named by its last sequence number
+MIGRATED_SUFFIX = ".migrated"           # profiles.json is kept under this name once it was moved into the database or journal
+SCHEMA_VERSION = 2                      # 2 added the distance rollups
+DEFAULT_SAVE_DELAY = 1.0                # Seconds the JSON backend waits for more changes before saving them together
+DEFAULT_SNAPSHOT_INTERVAL = 500         # Journal events after which the journal backend writes a new snapshot
+
+CREATED_EVENT = "created"
+DELETED_EVENT = "deleted"
+DPI_UPDATED_EVENT = "dpi_updated"
+SESSION_DISTANCE_ADDED_EVENT = "session_distance_added"
+COMPACTED_EVENT = "compacted"
+
+
+def write_json_atomically(path: str, data, indent: int = None) -> None:
+    # Written to a temporary file that replaces path only once it is complete, so a crash never leaves a truncated file
+    temp_file = path + ".tmp"
+    with open(temp_file, "w") as file:
+        json.dump(data, file, indent=indent)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_file, path)
+
+
+class ProfileStorage:
+    """
+    Where ProfileHandler keeps its profiles.
+
+    ProfileHandler owns the profiles in memory and reports every change
+    right after making it, together with the whole list, so a backend can
+    either store only the change or rewrite everything.
+
+    ProfileHandler changes the profiles while holding lock, so a backend may
+    read them from another thread as long as it holds lock too.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.RLock()
+
+    def load(self) -> list[dict]:
+        raise NotImplementedError
+
+    def load_profile(self, profile_id: int) -> dict:
+        # The profile as stored right now, or None
+        raise NotImplementedError
+
+    def has_external_changes(self) -> bool:
+        # Whether something other than this storage changed the stored profiles since they were last loaded
+        raise NotImplementedError
+
+    def profile_created(self, profiles: list[dict], profile: dict) -> None:
+        raise NotImplementedError
+
+    def profile_deleted(self, profiles: list[dict], profile: dict) -> None:
+        raise NotImplementedError
+
+    def dpi_updated(self, profiles: list[dict], profile: dict, history_entry: dict = None) -> None:
+        # history_entry is the entry appended to DPI_history, if any
+        raise NotImplementedError
+
+    def session_distance_added(self, profiles: list[dict], profile: dict, entry: dict) -> None:
+        # The entry has already been added to the profile's rollups as well
+        raise NotImplementedError
+
+    def session_distances_compacted(self, profiles: list[dict], profile: dict, cutoff: str) -> None:
+        # Session entries before cutoff and hourly totals of hours that ended before it were dropped
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        # Writes any changes that are still waiting to be saved
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+
+class JSONProfileStorage(ProfileStorage):
+    """
+    All profiles in one profiles.json.
+
+    The file is saved save_delay seconds after the first of a series of
+    changes, so the changes in between are saved together; with save_delay 0
+    every change is saved right away. Saves go to a temporary file that
+    replaces profiles.json only once it is complete, so a crash never leaves
+    a truncated file behind. Loading saves the pending changes first; like
+    every save, that replaces the whole file.
+    """
+
+    def __init__(self, storage_dir: str, save_delay: float = DEFAULT_SAVE_DELAY) -> None:
+        super().__init__()
+        self.profiles_file = os.path.join(storage_dir, PROFILES_FILE)
+        self.save_delay = save_delay
+        self.__pending = None               # Profiles changed since the last save
+        self.__timer = None
+        self.__file_state = None            # (mtime, size) of profiles.json as last loaded or saved
+
+    def __get_file_state(self) -> tuple:
+        try:
+            stat = os.stat(self.profiles_file)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self) -> list[dict]:
+        with self.lock:
+            # Changes not saved yet were already reported as made, so they are saved before loading
+            self.flush()
+
+            # Load profiles from the file if it exists
+            if os.path.exists(self.profiles_file):
+                with open(self.profiles_file, "r") as file:
+                    profiles = json.load(file)
+                self.__file_state = self.__get_file_state()
+                return profiles
+
+            # If file doesn't exist, create the file of an empty list
+            self.save([])
+            return []
+
+    def has_external_changes(self) -> bool:
+        return self.__get_file_state() != self.__file_state
+
+    def load_profile(self, profile_id: int) -> dict:
+        self.flush()
+        if not os.path.exists(self.profiles_file):
+            return None
+
+        with open(self.profiles_file, "r") as file:
+            for profile in json.load(file):
+                if profile["_id"] == profile_id:
+                    return profile
+        return None
+
+    def save(self, profiles: list[dict]) -> None:
+        with self.lock:
+            write_json_atomically(self.profiles_file, profiles, indent=4)
+            self.__file_state = self.__get_file_state()
+
+    def schedule_save(self, profiles: list[dict]) -> None:
+        if self.save_delay <= 0:
+            self.save(profiles)
+            return
+
+        with self.lock:
+            self.__pending = profiles
+            # A save that is already scheduled picks up this change as well
+            if self.__timer is None:
+                self.__timer = threading.Timer(self.save_delay, self.flush)
+                self.__timer.start()
+
+    def flush(self) -> None:
+        with self.lock:
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None
+            if self.__pending is not None:
+                self.save(self.__pending)
+                self.__pending = None
+
+    def profile_created(self, profiles: list[dict], profile: dict) -> None:
+        self.schedule_save(profiles)
+
+    def profile_deleted(self, profiles: list[dict], profile: dict) -> None:
+        self.schedule_save(profiles)
+
+    def dpi_updated(self, profiles: list[dict], profile: dict, history_entry: dict = None) -> None:
+        self.schedule_save(profiles)
+
+    def session_distance_added(self, profiles: list[dict], profile: dict, entry: dict) -> None:
+        self.schedule_save(profiles)
+
+    def session_distances_compacted(self, profiles: list[dict], profile: dict, cutoff: str) -> None:
+        self.schedule_save(profiles)
+
+
+class SQLiteProfileStorage(ProfileStorage):
+    """
+    Profiles in a SQLite database (profiles.db) in WAL mode, with the DPI
+    history, the session distances and their hourly and daily totals in their
+    own tables, so every change writes only the rows it touches.
+
+    A profiles.json found next to a new database is imported in one
+    transaction and then renamed to profiles.json.migrated.
+    """
+
+    def __init__(self, storage_dir: str) -> None:
+        super().__init__()
+        self.database_file = os.path.join(storage_dir, DATABASE_FILE)
+        self.profiles_file = os.path.join(storage_dir, PROFILES_FILE)
+
+        self.__connection = sqlite3.connect(self.database_file)
+        self.__connection.row_factory = sqlite3.Row
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute("PRAGMA synchronous=NORMAL")     # Durable enough in WAL mode, and much faster
+        self.__connection.execute("PRAGMA foreign_keys=ON")
+
+        version = self.__connection.execute("PRAGMA user_version").fetchone()[0]
+        if version < SCHEMA_VERSION:
+            self.__create_schema()
+            migrate_json = version == 0 and os.path.exists(self.profiles_file)
+            profiles = []
+            if migrate_json:
+                with open(self.profiles_file, "r") as file:
+                    profiles = json.load(file)
+
+            # The upgrade and the schema version are committed together, so a failed upgrade is retried next time
+            with self.__connection:
+                for profile in profiles:
+                    self.__insert_profile(profile)
+                if version == 1:
+                    # Totals of the sessions stored before there were rollups
+                    self.__connection.execute("""
+                        INSERT INTO distance_rollups (profile_id, period, bucket, total_distance)
+                        SELECT profile_id, ?, substr(timestamp, 1, 13) || ':00:00', SUM(total_distance)
+                        FROM session_distances GROUP BY profile_id, substr(timestamp, 1, 13)""", (HOURLY,))
+                    self.__connection.execute("""
+                        INSERT INTO distance_rollups (profile_id, period, bucket, total_distance)
+                        SELECT profile_id, ?, substr(timestamp, 1, 10), SUM(total_distance)
+                        FROM session_distances GROUP BY profile_id, substr(timestamp, 1, 10)""", (DAILY,))
+                self.__connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+            if migrate_json:
+                os.replace(self.profiles_file, self.profiles_file + MIGRATED_SUFFIX)
+
+        self.__data_version = self.__get_data_version()
+
+    def __create_schema(self) -> None:
+        with self.__connection:
+            self.__connection.executescript("""
+                CREATE TABLE IF NOT EXISTS profiles (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    dpi INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS dpi_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    profile_id INTEGER NOT NULL REFERENCES profiles (id) ON DELETE CASCADE,
+                    timestamp TEXT NOT NULL,
+                    dpi INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS session_distances (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    profile_id INTEGER NOT NULL REFERENCES profiles (id) ON DELETE CASCADE,
+                    timestamp TEXT NOT NULL,
+                    total_distance INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS distance_rollups (
+                    profile_id INTEGER NOT NULL REFERENCES profiles (id) ON DELETE CASCADE,
+                    period TEXT NOT NULL,
+                    bucket TEXT NOT NULL,
+                    total_distance INTEGER NOT NULL,
+                    PRIMARY KEY (profile_id, period, bucket)
+                );
+                CREATE INDEX IF NOT EXISTS profiles_name ON profiles (name);
+                CREATE INDEX IF NOT EXISTS dpi_history_profile ON dpi_history (profile_id, timestamp);
+                CREATE INDEX IF NOT EXISTS session_distances_profile ON session_distances (profile_id, timestamp);
+            """)
+
+    def __insert_profile(self, profile: dict) -> None:
+        self.__connection.execute("INSERT INTO profiles (id, name, dpi) VALUES (?, ?, ?)",
+                                  (profile["_id"], profile["name"], profile["DPI"]))
+        self.__connection.executemany("INSERT INTO dpi_history (profile_id, timestamp, dpi) VALUES (?, ?, ?)",
+                                      [(profile["_id"], entry["timestamp"], entry["DPI"]) for entry in profile["DPI_history"]])
+        self.__connection.executemany("INSERT INTO session_distances (profile_id, timestamp, total_distance) VALUES (?, ?, ?)",
+                                      [(profile["_id"], entry["timestamp"], entry["total_distance"])
+                                       for entry in profile["session_total_distance"]])
+        self.__connection.executemany("INSERT INTO distance_rollups (profile_id, period, bucket, total_distance) VALUES (?, ?, ?, ?)",
+                                      [(profile["_id"], period, bucket, total)
+                                       for period, totals in get_rollups(profile).items() for bucket, total in totals.items()])
+
+    def __read_profiles(self, where: str = "", parameters: tuple = ()) -> list[dict]:
+        profiles = []
+        for row in self.__connection.execute(f"SELECT id, name, dpi FROM profiles {where} ORDER BY id", parameters):
+            dpi_history = [{"timestamp": entry["timestamp"], "DPI": entry["dpi"]} for entry in self.__connection.execute(
+                "SELECT timestamp, dpi FROM dpi_history WHERE profile_id = ? ORDER BY id", (row["id"],))]
+            session_total_distance = [{"timestamp": entry["timestamp"], "total_distance": entry["total_distance"]}
+                                      for entry in self.__connection.execute(
+                "SELECT timestamp, total_distance FROM session_distances WHERE profile_id = ? ORDER BY id", (row["id"],))]
+            rollups = {HOURLY: {}, DAILY: {}}
+            for entry in self.__connection.execute(
+                    "SELECT period, bucket, total_distance FROM distance_rollups WHERE profile_id = ? ORDER BY period, bucket", (row["id"],)):
+                rollups[entry["period"]][entry["bucket"]] = entry["total_distance"]
+            profiles.append({"_id": row["id"], "name": row["name"], "DPI": row["dpi"],
+                             "DPI_history": dpi_history, "session_total_distance": session_total_distance,
+                             "session_distance_rollups": rollups})
+        return profiles
+
+    def __get_data_version(self) -> int:
+        # Changes whenever another connection commits to the database, but not for this connection's own commits
+        return self.__connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def load(self) -> list[dict]:
+        self.__data_version = self.__get_data_version()
+        return self.__read_profiles()
+
+    def has_external_changes(self) -> bool:
+        return self.__get_data_version() != self.__data_version
+
+    def load_profile(self, profile_id: int) -> dict:
+        profiles = self.__read_profiles("WHERE id = ?", (profile_id,))
+        return profiles[0] if profiles else None
+
+    def profile_created(self, profiles: list[dict], profile: dict) -> None:
+        with self.__connection:
+            self.__insert_profile(profile)
+
+    def profile_deleted(self, profiles: list[dict], profile: dict) -> None:
+        # The histories go with the profile (ON DELETE CASCADE)
+        with self.__connection:
+            self.__connection.execute("DELETE FROM profiles WHERE id = ?", (profile["_id"],))
+
+    def dpi_updated(self, profiles: list[dict], profile: dict, history_entry: dict = None) -> None:
+        with self.__connection:
+            self.__connection.execute("UPDATE profiles SET dpi = ? WHERE id = ?", (profile["DPI"], profile["_id"]))
+            if history_entry is not None:
+                self.__connection.execute("INSERT INTO dpi_history (profile_id, timestamp, dpi) VALUES (?, ?, ?)",
+                                          (profile["_id"], history_entry["timestamp"], history_entry["DPI"]))
+
+    def session_distance_added(self, profiles: list[dict], profile: dict, entry: dict) -> None:
+        with self.__connection:
+            self.__connection.execute("INSERT INTO session_distances (profile_id, timestamp, total_distance) VALUES (?, ?, ?)",
+                                      (profile["_id"], entry["timestamp"], entry["total_distance"]))
+            self.__connection.executemany("""
+                INSERT INTO distance_rollups (profile_id, period, bucket, total_distance) VALUES (?, ?, ?, ?)
+                ON CONFLICT (profile_id, period, bucket) DO UPDATE SET total_distance = total_distance + excluded.total_distance""",
+                [(profile["_id"], HOURLY, get_hour_key(entry["timestamp"]), entry["total_distance"]),
+                 (profile["_id"], DAILY, get_day_key(entry["timestamp"]), entry["total_distance"])])
+
+    def session_distances_compacted(self, profiles: list[dict], profile: dict, cutoff: str) -> None:
+        with self.__connection:
+            self.__connection.execute("DELETE FROM session_distances WHERE profile_id = ? AND timestamp < ?",
+                                      (profile["_id"], cutoff))
+            self.__connection.execute("DELETE FROM distance_rollups WHERE profile_id = ? AND period = ? AND bucket < ?",
+                                      (profile["_id"], HOURLY, get_hour_key(cutoff)))
+
+    def close(self) -> None:
+        self.__connection.close()
+
+
+class JournalProfileStorage(ProfileStorage):
+    """
+    Profiles as a snapshot (profiles.snapshot.json) plus a journal of the
+    changes made since (profiles.journal.jsonl), one JSON object per line:
+
+        {"sequence": 12, "time": "2025-01-01 12:00:00", "event": "dpi_updated", "_id": 1, "DPI": 1200, ...}
+
+    Every change appends one line. Every snapshot_interval changes the
+    profiles are written to a new snapshot and the journal is moved aside
+    as a segment (profiles.journal.<last sequence>.jsonl), so a new one
+    starts. Opening loads the snapshot and replays the journal events after
+    it, so a crash between writing a snapshot and moving the journal loses
+    nothing. A last line cut off by a crash is ignored and cut from the
+    file before anything is appended. The segments and the journal together
+    are the record of every change (see read_all_events).
+
+    A profiles.json found without a snapshot or journal becomes the first
+    snapshot and is renamed to profiles.json.migrated.
+    """
+
+    def __init__(self, storage_dir: str, snapshot_interval: int = DEFAULT_SNAPSHOT_INTERVAL) -> None:
+        super().__init__()
+        self.snapshot_file = os.path.join(storage_dir, SNAPSHOT_FILE)
+        self.journal_file = os.path.join(storage_dir, JOURNAL_FILE)
+        self.profiles_file = os.path.join(storage_dir, PROFILES_FILE)
+        self.snapshot_interval = snapshot_interval
+        self.__journal = None               # Open for appending once the profiles were loaded
+        self.__sequence = 0                 # Sequence number of the last event
+        self.__events_since_snapshot = 0
+        self.__file_state = None            # (snapshot, journal) state as last loaded or written
+
+        if not os.path.exists(self.snapshot_file) and not os.path.exists(self.journal_file):
+            profiles = []
+            if os.path.exists(self.profiles_file):
+                with open(self.profiles_file, "r") as file:
+                    profiles = json.load(file)
+            write_json_atomically(self.snapshot_file, {"sequence": 0, "profiles": profiles})
+            if os.path.exists(self.profiles_file):
+                os.replace(self.profiles_file, self.profiles_file + MIGRATED_SUFFIX)
+
+    def __get_file_state(self) -> tuple:
+        state = []
+        for path in (self.snapshot_file, self.journal_file):
+            try:
+                stat = os.stat(path)
+                state.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                state.append(None)
+        return tuple(state)
+
+    def read_events(self, journal_file: str = None):
+        # The events of the journal in order, without the last line if a crash cut it off
+        journal_file = journal_file or self.journal_file
+        if not os.path.exists(journal_file):
+            return
+        with open(journal_file, "r") as file:
+            for line in file:
+                if not line.endswith("\n"):
+                    return
+                yield json.loads(line)
+
+    def get_segment_files(self) -> list[str]:
+        # Segment names hold zero-padded sequence numbers, so sorting by name puts them in order
+        prefix, suffix = JOURNAL_SEGMENT_FILE.split("{:010d}")
+        storage_dir = os.path.dirname(self.journal_file)
+        names = sorted(name for name in os.listdir(storage_dir)
+                       if name.startswith(prefix) and name.endswith(suffix) and name[len(prefix):-len(suffix)].isdigit())
+        return [os.path.join(storage_dir, name) for name in names]
+
+    def read_all_events(self):
+        # Every event ever journaled, oldest first
+        for segment_file in self.get_segment_files():
+            yield from self.read_events(segment_file)
+        yield from self.read_events()
+
+    def __cut_partial_line(self) -> None:
+        # Anything appended after a line cut off by a crash would be joined to it into one corrupt line
+        if not os.path.exists(self.journal_file):
+            return
+        with open(self.journal_file, "rb+") as file:
+            data = file.read()
+            complete_length = data.rfind(b"\n") + 1
+            if complete_length < len(data):
+                file.truncate(complete_length)
+
+    def __read(self) -> tuple:
+        with open(self.snapshot_file, "r") as file:
+            snapshot = json.load(file)
+        profiles = snapshot["profiles"]
+        sequence = snapshot["sequence"]
+
+        replayed = 0
+        for event in self.read_events():
+            # Events up to the snapshot's sequence are already in it
+            if event["sequence"] <= sequence:
+                continue
+            apply_event(profiles, event)
+            sequence = event["sequence"]
+            replayed += 1
+        return profiles, sequence, replayed
+
+    def load(self) -> list[dict]:
+        with self.lock:
+            # Another process may have moved the journal aside since it was opened; appends must go to the current one
+            if self.__journal is not None:
+                self.__journal.close()
+                self.__journal = None
+            self.__cut_partial_line()
+            profiles, self.__sequence, self.__events_since_snapshot = self.__read()
+            self.__file_state = self.__get_file_state()
+            return profiles
+
+    def load_profile(self, profile_id: int) -> dict:
+        for profile in self.__read()[0]:
+            if profile["_id"] == profile_id:
+                return profile
+        return None
+
+    def has_external_changes(self) -> bool:
+        return self.__get_file_state() != self.__file_state
+
+    def __append(self, profiles: list[dict], event: dict) -> None:
+        with self.lock:
+            self.__sequence += 1
+            event = {"sequence": self.__sequence, "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), **event}
+
+            if self.__journal is None:
+                self.__journal = open(self.journal_file, "a")
+            self.__journal.write(json.dumps(event) + "\n")
+            self.__journal.flush()
+
+            self.__events_since_snapshot += 1
+            if self.__events_since_snapshot >= self.snapshot_interval:
+                self.write_snapshot(profiles)
+            self.__file_state = self.__get_file_state()
+
+    def write_snapshot(self, profiles: list[dict]) -> None:
+        # profiles must include every change journaled so far
+        with self.lock:
+            write_json_atomically(self.snapshot_file, {"sequence": self.__sequence, "profiles": profiles})
+
+            # Only moved aside once the snapshot is complete; until then the journal still replays on top of the old one
+            if self.__journal is not None:
+                self.__journal.close()
+                self.__journal = None
+            if os.path.exists(self.journal_file):
+                os.replace(self.journal_file, os.path.join(os.path.dirname(self.journal_file),
+                                                           JOURNAL_SEGMENT_FILE.format(self.__sequence)))
+            self.__journal = open(self.journal_file, "a")
+            self.__events_since_snapshot = 0
+            self.__file_state = self.__get_file_state()
+
+    def profile_created(self, profiles: list[dict], profile: dict) -> None:
+        self.__append(profiles, {"event": CREATED_EVENT, "profile": profile})
+
+    def profile_deleted(self, profiles: list[dict], profile: dict) -> None:
+        self.__append(profiles, {"event": DELETED_EVENT, "_id": profile["_id"]})
+
+    def dpi_updated(self, profiles: list[dict], profile: dict, history_entry: dict = None) -> None:
+        self.__append(profiles, {"event": DPI_UPDATED_EVENT, "_id": profile["_id"], "DPI": profile["DPI"], "history_entry": history_entry})
+
+    def session_distance_added(self, profiles: list[dict], profile: dict, entry: dict) -> None:
+        self.__append(profiles, {"event": SESSION_DISTANCE_ADDED_EVENT, "_id": profile["_id"], "entry": entry})
+
+    def session_distances_compacted(self, profiles: list[dict], profile: dict, cutoff: str) -> None:
+        self.__append(profiles, {"event": COMPACTED_EVENT, "_id": profile["_id"], "cutoff": cutoff})
+
+    def flush(self) -> None:
+        with self.lock:
+            if self.__journal is not None:
+                os.fsync(self.__journal.fileno())
+
+    def close(self) -> None:
+        with self.lock:
+            if self.__journal is not None:
+                self.flush()
+                self.__journal.close()
+                self.__journal = None
+
+
+def apply_event(profiles: list[dict], event: dict) -> None:
+    # Makes the change a journal event records
+    if event["event"] == CREATED_EVENT:
+        profiles.append(event["profile"])
+        return
+
+    profile = next(profile for profile in profiles if profile["_id"] == event["_id"])
+    if event["event"] == DELETED_EVENT:
+        profiles.remove(profile)
+    elif event["event"] == DPI_UPDATED_EVENT:
+        profile["DPI"] = event["DPI"]
+        if event["history_entry"] is not None:
+            profile["DPI_history"].append(event["history_entry"])
+    elif event["event"] == SESSION_DISTANCE_ADDED_EVENT:
+        profile["session_total_distance"].append(event["entry"])
+        if "session_distance_rollups" in profile:
+            add_to_rollups(profile["session_distance_rollups"], event["entry"])
+    elif event["event"] == COMPACTED_EVENT:
+        # A snapshot made before there were rollups gets them before its entries are dropped
+        if "session_distance_rollups" not in profile:
+            profile["session_distance_rollups"] = make_rollups(profile["session_total_distance"])
+        compact_profile(profile, event["cutoff"])
+    else:
+        raise ValueError(f"Unknown profile journal event: {event['event']}")
+
+
+def open_profile_storage(storage_dir: str, backend: str = DEFAULT_BACKEND,
+                         save_delay: float = DEFAULT_SAVE_DELAY) -> ProfileStorage:
+    # SQLite commits every change in its own small transaction, so only the JSON backend delays saves
+    if backend == JSON_BACKEND:
+        return JSONProfileStorage(storage_dir, save_delay)
+    if backend == SQLITE_BACKEND:
+        return SQLiteProfileStorage(storage_dir)
+    if backend == JOURNAL_BACKEND:
+        return JournalProfileStorage(storage_dir)
+    raise ValueError(f"Unknown profile storage backend: {backend}")
@@ -0,0 +1,189 @@
+import os
+import csv
+import struct
+from collections import namedtuple
+from datetime import datetime, timedelta
+import numpy as np
+
+from Backend.log_writer import SessionLogWriter
+
+# Binary session log layout (little endian)
+#   header: magic, format version, screen width, screen height, sample rate (Hz), profile id, wall-clock anchor (ns since epoch)
+#   record: monotonic timestamp (ns since session start), x, y, flags
+BINARY_LOG_EXTENSION = ".sflog"
+CSV_LOG_EXTENSION = ".csv"
+
+MAGIC = b"SFLG"
+FORMAT_VERSION = 1
+
+HEADER_STRUCT = struct.Struct("<4sHHHHIq")
+RECORD_STRUCT = struct.Struct("<qhhB")
+RECORD_DTYPE = np.dtype([("t_ns", "<i8"), ("x", "<i2"), ("y", "<i2"), ("flags", "u1")])
+
+FLAG_CLICKED = 0x01
+
+# x and y are stored as int16; anything outside is clamped (and later rejected as out of screen)
+COORDINATE_MIN = -32768
+COORDINATE_MAX = 32767
+
+SessionLogHeader = namedtuple("SessionLogHeader", ["version", "screen_width", "screen_height", "sample_rate", "profile_id", "anchor_ns"])
+
+
+def get_log_file(storage_dir: str, profile_id: int, session: str, log_format: str = "csv") -> str:
+    extension = BINARY_LOG_EXTENSION if log_format == "binary" else CSV_LOG_EXTENSION
+    return os.path.join(storage_dir, f"id_{profile_id}_cursor_log_{session}{extension}")
+
+
+def find_log_file(storage_dir: str, profile_id: int, session: str) -> str:
+    # Prefer the binary log written by the tracker; fall back to the CSV log
+    binary_log_file = get_log_file(storage_dir, profile_id, session, "binary")
+    if os.path.exists(binary_log_file):
+        return binary_log_file
+    return get_log_file(storage_dir, profile_id, session, "csv")
+
+
+def is_binary_log(log_file: str) -> bool:
+    return log_file.endswith(BINARY_LOG_EXTENSION)
+
+
+LEGACY_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+_LEGACY_EPOCH = datetime(1970, 1, 1)
+
+
+def format_timestamp_ns(timestamp_ns: int) -> str:
+    # Only for display and export; logs and analysis keep integer nanoseconds
+    return datetime.fromtimestamp(timestamp_ns / 1e9).strftime(LEGACY_TIMESTAMP_FORMAT)
+
+
+def parse_timestamp_ns(timestamp: str) -> int:
+    """
+    Parses a CSV log timestamp into integer nanoseconds.
+
+    Current logs store integer nanoseconds. Older logs store wall-clock strings
+    ("%Y-%m-%d %H:%M:%S.%f"), which are converted as naive times so that
+    differences between them are exactly what they were before.
+
+    Raises:
+        ValueError: If the timestamp is in neither format.
+    """
+    if timestamp.isdigit():
+        return int(timestamp)
+    return (datetime.strptime(timestamp, LEGACY_TIMESTAMP_FORMAT) - _LEGACY_EPOCH) // timedelta(microseconds=1) * 1000
+
+
+class BinarySessionLogWriter(SessionLogWriter):
+    """
+    SessionLogWriter that stores rows as fixed-width binary records.
+
+    Rows are [t_ns, x, y, clicked] where t_ns is the monotonic time since the
+    session started (the wall-clock time of that point is the header's anchor). The header (a SessionLogHeader) is required.
+    """
+
+    def __init__(self, log_file: str, header: SessionLogHeader, **kwargs) -> None:
+        super().__init__(log_file, header=header, **kwargs)
+
+    def _open_file(self):
+        return open(self.log_file, "wb")
+
+    def _write_header(self, header: SessionLogHeader) -> None:
+        self._file.write(HEADER_STRUCT.pack(MAGIC, FORMAT_VERSION, header.screen_width, header.screen_height,
+                                              header.sample_rate, header.profile_id, header.anchor_ns))
+
+    def _write_rows(self, rows: list) -> None:
+        records = []
+        for t_ns, x, y, clicked in rows:
+            x = min(max(int(x), COORDINATE_MIN), COORDINATE_MAX)
+            y = min(max(int(y), COORDINATE_MIN), COORDINATE_MAX)
+            records.append(RECORD_STRUCT.pack(t_ns, x, y, FLAG_CLICKED if clicked else 0))
+        self._file.write(b"".join(records))
+
+
+def read_binary_header(log_file: str) -> SessionLogHeader:
+    with open(log_file, "rb") as file:
+        raw = file.read(HEADER_STRUCT.size)
+
+    if len(raw) != HEADER_STRUCT.size:
+        raise ValueError("Binary session log header is incomplete")
+
+    magic, version, screen_width, screen_height, sample_rate, profile_id, anchor_ns = HEADER_STRUCT.unpack(raw)
+    if magic != MAGIC:
+        raise ValueError("Not a binary session log")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported binary session log version: {version}")
+
+    return SessionLogHeader(version, screen_width, screen_height, sample_rate, profile_id, anchor_ns)
+
+
+def read_binary_log(log_file: str):
+    """
+    Maps a binary session log into memory without copying it.
+
+    A trailing partial record (e.g. after a crash) is ignored.
+
+    Returns:
+        tuple: (SessionLogHeader, numpy structured array with fields t_ns, x, y, flags)
+    """
+    header = read_binary_header(log_file)
+    count = (os.path.getsize(log_file) - HEADER_STRUCT.size) // RECORD_DTYPE.itemsize
+
+    if count <= 0:
+        return header, np.empty(0, dtype=RECORD_DTYPE)
+
+    records = np.memmap(log_file, dtype=RECORD_DTYPE, mode="r", offset=HEADER_STRUCT.size, shape=(count,))
+    return header, records
+
+
+def write_binary_log(log_file: str, header: SessionLogHeader, timestamps, xs, ys, clicked) -> int:
+    """
+    Writes a whole binary session log at once from columns (e.g. generated sessions).
+
+    Returns:
+        int: Number of written samples.
+    """
+    records = np.empty(len(timestamps), dtype=RECORD_DTYPE)
+    records["t_ns"] = timestamps
+    records["x"] = np.clip(xs, COORDINATE_MIN, COORDINATE_MAX)
+    records["y"] = np.clip(ys, COORDINATE_MIN, COORDINATE_MAX)
+    records["flags"] = np.where(np.asarray(clicked) != 0, FLAG_CLICKED, 0)
+
+    with open(log_file, "wb") as file:
+        file.write(HEADER_STRUCT.pack(MAGIC, FORMAT_VERSION, header.screen_width, header.screen_height,
+                                      header.sample_rate, header.profile_id, header.anchor_ns))
+        records.tofile(file)
+
+    return len(records)
+
+
+def write_csv_log(log_file: str, timestamps, xs, ys, clicked) -> int:
+    """
+    Writes a whole CSV session log at once from columns, with integer nanosecond
+    timestamps like the tracker writes them.
+
+    Returns:
+        int: Number of written samples.
+    """
+    with open(log_file, "w", newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(["timestamp", "X", "Y", "clicked"])
+        writer.writerows(zip(np.asarray(timestamps).tolist(), np.asarray(xs).tolist(), np.asarray(ys).tolist(),
+                             (np.asarray(clicked) != 0).astype(int).tolist()))
+
+    return len(timestamps)
+
+
+def export_csv(binary_log_file: str, csv_file: str) -> int:
+    """
+    Exports a binary session log as a CSV log with human-readable timestamps.
+
+    Returns:
+        int: Number of exported samples.
+    """
+    header, records = read_binary_log(binary_log_file)
+
+    with open(csv_file, "w", newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(["timestamp", "X", "Y", "clicked"])
+        for t_ns, x, y, flags in zip(records["t_ns"].tolist(), records["x"].tolist(), records["y"].tolist(), records["flags"].tolist()):
+            writer.writerow([format_timestamp_ns(header.anchor_ns + t_ns), x, y, 1 if flags & FLAG_CLICKED else 0])
+
+    return len(records)
@@ -0,0 +1,385 @@
+import bisect
+import math
+import queue
+import threading
+import numpy as np
+from Backend.analyze_module import (
+    iter_log_chunks, trace_segment, get_pause_distance,
+    PAUSE_THRESHOLD, PAUSE_MIN_DURATION_NS, CLICK_DEBOUNCE_NS, LOAD_CHUNK_SIZE, SEGMENT_WINDOW
+)
+from Backend.validation_module import StreamingValidator
+
+LIVE_BATCH_SIZE = 100                   # Samples collected before the live analysis is advanced (1 second at 100Hz)
+
+
+class StreamingAnalyzer:
+    """
+    Analyzes a session fed in chunks, with the same results as AnalyzeModule.
+
+    Only what later segments can still need is kept in memory:
+    - the points from the previous end point on (a segment never reaches
+      back past the previous end point),
+    - the first SEGMENT_WINDOW points, since a segment whose start runs off
+      the beginning of the data starts at index 0,
+    - the pauses that start in either of those ranges.
+    So the points kept are bounded by the longest stretch without a click, not
+    by the chunk size: a session without any click is kept in memory whole.
+    The results (segments, end points and pauses) grow with the session.
+
+    A click is analyzed once the sample after it has arrived (until then a
+    pause ending at the click could still grow), or in finish().
+    """
+
+    def __init__(self) -> None:
+        self.sample_count = 0
+        self.total_distance = 0.0
+        self.analysis_result = []
+        self.end_points = []                # Same as AnalyzeModule.find_end_points once finished
+        self.pause_segments = []            # Same as AnalyzeModule.get_pause_segments once finished
+
+        self.__last_sample = None           # (timestamp, x, y) of the last sample fed
+        self.__open_pause = None            # Pause still going on at the last sample: (start index, start timestamp, x, y)
+        self.__last_click_timestamp = None
+        self.__pending_end_points = []      # Debounced clicks waiting for the next sample
+        self.__prev_click_point = 0
+
+        # Points from __offset on; new chunks are only joined when a segment is analyzed
+        self.__offset = 0
+        self.__xs = np.empty(0, dtype=np.int64)
+        self.__ys = np.empty(0, dtype=np.int64)
+        self.__new_xs = []
+        self.__new_ys = []
+
+        # The first SEGMENT_WINDOW points, kept for segments starting at index 0
+        self.__head_xs = []
+        self.__head_ys = []
+
+        # Completed pauses, in the same form as AnalyzeModule.get_pause_segments
+        self.__pause_points = []
+        self.__pause_starts = []
+        self.__pause_ends = []
+
+    def feed(self, timestamps: np.ndarray, x: np.ndarray, y: np.ndarray, clicked: np.ndarray) -> None:
+        if len(timestamps) == 0:
+            return
+
+        first_index = self.sample_count
+
+        # Steps from the last sample of the previous chunk go first
+        if self.__last_sample is not None:
+            last_timestamp, last_x, last_y = self.__last_sample
+            step_timestamps = np.concatenate(([last_timestamp], timestamps))
+            step_xs = np.concatenate(([last_x], x))
+            step_ys = np.concatenate(([last_y], y))
+            step_base = first_index - 1
+        else:
+            step_timestamps, step_xs, step_ys = timestamps, x, y
+            step_base = first_index
+
+        dx = np.diff(step_xs)
+        dy = np.diff(step_ys)
+        step_distances = np.sqrt(dx * dx + dy * dy)
+
+        # cumsum adds strictly left to right, so the running total is the same as one sum over the session
+        if len(step_distances) > 0:
+            self.total_distance = float(np.cumsum(np.concatenate(([self.total_distance], step_distances)))[-1])
+
+        self.__add_pauses(step_distances <= PAUSE_THRESHOLD, step_timestamps, step_xs, step_ys, step_base)
+        self.__add_clicks(timestamps, clicked, first_index)
+
+        # Keep the points
+        self.__new_xs.append(x.astype(np.int64))
+        self.__new_ys.append(y.astype(np.int64))
+        if len(self.__head_xs) < SEGMENT_WINDOW:
+            self.__head_xs.extend(x[:SEGMENT_WINDOW - len(self.__head_xs)].tolist())
+            self.__head_ys.extend(y[:SEGMENT_WINDOW - len(self.__head_ys)].tolist())
+
+        self.sample_count += len(timestamps)
+        self.__last_sample = (int(timestamps[-1]), int(x[-1]), int(y[-1]))
+
+        # Every click before the last sample now has the sample after it
+        while self.__pending_end_points and self.__pending_end_points[0] < self.sample_count - 1:
+            self.__analyze_segment(self.__pending_end_points.pop(0))
+
+    def finish(self) -> dict:
+        """Analyzes the remaining clicks and returns the same dict as AnalyzeModule.analyze_tracking_data."""
+        # A pause running until the end of the data counts however short it is
+        if self.__open_pause is not None:
+            start_index, _, start_x, start_y = self.__open_pause
+            self.__add_pause(start_index, self.sample_count - 1, start_x, start_y)
+            self.__open_pause = None
+
+        while self.__pending_end_points:
+            self.__analyze_segment(self.__pending_end_points.pop(0))
+
+        return self.get_result()
+
+    def get_result(self) -> dict:
+        total_distance = self.total_distance if self.sample_count >= 2 else 0
+        return {"analysis_result": self.analysis_result, "total_distance": total_distance}
+
+    def get_buffered_sample_count(self) -> int:
+        return len(self.__xs) + sum(len(xs) for xs in self.__new_xs)
+
+    def get_state(self) -> dict:
+        # Everything carried from one chunk to the next, as JSON values (for checkpoints, see from_state);
+        # the lists are copies, since the analyzer keeps adding to its own
+        return {
+            "sample_count": self.sample_count,
+            "total_distance": self.total_distance,
+            "analysis_result": list(self.analysis_result),
+            "end_points": list(self.end_points),
+            "pause_segments": list(self.pause_segments),
+            "last_sample": list(self.__last_sample) if self.__last_sample is not None else None,
+            "open_pause": list(self.__open_pause) if self.__open_pause is not None else None,
+            "last_click_timestamp": self.__last_click_timestamp,
+            "pending_end_points": list(self.__pending_end_points),
+            "prev_click_point": self.__prev_click_point,
+            "offset": self.__offset,
+            "xs": np.concatenate([self.__xs] + self.__new_xs).tolist(),
+            "ys": np.concatenate([self.__ys] + self.__new_ys).tolist(),
+            "head_xs": list(self.__head_xs),
+            "head_ys": list(self.__head_ys),
+            "pause_points": list(self.__pause_points)  # The pauses still kept, a part of pause_segments
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "StreamingAnalyzer":
+        analyzer = cls()
+        analyzer.sample_count = state["sample_count"]
+        analyzer.total_distance = state["total_distance"]
+        analyzer.analysis_result = state["analysis_result"]
+        analyzer.end_points = state["end_points"]
+        analyzer.pause_segments = state["pause_segments"]
+        analyzer.__last_sample = tuple(state["last_sample"]) if state["last_sample"] is not None else None
+        analyzer.__open_pause = tuple(state["open_pause"]) if state["open_pause"] is not None else None
+        analyzer.__last_click_timestamp = state["last_click_timestamp"]
+        analyzer.__pending_end_points = state["pending_end_points"]
+        analyzer.__prev_click_point = state["prev_click_point"]
+        analyzer.__offset = state["offset"]
+        analyzer.__xs = np.array(state["xs"], dtype=np.int64)
+        analyzer.__ys = np.array(state["ys"], dtype=np.int64)
+        analyzer.__head_xs = state["head_xs"]
+        analyzer.__head_ys = state["head_ys"]
+        analyzer.__pause_points = state["pause_points"]
+        analyzer.__pause_starts = [pause["start_index"] for pause in state["pause_points"]]
+        analyzer.__pause_ends = [pause["end_index"] for pause in state["pause_points"]]
+        return analyzer
+
+    def __add_pauses(self, within_threshold, step_timestamps, step_xs, step_ys, step_base) -> None:
+        # Runs of consecutive within-threshold steps; step k goes from point step_base + k to point step_base + k + 1
+        edges = np.flatnonzero(np.diff(np.concatenate(([False], within_threshold, [False])).astype(np.int8)))
+        run_starts = edges[0::2].tolist()
+        run_ends = edges[1::2].tolist()
+
+        # A pause still going on at the end of the previous chunk either continues or ended at its last point
+        if self.__open_pause is not None:
+            start_index, start_timestamp, start_x, start_y = self.__open_pause
+            self.__open_pause = None
+            if run_starts and run_starts[0] == 0:
+                run_starts.pop(0)
+                run_end = run_ends.pop(0)
+                self.__close_pause(start_index, start_timestamp, start_x, start_y, run_end, step_timestamps, step_base)
+            elif int(step_timestamps[0]) - start_timestamp > PAUSE_MIN_DURATION_NS:
+                self.__add_pause(start_index, step_base, start_x, start_y)
+
+        for run_start, run_end in zip(run_starts, run_ends):
+            self.__close_pause(step_base + run_start, int(step_timestamps[run_start]), int(step_xs[run_start]),
+                               int(step_ys[run_start]), run_end, step_timestamps, step_base)
+
+    def __close_pause(self, start_index, start_timestamp, start_x, start_y, run_end, step_timestamps, step_base) -> None:
+        # A run that reaches the end of the chunk may continue in the next one
+        if run_end == len(step_timestamps) - 1:
+            self.__open_pause = (start_index, start_timestamp, start_x, start_y)
+        elif int(step_timestamps[run_end]) - start_timestamp > PAUSE_MIN_DURATION_NS:
+            self.__add_pause(start_index, step_base + run_end, start_x, start_y)
+
+    def __add_pause(self, start_index, end_index, x, y) -> None:
+        pause = {"start_index": start_index, "end_index": end_index, "x": x, "y": y}
+        self.pause_segments.append(pause)
+        self.__pause_points.append(pause)
+        self.__pause_starts.append(start_index)
+        self.__pause_ends.append(end_index)
+
+    def __add_clicks(self, timestamps, clicked, first_index) -> None:
+        clicked_positions = np.flatnonzero(clicked == 1)
+        if len(clicked_positions) == 0:
+            return
+
+        # A click too close to the previous click (possibly in an earlier chunk) is not a new end point
+        click_timestamps = timestamps[clicked_positions]
+        if self.__last_click_timestamp is None:
+            spaced_out = np.concatenate(([True], np.diff(click_timestamps) > CLICK_DEBOUNCE_NS))
+        else:
+            spaced_out = np.diff(np.concatenate(([self.__last_click_timestamp], click_timestamps))) > CLICK_DEBOUNCE_NS
+
+        self.__pending_end_points.extend((clicked_positions[spaced_out] + first_index).tolist())
+        self.__last_click_timestamp = int(click_timestamps[-1])
+
+    def __get_point(self, index):
+        if index >= self.__offset:
+            return int(self.__xs[index - self.__offset]), int(self.__ys[index - self.__offset])
+        return self.__head_xs[index], self.__head_ys[index]
+
+    def __get_distance(self, index1, index2):
+        x1, y1 = self.__get_point(index1)
+        x2, y2 = self.__get_point(index2)
+        return math.sqrt((x1-x2)**2 + (y1-y2)**2)
+
+    def __analyze_segment(self, end_position) -> None:
+        if self.__new_xs:
+            self.__xs = np.concatenate([self.__xs] + self.__new_xs)
+            self.__ys = np.concatenate([self.__ys] + self.__new_ys)
+            self.__new_xs = []
+            self.__new_ys = []
+
+        start_index, end_index, OS_index = trace_segment(self.__xs, self.__ys, end_position, self.__prev_click_point, self.__offset)
+        segment = {"start_index": start_index, "end_index": end_index, "PD_list": [], "OS_distance": None, "TD": None}
+
+        segment["PD_list"] = get_pause_distance(self.__pause_points, self.__pause_starts, self.__pause_ends,
+                                                start_index, end_index, OS_index, self.__get_distance)
+
+        if OS_index is not None:
+            segment['OS_distance'] = self.__get_distance(end_index, OS_index)
+
+        segment['TD'] = self.__get_distance(start_index, end_index)
+
+        self.analysis_result.append(segment)
+        self.end_points.append(end_position)
+        self.__prev_click_point = end_index
+        self.__drop_before(end_index - 1)
+
+    def __drop_before(self, index) -> None:
+        # Later segments only read points from the previous end point - 1 on
+        if index > self.__offset:
+            self.__xs = self.__xs[index - self.__offset:].copy()
+            self.__ys = self.__ys[index - self.__offset:].copy()
+            self.__offset = index
+
+        # Pauses starting before that are only needed while they are among the first points
+        head_count = bisect.bisect_left(self.__pause_starts, SEGMENT_WINDOW)
+        drop_count = bisect.bisect_left(self.__pause_starts, self.__prev_click_point) - head_count
+        if drop_count > 0:
+            del self.__pause_points[head_count:head_count + drop_count]
+            del self.__pause_starts[head_count:head_count + drop_count]
+            del self.__pause_ends[head_count:head_count + drop_count]
+
+
+def analyze_log_in_chunks(log_file: str, screen_width: int, screen_height: int, chunk_size: int = LOAD_CHUNK_SIZE) -> dict:
+    """
+    Validates and analyzes a session log without loading it into memory at once.
+
+    Memory is bounded by the longest stretch without a click, not by
+    chunk_size (see StreamingAnalyzer).
+
+    Returns:
+        dict: The same dict as AnalyzeModule.analyze_tracking_data, or
+        {"error": ...} if the log is not valid.
+    """
+    validator = StreamingValidator(screen_width, screen_height)
+    analyzer = StreamingAnalyzer()
+
+    try:
+        for timestamps, x, y, clicked in iter_log_chunks(log_file, validator.parse_rows, chunk_size):
+            validator.feed(timestamps, x, y)
+            analyzer.feed(timestamps, x, y, clicked)
+        validator.finish()
+    except Exception as e:
+        return {"error": str(e)}
+
+    return analyzer.finish()
+
+
+class LiveAnalyzer:
+    """
+    Validates and analyzes a session while it is being tracked.
+
+    add_sample is called with every row the tracker logs (from any thread).
+    Every batch_size samples it hands the batch to a background thread that
+    feeds a StreamingValidator and a StreamingAnalyzer, so the caller never
+    waits for the analysis. When tracking stops only the last batch and the
+    last segment are left for finish().
+    """
+
+    _STOP = object()
+
+    def __init__(self, screen_width: int, screen_height: int, batch_size: int = LIVE_BATCH_SIZE) -> None:
+        self.batch_size = batch_size
+        self.__validator = StreamingValidator(screen_width, screen_height)
+        self.__analyzer = StreamingAnalyzer()
+        self.__rows = []
+        self.__error = None                 # Only set by the analysis thread until it was joined
+        self.__result = None
+        self.__stopped = False
+        self.__lock = threading.Lock()
+
+        # Unbounded, since dropping a batch would make the result wrong; a batch is only batch_size rows
+        self.__queue = queue.Queue()
+        self.__thread = None                # Started with the first batch
+
+    def add_sample(self, timestamp: int, x: int, y: int, clicked: int) -> None:
+        # Only collects the sample; never blocks on the analysis
+        with self.__lock:
+            if self.__stopped:
+                return
+            self.__rows.append((timestamp, x, y, clicked))
+            if len(self.__rows) >= self.batch_size:
+                self.__queue_batch()
+
+    def __queue_batch(self) -> None:
+        # Must be called with the lock held
+        if self.__thread is None:
+            self.__thread = threading.Thread(target=self.__run, name="LiveAnalyzer", daemon=True)
+            self.__thread.start()
+        self.__queue.put_nowait(self.__rows)
+        self.__rows = []
+
+    def __run(self) -> None:
+        while True:
+            rows = self.__queue.get()
+            if rows is self._STOP:
+                return
+            if self.__error is None:
+                self.__advance(rows)
+
+    def __advance(self, rows: list) -> None:
+        # Runs on the analysis thread
+        columns = np.array(rows, dtype=np.int64)
+        timestamps, x, y = columns[:, 0], columns[:, 1], columns[:, 2]
+        clicked = (columns[:, 3] != 0).astype(np.int8)
+
+        try:
+            self.__validator.feed(timestamps, x, y)
+            self.__analyzer.feed(timestamps, x, y, clicked)
+        except Exception as e:
+            # The session is invalid; nothing after this point is analyzed
+            self.__error = str(e)
+
+    def finish(self) -> dict:
+        """
+        Waits for the queued batches, then returns the same dict as
+        AnalyzeModule.analyze_tracking_data, or {"error": ...} if the session
+        is not valid. Samples added afterwards are ignored.
+        """
+        with self.__lock:
+            if self.__result is None:
+                if not self.__stopped:
+                    self.__stopped = True
+                    if self.__rows:
+                        self.__queue_batch()
+                    if self.__thread is not None:
+                        self.__queue.put_nowait(self._STOP)
+                        self.__thread.join()
+
+                if self.__error is None:
+                    try:
+                        self.__validator.finish()
+                    except Exception as e:
+                        self.__error = str(e)
+
+                if self.__error is not None:
+                    self.__result = {"error": self.__error}
+                else:
+                    self.__result = self.__analyzer.finish()
+
+            return self.__result
@@ -1,27 +1,134 @@
 import sys
 import os
-import csv
+import time
+import threading
 from datetime import datetime
 import pyautogui  # For accessing the global mouse position
-from PyQt5.QtCore import QTimer  # To create timed updates
+from PyQt5.QtCore import QThread, pyqtSignal  # To sample off the GUI thread
 from PyQt5.QtWidgets import QApplication, QLabel, QVBoxLayout, QWidget  # Basic PyQt5 GUI elements
 from pynput.mouse import Controller as MouseController, Listener as MouseListener, Button
 from collections import namedtuple
+from Backend.log_writer import SessionLogWriter, FLUSH_EACH_BATCH
+from Backend.session_log import BinarySessionLogWriter, SessionLogHeader, get_log_file, FORMAT_VERSION
+from Backend.streaming_analysis import LiveAnalyzer
+
+
+# Capture modes
+POLLING_CAPTURE = "polling"     # Sample pyautogui.position() at a fixed rate
+EVENT_CAPTURE = "event"         # Sample on the mouse listener's move events
+
+# time.sleep waits on a high-resolution timer on Windows only from Python 3.11 on; before that (and for
+# Event.wait everywhere on Windows) waits are rounded up to the 15.6 ms system timer tick
+HIGH_RESOLUTION_SLEEP = sys.platform != "win32" or sys.version_info >= (3, 11)
+COARSE_WAIT_MARGIN_NS = 20_000_000      # Waits are only left to the coarse timer until this close to the deadline
+
+
+def sleep_until(deadline_ns: int) -> None:
+    # Sleeps until the monotonic clock reaches deadline_ns, to well under a millisecond
+    remaining = deadline_ns - time.monotonic_ns()
+    if HIGH_RESOLUTION_SLEEP:
+        if remaining > 0:
+            time.sleep(remaining / 1e9)
+        return
+
+    # Sleep while a whole timer tick fits, then spin for the rest
+    if remaining > COARSE_WAIT_MARGIN_NS:
+        time.sleep((remaining - COARSE_WAIT_MARGIN_NS) / 1e9)
+    while time.monotonic_ns() < deadline_ns:
+        time.sleep(0)
+
+
+class CursorSampler(QThread):
+    """
+    Calls a sampling function at a fixed rate on its own thread.
+
+    Ticks are scheduled against absolute deadlines on the monotonic clock, so
+    the time spent sampling does not add up as drift and a busy GUI thread does
+    not delay samples. The wait for each deadline uses sleep_until, since a
+    plain Event.wait is rounded up to 15.6 ms on Windows and would turn a 10 ms
+    interval into an uneven ~64Hz. If the thread falls behind (e.g. the machine
+    was suspended) the missed ticks are skipped rather than replayed in a burst.
+    stop() is seen once per tick, or during the coarse part of a long wait.
+    Failures are reported to the GUI only through the error_occurred signal.
+    """
+
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, sample_function, interval_ns: int) -> None:
+        super().__init__()
+        self.__sample_function = sample_function
+        self.__interval_ns = interval_ns
+        self.__stop_event = threading.Event()
+
+    def run(self) -> None:
+        next_deadline = time.monotonic_ns()
+
+        while not self.__stop_event.is_set():
+            try:
+                self.__sample_function()
+            except Exception as e:
+                self.error_occurred.emit(str(e))
+                return
+
+            next_deadline += self.__interval_ns
+            now = time.monotonic_ns()
+            if next_deadline <= now:
+                next_deadline += ((now - next_deadline) // self.__interval_ns + 1) * self.__interval_ns
+
+            # Long intervals wait on the stop event for most of the time, so stop() does not wait for the tick
+            if next_deadline - now > COARSE_WAIT_MARGIN_NS:
+                if self.__stop_event.wait((next_deadline - now - COARSE_WAIT_MARGIN_NS) / 1e9):
+                    return
+            sleep_until(next_deadline)
+
+    def stop(self) -> None:
+        self.__stop_event.set()
+        self.wait()
 
 
 class CursorTracker(QWidget):
-    def __init__(self, profile_id):
+    def __init__(self, profile_id, durability=FLUSH_EACH_BATCH, log_format="csv", capture_mode=POLLING_CAPTURE,
+                 min_interval_ms=10, coalesce=True, heartbeat_ms=1000, sample_rate=100, live_analysis=True,
+                 screen_size=None):
         super().__init__()
         self.__current_profile = profile_id
         self.__error = None
+        self.__durability = durability
+        self.__log_format = log_format      # "csv" or "binary"
+        self.__log_writer = None
+        self.__sample_rate = sample_rate    # Samples per second in polling mode
+        self.__live_analysis = live_analysis
+        self.__live_analyzer = None         # Analyzes the session while it is being tracked
+        self.__screen_size = screen_size    # Screen size the live analysis validates against; defaults to pyautogui.size()
+        self.sampler = None
+
+        # Event capture settings
+        if capture_mode not in (POLLING_CAPTURE, EVENT_CAPTURE):
+            raise ValueError(f"Unknown capture mode: {capture_mode}")
+        self.__capture_mode = capture_mode
+        self.__min_interval_ns = int(min_interval_ms * 1_000_000)  # Minimum time between two move samples
+        self.__coalesce = coalesce                                  # Keep (rather than drop) the latest move that came too early
+        self.__heartbeat_ns = int(heartbeat_ms * 1_000_000)         # Repeat the last position this often while idle
+        self.__event_lock = threading.Lock()
+        self.__last_sample_ns = None
+        self.__last_position = None
+        self.__pending_position = None
 
         current_dir = os.path.dirname(os.path.realpath(__file__))
         self.__current_session = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         self.__storage_dir = os.path.join(current_dir, "storage", "logs")
-        self.__log_file = os.path.join(self.__storage_dir, f"id_{self.__current_profile}_cursor_log_{self.__current_session}.csv")
+        self.__log_file = get_log_file(self.__storage_dir, self.__current_profile, self.__current_session, self.__log_format)
+
+        # Timestamps are monotonic nanoseconds since this point, anchored to the wall clock.
+        # Binary logs store the offset (the anchor is in the header), CSV logs store anchor + offset.
+        self.__anchor_ns = time.time_ns()
+        self.__monotonic_origin_ns = time.monotonic_ns()
 
         self.clicked_flag = False  # For tracking mouse clicked
-        self.mouse_listener = MouseListener(on_click=self.on_click) # Defining mouse_listener
+        if self.__capture_mode == EVENT_CAPTURE:
+            self.mouse_listener = MouseListener(on_click=self.on_click, on_move=self.on_move)
+        else:
+            self.mouse_listener = MouseListener(on_click=self.on_click) # Defining mouse_listener
         
         # Initialize CSV file and ensure storage directory exists
         try:
@@ -38,13 +145,20 @@ class CursorTracker(QWidget):
         # layout.addWidget(self.label)
         self.setLayout(layout)
 
-        #Set up a timer to repeatedly check and update the cursor position
+        #Set up a sampler thread to repeatedly check and update the cursor position
         self.update_cursor_position()
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_cursor_position)         # On timeout, call update function
-        self.timer.start(10)                                            # Trigger the timeout every 10 milliseconds (100Hz)
+        if self.__error:
+            return
+
+        if self.__capture_mode == EVENT_CAPTURE:
+            # Only flushes coalesced moves and writes heartbeats; positions come from the listener
+            self.sampler = CursorSampler(self.flush_pending_position, max(10_000_000, self.__min_interval_ns))
+        else:
+            self.sampler = CursorSampler(self.__sample_position, 1_000_000_000 // self.__sample_rate)  # 10 milliseconds at 100Hz
+        self.sampler.error_occurred.connect(self.__on_sampler_error)
+        self.sampler.start()
 
-        #Starts listening to mouse clicks
+        #Starts listening to mouse clicks (and moves in event capture mode)
         self.mouse_listener.start()  
 
     def __init_csv(self):
@@ -53,65 +167,170 @@ class CursorTracker(QWidget):
             if not os.path.exists(self.__storage_dir):
                 os.makedirs(self.__storage_dir)
 
-            # Create the file with the header
-            with open(self.__log_file, "w", newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow(["timestamp", "X", "Y", "clicked"])
+            screen_width, screen_height = pyautogui.size()
+            if self.__live_analysis:
+                self.__live_analyzer = LiveAnalyzer(*(self.__screen_size or (screen_width, screen_height)))
+
+            # Create the file with the header; the writer keeps it open for the whole session
+            if self.__log_format == "binary":
+                header = SessionLogHeader(FORMAT_VERSION, screen_width, screen_height, self.__sample_rate, self.__current_profile, self.__anchor_ns)
+                self.__log_writer = BinarySessionLogWriter(self.__log_file, header=header, durability=self.__durability)
+            else:
+                self.__log_writer = SessionLogWriter(self.__log_file, header=["timestamp", "X", "Y", "clicked"], durability=self.__durability)
             return True
         except Exception as e:
             raise Exception(f"Error creating log file: {str(e)}")
         
     def on_click(self, x, y, button, pressed):
         if button == Button.left and pressed:
-            self.clicked_flag = True  # Set flag true briefly
+            if self.__capture_mode == EVENT_CAPTURE:
+                # Clicks are end points, so they are written right away at the click position
+                with self.__event_lock:
+                    self.__pending_position = None
+                    self.__record_sample(x, y, 1)
+            else:
+                with self.__event_lock:
+                    self.clicked_flag = True  # Set flag true briefly
+
+    def on_move(self, x, y):
+        # Called from the listener thread for every move event
+        with self.__event_lock:
+            now = time.monotonic_ns()
+            if self.__last_sample_ns is None or now - self.__last_sample_ns >= self.__min_interval_ns:
+                self.__pending_position = None
+                self.__record_sample(x, y, 0, now)
+            elif self.__coalesce:
+                self.__pending_position = (x, y)
+
+    def flush_pending_position(self):
+        # Writes the latest coalesced move once the minimum interval has passed, or a heartbeat while idle
+        if 'error' in self.__log_writer.handle_error():
+            raise IOError(self.__log_writer.handle_error()['error'])
+
+        with self.__event_lock:
+            if self.__last_sample_ns is None:
+                return
+            now = time.monotonic_ns()
+            if self.__pending_position is not None:
+                if now - self.__last_sample_ns >= self.__min_interval_ns:
+                    x, y = self.__pending_position
+                    self.__pending_position = None
+                    self.__record_sample(x, y, 0, now)
+            elif now - self.__last_sample_ns >= self.__heartbeat_ns:
+                x, y = self.__last_position
+                self.__record_sample(x, y, 0, now)
+
+    def __make_timestamp(self, monotonic_ns):
+        if self.__log_format == "binary":
+            return monotonic_ns - self.__monotonic_origin_ns
+        return self.__anchor_ns + (monotonic_ns - self.__monotonic_origin_ns)
+
+    def __record_sample(self, x, y, clicked, now=None):
+        # Must be called with the event lock held
+        if now is None:
+            now = time.monotonic_ns()
+
+        self.__write_sample(self.__make_timestamp(now), x, y, clicked)
+        self.__last_sample_ns = now
+        self.__last_position = (x, y)
+
+    def __write_sample(self, timestamp, x, y, clicked):
+        # Only rows the writer accepted are analyzed, so the live analysis matches the log
+        if self.__log_writer.write([timestamp, x, y, clicked]) and self.__live_analyzer is not None:
+            self.__live_analyzer.add_sample(timestamp, x, y, clicked)
+
+    def get_live_analysis(self):
+        """
+        Result of the live analysis, to be called after close(): the same dict as
+        AnalyzeModule.analyze_tracking_data, or {"error": ...} if the session is not valid.
+        Returns None if live analysis is off or the log could not be written completely,
+        in which case the log has to be analyzed with AnalyzeModule.
+        """
+        if self.__live_analyzer is None or self.__log_writer is None:
+            return None
+        if 'error' in self.__log_writer.handle_error():
+            return None
+        return self.__live_analyzer.finish()
 
     def get_current_session(self):
         return self.__current_session
 
     def update_cursor_position(self):
         try:
-            # Get the current global position of the mouse cursor
-            pos = pyautogui.position()
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
-
-            # Stubbing test (uncomment one at a time)
-            Point = namedtuple('Point', ['x', 'y'])
-            # # case 1: position is null
-            # pos = None
-            # timestamp = None
-
-            # # case 2: x position is null
-            # pos = Point(None, pos.y)
-            
-            # # case 3: y position is null
-            # pos = Point(pos.x, None)
-
-            # # case 4: timestamp is null
-            # timestamp = None
-
-            # Check if the position is valid
-            if pos is None and timestamp is None:
-                raise ValueError("Memory Shortage Detected, tracking has been disabled. Clicking OK will start analysis with existing data.")
-            
-            if pos is None or pos.x is None or pos.y is None or timestamp is None:
-                raise ValueError("Invalid data detected within the tracked data. Tracking has been disabled. Clicking OK will start analysis with existing data.")
-            
-            clicked = 1 if self.clicked_flag else 0
-            self.clicked_flag = False   
-            # Write to the log file
-            with open(self.__log_file, "a", newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow([timestamp, pos.x, pos.y, clicked])
-                
+            self.__sample_position()
         except Exception as e:
             self.__error = str(e)
             self.close()
             return
-    
+
+    def __on_sampler_error(self, message):
+        # Runs on the GUI thread
+        self.__error = message
+        self.close()
+
+    def __sample_position(self):
+        # Get the current global position of the mouse cursor; the timestamp is taken right after the read
+        pos = pyautogui.position()
+        now = time.monotonic_ns()
+        timestamp = self.__make_timestamp(now)
+
+        # Stubbing test (uncomment one at a time)
+        Point = namedtuple('Point', ['x', 'y'])
+        # # case 1: position is null
+        # pos = None
+        # timestamp = None
+
+        # # case 2: x position is null
+        # pos = Point(None, pos.y)
+        
+        # # case 3: y position is null
+        # pos = Point(pos.x, None)
+
+        # # case 4: timestamp is null
+        # timestamp = None
+
+        # Check if the position is valid
+        if pos is None and timestamp is None:
+            raise ValueError("Memory Shortage Detected, tracking has been disabled. Clicking OK will start analysis with existing data.")
+        
+        if pos is None or pos.x is None or pos.y is None or timestamp is None:
+            raise ValueError("Invalid data detected within the tracked data. Tracking has been disabled. Clicking OK will start analysis with existing data.")
+        
+        if 'error' in self.__log_writer.handle_error():
+            raise IOError(self.__log_writer.handle_error()['error'])
+
+        with self.__event_lock:
+            clicked = 1 if self.clicked_flag else 0
+            self.clicked_flag = False   
+            # Hand the row over to the background log writer
+            self.__write_sample(timestamp, pos.x, pos.y, clicked)
+
+            if self.__capture_mode == EVENT_CAPTURE:
+                # Seeds the event capture with the starting position
+                self.__last_sample_ns = now
+                self.__last_position = (pos.x, pos.y)
+
+
     def close(self):
-        # Ensure timer is stopped when closing
-        if hasattr(self, 'timer') and self.timer is not None:
-            self.timer.stop()
+        # Ensure the sampler thread is stopped when closing
+        if self.sampler is not None:
+            self.sampler.stop()
+            self.sampler = None
+
+        if hasattr(self, 'mouse_listener') and self.mouse_listener is not None:
+            self.mouse_listener.stop()
+
+        # Keep the last coalesced move, it may be where the cursor came to rest
+        if self.__capture_mode == EVENT_CAPTURE and self.__log_writer is not None:
+            with self.__event_lock:
+                if self.__pending_position is not None:
+                    x, y = self.__pending_position
+                    self.__pending_position = None
+                    self.__record_sample(x, y, 0)
+
+        # Write out every buffered row before the log is analyzed
+        if self.__log_writer is not None:
+            self.__log_writer.close()
         super().close()
 
     def handle_error(self):
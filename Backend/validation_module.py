@@ -0,0 +1,174 @@
+import math
+import numpy as np
+from Backend.session_log import parse_timestamp_ns
+
+MIN_SAMPLE_COUNT = 100                  # Have 100 for testing purposes; TODO, change back to 1000
+ABRUPT_MOVEMENT_SQUARED = 250000        # A jump of 500 pixels or more between two samples is abrupt
+
+INSUFFICIENT_DATA_ERROR = "Cursor tracking data is not sufficient. Please make sure the tracking persists for at least 10 second."
+TIMESTAMP_ERROR = "The timestamp of the tracking data is missing or invalid. Please try again."
+POSITION_ERROR = "The data points of the tracking data are missing, invalid, or out of range. Please try again."
+ABRUPT_MOVEMENT_ERROR = "Unusual cursor movement (Abrupt movement) detected. Please try again with natural movement behavior."
+NO_MOVEMENT_ERROR = "Unusual cursor movement (No movement) detected. Please try again with natural movement behavior."
+RESTLESS_MOVEMENT_ERROR = "Unusual cursor movement (Restless movement) detected. Please try again with natural movement behavior."
+
+
+class ValidationError(Exception):
+    pass
+
+
+class StreamingValidator:
+    """
+    Validates a session in a single pass while it is being read.
+
+    The log is fed chunk by chunk as typed columns (CSV rows are converted
+    with parse_rows first). Every rule is checked on each chunk together with
+    the last sample of the previous chunk, and the first violation raises a
+    ValidationError right away, so the rest of the file is never read.
+    Rules that need the whole session (length, no movement, restless
+    movement) are checked by finish().
+
+    Summary statistics are collected along the way and returned by
+    get_summary() for reuse by later stages.
+    """
+
+    def __init__(self, screen_width: int, screen_height: int) -> None:
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+
+        self.sample_count = 0
+        self.min_x = None
+        self.max_x = None
+        self.min_y = None
+        self.max_y = None
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.moved = False              # The cursor moved at least once
+        self.paused = False             # The cursor stayed still at least once
+        self.max_jump_squared = 0       # Largest squared distance between two consecutive samples
+
+        self.__last_sample = None       # (timestamp, x, y) of the last validated sample
+
+    def parse_rows(self, rows: list):
+        """
+        Parses CSV rows of the form [timestamp, x, y, clicked] into typed columns.
+
+        Returns:
+            tuple: (timestamps, x, y, clicked) as NumPy arrays.
+        """
+        # Timestamps are parsed once here and kept as integer nanoseconds for every later stage
+        try:
+            timestamps = np.array([parse_timestamp_ns(row[0]) for row in rows], dtype=np.int64)
+        except ValueError:
+            raise ValidationError(TIMESTAMP_ERROR)
+
+        # If a data point is missing or not an integer, int() fails
+        try:
+            x = np.array([int(row[1]) for row in rows], dtype=np.int64)
+            y = np.array([int(row[2]) for row in rows], dtype=np.int64)
+        except (ValueError, OverflowError):
+            raise ValidationError(POSITION_ERROR)
+
+        # if the "clicked" entry is not valid, it counts as 0
+        clicked = (np.array([row[3] for row in rows], dtype=str) == '1').astype(np.int8)
+
+        return timestamps, x, y, clicked
+
+    def feed(self, timestamps: np.ndarray, x: np.ndarray, y: np.ndarray) -> None:
+        """Validates the next chunk of typed columns."""
+        if len(timestamps) == 0:
+            return
+
+        # Prepend the last sample of the previous chunk so that rules between samples cross chunk boundaries
+        if self.__last_sample is not None:
+            last_timestamp, last_x, last_y = self.__last_sample
+            timestamps_with_last = np.concatenate(([last_timestamp], timestamps))
+            x_with_last = np.concatenate(([last_x], x))
+            y_with_last = np.concatenate(([last_y], y))
+        else:
+            timestamps_with_last, x_with_last, y_with_last = timestamps, x, y
+
+        # Check if the timestamps are consistent
+        if bool((np.diff(timestamps_with_last) < 0).any()):
+            raise ValidationError(TIMESTAMP_ERROR)
+
+        # Check if the cursor position is within the screen
+        if bool(((x < 0) | (x >= self.screen_width) | (y < 0) | (y >= self.screen_height)).any()):
+            raise ValidationError(POSITION_ERROR)
+
+        dx = np.diff(x_with_last)
+        dy = np.diff(y_with_last)
+        squared_distances = dx * dx + dy * dy
+
+        if len(squared_distances) > 0:
+            # for abrupt change in cursor position
+            max_jump_squared = int(squared_distances.max())
+            if max_jump_squared >= ABRUPT_MOVEMENT_SQUARED:
+                raise ValidationError(ABRUPT_MOVEMENT_ERROR)
+
+            self.max_jump_squared = max(self.max_jump_squared, max_jump_squared)
+            self.moved = self.moved or bool((squared_distances != 0).any())
+            self.paused = self.paused or bool((squared_distances == 0).any())
+
+        self.sample_count += len(timestamps)
+        self.min_x = int(x.min()) if self.min_x is None else min(self.min_x, int(x.min()))
+        self.max_x = int(x.max()) if self.max_x is None else max(self.max_x, int(x.max()))
+        self.min_y = int(y.min()) if self.min_y is None else min(self.min_y, int(y.min()))
+        self.max_y = int(y.max()) if self.max_y is None else max(self.max_y, int(y.max()))
+        if self.first_timestamp is None:
+            self.first_timestamp = int(timestamps[0])
+        self.last_timestamp = int(timestamps[-1])
+
+        self.__last_sample = (int(timestamps[-1]), int(x[-1]), int(y[-1]))
+
+    def finish(self) -> dict:
+        """Checks the rules that need the whole session and returns the summary."""
+        if self.sample_count < MIN_SAMPLE_COUNT:
+            raise ValidationError(INSUFFICIENT_DATA_ERROR)
+
+        if not self.moved:
+            raise ValidationError(NO_MOVEMENT_ERROR)
+
+        if not self.paused:
+            raise ValidationError(RESTLESS_MOVEMENT_ERROR)
+
+        return self.get_summary()
+
+    def get_summary(self) -> dict:
+        return {
+            "sample_count": self.sample_count,
+            "bounding_box": {"min_x": self.min_x, "max_x": self.max_x, "min_y": self.min_y, "max_y": self.max_y},
+            "first_timestamp": self.first_timestamp,
+            "last_timestamp": self.last_timestamp,
+            "moved": self.moved,
+            "paused": self.paused,
+            "max_jump": math.sqrt(self.max_jump_squared)
+        }
+
+    def get_state(self) -> dict:
+        # Everything carried from one chunk to the next, as JSON values (for checkpoints, see from_state)
+        return {
+            "screen_width": self.screen_width,
+            "screen_height": self.screen_height,
+            "sample_count": self.sample_count,
+            "bounding_box": [self.min_x, self.max_x, self.min_y, self.max_y],
+            "first_timestamp": self.first_timestamp,
+            "last_timestamp": self.last_timestamp,
+            "moved": self.moved,
+            "paused": self.paused,
+            "max_jump_squared": self.max_jump_squared,
+            "last_sample": list(self.__last_sample) if self.__last_sample is not None else None
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "StreamingValidator":
+        validator = cls(state["screen_width"], state["screen_height"])
+        validator.sample_count = state["sample_count"]
+        validator.min_x, validator.max_x, validator.min_y, validator.max_y = state["bounding_box"]
+        validator.first_timestamp = state["first_timestamp"]
+        validator.last_timestamp = state["last_timestamp"]
+        validator.moved = state["moved"]
+        validator.paused = state["paused"]
+        validator.max_jump_squared = state["max_jump_squared"]
+        validator.__last_sample = tuple(state["last_sample"]) if state["last_sample"] is not None else None
+        return validator
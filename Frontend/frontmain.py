@@ -172,6 +172,11 @@ class MainInterface(QMainWindow):
         dialog.profile_created.connect(self.switch_to_profile_page)
         dialog.exec_()
     
+    def closeEvent(self, event):
+        # Save profile changes that are still waiting for their delayed write
+        self.profile_handler.flush()
+        super().closeEvent(event)
+
     def switch_to_profile_page(self, profile):
         profile_page = ProfileWindow(profile, self, self.profile_handler)
         self.setCentralWidget(profile_page)
@@ -6,7 +6,8 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt
 
 from Backend.tracking_module import CursorTracker
-from Backend.analyze_module import AnalyzeModule
+from Backend.analysis_worker import AnalysisWorker
+from Backend.analysis_cache import AnalysisCache
 from Backend.calculate_module import DPICalculationModule
 from Frontend.error_window import *
 from Frontend.alert_window import *
@@ -22,6 +23,7 @@ class ProfileWindow(QWidget):
         self.main_window = main_window
         self.cursor_tracker = None
         self.analyze_module = None
+        self.analysis_worker = None
         self.current_session = None
         self.profile_handler = profile_handler
         self.initUI()
@@ -142,6 +144,12 @@ class ProfileWindow(QWidget):
         self.analysis_error_label.setStyleSheet("font-size: 16px; color: #ff5252;")
         self.analysis_error_label.setVisible(False)
 
+        self.cancel_analysis_button = QPushButton("Cancel Analysis")
+        self.cancel_analysis_button.setFixedSize(200, 40)
+        self.cancel_analysis_button.setStyleSheet("font-size: 16px; background-color: #2c2c2c; color: white;")
+        self.cancel_analysis_button.clicked.connect(self.cancel_analysis)
+        self.cancel_analysis_button.setVisible(False)
+
         # === LAYOUT COMPOSITION ===
         top_layout = QGridLayout()
         top_layout.addWidget(back_button, 0, 0, alignment=Qt.AlignLeft | Qt.AlignTop)
@@ -157,6 +165,7 @@ class ProfileWindow(QWidget):
         status_container = QVBoxLayout()
         status_container.addWidget(self.status_message_label)
         status_container.addWidget(self.analysis_error_label)
+        status_container.addWidget(self.cancel_analysis_button, alignment=Qt.AlignHCenter)
         status_widget = QWidget()
         status_widget.setLayout(status_container)
         status_widget.setFixedHeight(int(self.screen_height * 0.1))
@@ -192,6 +201,10 @@ class ProfileWindow(QWidget):
                 error_popup = ErrorPopup("Please stop tracking before going back.")
                 error_popup.exec_()
                 return
+            if self.analysis_worker is not None:
+                error_popup = ErrorPopup("Please wait for the analysis to finish or cancel it before going back.")
+                error_popup.exec_()
+                return
         except Exception as e:
             error_popup = ErrorPopup(f"Unexpected error: {str(e)}")
             error_popup.exec_()
@@ -208,7 +221,8 @@ class ProfileWindow(QWidget):
             
             # Start tracking
             try:
-                self.cursor_tracker = CursorTracker(self.profile['_id'])
+                self.cursor_tracker = CursorTracker(self.profile['_id'], log_format="binary",
+                                                    screen_size=(self.screen_width, self.screen_height))
                 self.current_session = self.cursor_tracker.get_current_session()
                 
                 if 'error' in self.cursor_tracker.handle_error():
@@ -241,8 +255,11 @@ class ProfileWindow(QWidget):
             # Stop tracking
             # TODO: Implement error handling; need to receive signal with error msg to the main window that the tracker has stopped
             if hasattr(self, 'cursor_tracker') and self.cursor_tracker is not None:
+                live_analysis = None
                 try:
                     self.cursor_tracker.close()
+                    # The session was analyzed while it was tracked; only the last segment is left
+                    live_analysis = self.cursor_tracker.get_live_analysis()
                     self.cursor_tracker.deleteLater()
                     self.cursor_tracker = None
                     # Show success message
@@ -256,65 +273,115 @@ class ProfileWindow(QWidget):
                     self.status_message_label.setStyleSheet("font-size: 16px; color: #ff5252;") # Red for error
                     self.status_message_label.setVisible(True)
 
-                # Start analyzing
-                self.analyze_module = AnalyzeModule(self.profile['_id'], self.current_session, self.screen_width, self.screen_height)
+                if live_analysis is not None:
+                    if 'error' in live_analysis:
+                        error_popup = ErrorPopup(message=live_analysis['error'])
+                        error_popup.exec_()
+                    else:
+                        self.show_analysis_result(live_analysis)
+                    return
 
-                # Check if data points are valid
-                if ('error' in self.analyze_module.handle_error()):
+                # Otherwise analyze the log on a worker thread so the window stays responsive
+                self.analysis_worker = AnalysisWorker(self.profile['_id'], self.current_session, self.screen_width, self.screen_height,
+                                                      cache=AnalysisCache())
+                self.analysis_worker.progress.connect(self.on_analysis_progress)
+                self.analysis_worker.analysis_finished.connect(self.on_analysis_finished)
+                self.analysis_worker.analysis_failed.connect(self.on_analysis_failed)
+                self.analysis_worker.cancelled.connect(self.on_analysis_cancelled)
+
+                # No new tracking session until this one has been analyzed
+                self.toggle_button.setEnabled(False)
+                self.cancel_analysis_button.setEnabled(True)
+                self.cancel_analysis_button.setVisible(True)
+                self.analysis_worker.start()
+
+    def cancel_analysis(self):
+        if self.analysis_worker is not None:
+            self.analysis_worker.cancel()
+            self.cancel_analysis_button.setEnabled(False)
+            self.status_message_label.setText("Cancelling analysis...")
+
+    def on_analysis_progress(self, stage):
+        self.status_message_label.setText(f"Analyzing your movement ({stage})...")
+        self.status_message_label.setStyleSheet("font-size: 16px; color: #4caf50;")
+        self.status_message_label.setVisible(True)
+
+    def __end_analysis(self):
+        # Runs on the GUI thread once the worker has emitted its last signal
+        self.analysis_worker.wait()
+        self.analyze_module = self.analysis_worker.analyzer
+        self.analysis_worker.deleteLater()
+        self.analysis_worker = None
+        self.cancel_analysis_button.setVisible(False)
+        self.toggle_button.setEnabled(True)
+
+    def on_analysis_cancelled(self):
+        self.__end_analysis()
+        self.status_message_label.setText("Analysis cancelled")
+        self.status_message_label.setStyleSheet("font-size: 16px; color: #FCAE1E;") # Warm Orange for warning
+        self.status_message_label.setVisible(True)
+
+    def on_analysis_failed(self, error_message):
+        self.__end_analysis()
+        self.status_message_label.setVisible(False)
 
-                    # Display error message in the UI
-                    error_message = self.analyze_module.handle_error()['error']
+        # Display error message in the UI
+        error_popup = ErrorPopup(message=error_message)
+        error_popup.exec_()
 
-                    error_popup = ErrorPopup(message=error_message)
-                    error_popup.exec_()
-                else:
-                    movement_data = self.analyze_module.analyze_tracking_data()
-
-                    # Log the total distance of the tracking session
-                    self.profile_handler.update_session_total_distance(self.profile['_id'], self.current_session, movement_data["total_distance"])
-
-                    # Display window to ask if the user wants to proceed to calculation
-                    alert_message = "We have analyzed your movement for the current session. Would you like us to recommend a DPI that fits better based on your movement?"
-                    dpi_popup = Popup(alert_message, "Movement Analyzed", "Get DPI", "No")
-                    dpi_popup.exec_()
-
-                    # If user clicks "Get DPI", proceed to calculation
-                    if dpi_popup.result() == QDialog.Accepted:
-                        # TODO: Implement calculation
-                        DPI_calculation_module = DPICalculationModule(self.profile, movement_data["analysis_result"])
-
-                        if (DPI_calculation_module.dpi['out_of_bounds_flag'] == True):
-                            # Display error message in the UI
-                            error_message = f"Our calculated DPI is {DPI_calculation_module.dpi['DPI_recommendation']}. \nThis is outside the valid range: (100-3200).\nWe did not update your DPI. Please try again."
-
-                            error_popup = ErrorPopup(message=error_message)
-                            error_popup.exec_()
-
-                            return
-
-                        elif (DPI_calculation_module.dpi['large_diff_flag'] == True):
-                            # Display window to ask if the user wants to proceed to calculation
-                            alert_message = f"Our calculated DPI is {DPI_calculation_module.dpi['DPI_recommendation']}. \nKeep in mind that this is a large difference from your current DPI: {self.profile['DPI']}.\n"
-                            large_diff_popup = Popup_OK_Only(alert_message, "Warning", "Large Difference", "OK")
-                            large_diff_popup.exec_()
-
-                        self.profile['DPI'] = DPI_calculation_module.dpi['DPI_recommendation']
-                        self.profile_handler.update_dpi(self.profile['_id'], DPI_calculation_module.dpi['DPI_recommendation'])
-                        # Update the title label with the new DPI
-                        self.title_label.setText(f"{self.profile['name']}'s Profile ({self.profile['DPI']} DPI)")
-
-                        # add the new dpi to self.profile for dpi history
-                        updated_profile = self.profile_handler.refresh_profile(self.profile["_id"])
-                        self.profile = updated_profile
-                        self.dpi_plot_widget.profile = updated_profile
-                        self.dpi_plot_widget.plot_dpi_history()
-                        self.dt_plot_widget.profile = updated_profile
-                        self.dt_plot_widget.plot_dt_history()
+    def on_analysis_finished(self, movement_data):
+        self.__end_analysis()
+        self.status_message_label.setText("Tracking stopped successfully")
+        self.status_message_label.setStyleSheet("font-size: 16px; color: #4caf50;") # Green for success
+        self.status_message_label.setVisible(True)
+        self.show_analysis_result(movement_data)
 
-                    else:
-                        self.status_message_label.setText("DPI not calculated")
-                        self.status_message_label.setStyleSheet("font-size: 16px; color: #FCAE1E;") # Warm Orange for warning
-                        self.status_message_label.setVisible(True)
+    def show_analysis_result(self, movement_data):
+        # Log the total distance of the tracking session
+        self.profile_handler.update_session_total_distance(self.profile['_id'], self.current_session, movement_data["total_distance"])
+
+        # Display window to ask if the user wants to proceed to calculation
+        alert_message = "We have analyzed your movement for the current session. Would you like us to recommend a DPI that fits better based on your movement?"
+        dpi_popup = Popup(alert_message, "Movement Analyzed", "Get DPI", "No")
+        dpi_popup.exec_()
+
+        # If user clicks "Get DPI", proceed to calculation
+        if dpi_popup.result() == QDialog.Accepted:
+            # TODO: Implement calculation
+            DPI_calculation_module = DPICalculationModule(self.profile, movement_data["analysis_result"])
+
+            if (DPI_calculation_module.dpi['out_of_bounds_flag'] == True):
+                # Display error message in the UI
+                error_message = f"Our calculated DPI is {DPI_calculation_module.dpi['DPI_recommendation']}. \nThis is outside the valid range: (100-3200).\nWe did not update your DPI. Please try again."
+
+                error_popup = ErrorPopup(message=error_message)
+                error_popup.exec_()
+
+                return
+
+            elif (DPI_calculation_module.dpi['large_diff_flag'] == True):
+                # Display window to ask if the user wants to proceed to calculation
+                alert_message = f"Our calculated DPI is {DPI_calculation_module.dpi['DPI_recommendation']}. \nKeep in mind that this is a large difference from your current DPI: {self.profile['DPI']}.\n"
+                large_diff_popup = Popup_OK_Only(alert_message, "Warning", "Large Difference", "OK")
+                large_diff_popup.exec_()
+
+            self.profile['DPI'] = DPI_calculation_module.dpi['DPI_recommendation']
+            self.profile_handler.update_dpi(self.profile['_id'], DPI_calculation_module.dpi['DPI_recommendation'])
+            # Update the title label with the new DPI
+            self.title_label.setText(f"{self.profile['name']}'s Profile ({self.profile['DPI']} DPI)")
+
+            # add the new dpi to self.profile for dpi history
+            updated_profile = self.profile_handler.refresh_profile(self.profile["_id"])
+            self.profile = updated_profile
+            self.dpi_plot_widget.profile = updated_profile
+            self.dpi_plot_widget.plot_dpi_history()
+            self.dt_plot_widget.profile = updated_profile
+            self.dt_plot_widget.plot_dt_history()
+
+        else:
+            self.status_message_label.setText("DPI not calculated")
+            self.status_message_label.setStyleSheet("font-size: 16px; color: #FCAE1E;") # Warm Orange for warning
+            self.status_message_label.setVisible(True)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
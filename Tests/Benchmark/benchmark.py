@@ -0,0 +1,213 @@
+"""
+Benchmarks for the analysis, the DPI calculation, profile storage and graph data
+preparation at realistic session sizes.
+
+    python -m Tests.Benchmark.benchmark --output bench.json
+    python -m Tests.Benchmark.benchmark --baseline bench.json --output new.json
+
+Results are written as JSON. With --baseline, every benchmark that got slower
+than the baseline by more than --tolerance is reported and the exit code is 1.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import tempfile
+from datetime import datetime, timedelta
+import numpy as np
+
+from Backend.analyze_module import AnalyzeModule
+from Backend.calculate_module import DPICalculationModule
+from Backend.profile_handler import ProfileHandler
+from Backend.kernels import HAVE_NUMBA
+from Backend.distance_rollups import make_rollups
+from Tests.trajectory_generator import generate_session, write_session
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 5_000_000]
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.25                # A benchmark more than 25% slower than the baseline is a regression
+SCREEN_WIDTH = 1920
+SCREEN_HEIGHT = 1080
+SAMPLES_PER_SESSION_ENTRY = 100         # History length of the storage and graph benchmarks is size / 100
+PROFILE_UPDATES = 50                    # Profile updates timed per storage benchmark
+
+
+def generate_distance_history(count: int, seed: int = 0) -> list[dict]:
+    # One entry per session over the last 30 days, oldest first
+    rng = random.Random(seed)
+    now = datetime.now()
+    history = []
+    for i in range(count):
+        timestamp = now - timedelta(days=30) * (count - i) / max(count, 1)
+        history.append({"timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S"), "total_distance": rng.randint(1000, 100000)})
+    return history
+
+
+def time_call(function, repeat: int) -> list[float]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def bench_analysis(log_file: str, repeat: int) -> dict:
+    analyzers = []
+    results = {"analyze_module_init": time_call(
+        lambda: analyzers.append(AnalyzeModule(1, "benchmark", SCREEN_WIDTH, SCREEN_HEIGHT, log_file=log_file)), repeat)}
+
+    error = analyzers[-1].handle_error()
+    if 'error' in error:
+        raise RuntimeError(f"Generated session is invalid: {error['error']}")
+
+    # Every run gets a fresh analyzer so that no cached intermediate results are reused
+    movement_data = []
+    def analyze():
+        movement_data.append(analyzers.pop().analyze_tracking_data())
+    results["analyze_tracking_data"] = time_call(analyze, repeat)
+
+    segments = movement_data[-1]["analysis_result"]
+    results["dpi_calculation"] = time_call(lambda: DPICalculationModule({"DPI": 800}, segments), repeat)
+    return results
+
+
+def bench_profile_updates(history: list[dict], repeat: int) -> list[float]:
+    times = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as storage_dir:
+            profile = {"_id": 1, "name": "benchmark", "DPI": 800,
+                       "DPI_history": [], "session_total_distance": list(history)}
+            with open(os.path.join(storage_dir, "profiles.json"), "w") as file:
+                json.dump([profile], file, indent=4)
+
+            # Without compaction, the oldest entries of the history would be dropped during the timed updates
+            profile_handler = ProfileHandler(storage_dir=storage_dir, compaction_days=None)
+            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")   # Every update is a plain append
+            start = time.perf_counter()
+            for i in range(PROFILE_UPDATES):
+                profile_handler.update_session_total_distance(1, timestamp, i)
+                profile_handler.update_dpi(1, 800 + i)
+            times.append(time.perf_counter() - start)
+            profile_handler.close()
+    return times
+
+
+def bench_graph(history: list[dict], repeat: int) -> list[float]:
+    # Imported here so that the other benchmarks run without a display
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    from Backend.DTgraph import DTGraphEmbed
+
+    app = QApplication.instance() or QApplication([])
+    # Profiles from ProfileHandler carry their rollups, so the graph only reads them
+    widget = DTGraphEmbed({"session_total_distance": history, "session_distance_rollups": make_rollups(history)})
+
+    # One run prepares the graph for every time frame of the dropdown
+    def plot_all_time_frames():
+        for index in range(widget.dropdown.count()):
+            widget.dropdown.setCurrentIndex(index)
+            widget.plot_dt_history()
+
+    times = time_call(plot_all_time_frames, repeat)
+    widget.deleteLater()
+    app.processEvents()
+    return times
+
+
+def summarize(name: str, size: int, times: list[float]) -> dict:
+    return {"benchmark": name, "size": size, "repeat": len(times),
+            "min_seconds": min(times), "median_seconds": statistics.median(times)}
+
+
+def run_benchmarks(sizes: list[int], repeat: int = DEFAULT_REPEAT, graph: bool = True) -> dict:
+    results = []
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as log_dir:
+            log_file = os.path.join(log_dir, "id_1_cursor_log_benchmark.sflog")
+            write_session(generate_session(size), log_file, "binary", screen_width=SCREEN_WIDTH, screen_height=SCREEN_HEIGHT)
+
+            for name, times in bench_analysis(log_file, repeat).items():
+                results.append(summarize(name, size, times))
+
+        history = generate_distance_history(size // SAMPLES_PER_SESSION_ENTRY)
+        results.append(summarize("profile_updates", size, bench_profile_updates(history, repeat)))
+        if graph:
+            results.append(summarize("dt_graph", size, bench_graph(history, repeat)))
+
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "numba": HAVE_NUMBA,
+            "platform": platform.platform(),
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        },
+        "results": results
+    }
+
+
+def compare_to_baseline(report: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list[dict]:
+    """
+    Compares the minimum times of two reports. Benchmarks missing from either
+    report are ignored.
+
+    Returns:
+        list of dict: One dict per regression with benchmark, size, baseline_seconds,
+        seconds and ratio.
+    """
+    baseline_times = {(result["benchmark"], result["size"]): result["min_seconds"] for result in baseline["results"]}
+    regressions = []
+
+    for result in report["results"]:
+        baseline_seconds = baseline_times.get((result["benchmark"], result["size"]))
+        if not baseline_seconds:
+            continue
+        ratio = result["min_seconds"] / baseline_seconds
+        if ratio > 1 + tolerance:
+            regressions.append({"benchmark": result["benchmark"], "size": result["size"],
+                                "baseline_seconds": baseline_seconds, "seconds": result["min_seconds"], "ratio": ratio})
+
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the analysis, DPI calculation, profile storage and graphs.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Session sizes in samples")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Runs per benchmark; the fastest counts")
+    parser.add_argument("--output", default=None, help="JSON file for the results (default: print them)")
+    parser.add_argument("--baseline", default=None, help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown against the baseline")
+    parser.add_argument("--no-graph", action="store_true", help="Skip the graph benchmark (needs PyQt5)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, args.repeat, graph=not args.no_graph)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=4)
+    else:
+        print(json.dumps(report, indent=4))
+
+    for result in report["results"]:
+        print(f"{result['benchmark']:<24}{result['size']:>10}  {result['min_seconds']:.4f}s", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            regressions = compare_to_baseline(report, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression['benchmark']} at {regression['size']} samples is "
+                  f"{regression['ratio']:.2f}x the baseline", file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -58,4 +58,28 @@ def test_yaxis_scaling(qtbot):
     
     ymin, ymax = widget.graph_widget.getViewBox().viewRange()[1]
     assert ymin == 0.0
-    assert ymax == 1500 * 1.1  # 1650
\ No newline at end of file
+    assert ymax == 1500 * 1.1  # 1650
+
+def test_reads_stored_rollups(qtbot):
+    now = datetime.now()
+    profile = {
+        # Compacted: the raw entries are gone, the rollups remain
+        "session_total_distance": [],
+        "session_distance_rollups": {
+            "hourly": {(now - timedelta(hours=2)).strftime("%Y-%m-%d %H:00:00"): 300},
+            "daily": {(now - timedelta(days=2)).strftime("%Y-%m-%d"): 400, (now - timedelta(days=20)).strftime("%Y-%m-%d"): 500}
+        }
+    }
+    widget = DTGraphEmbed(profile)
+    qtbot.addWidget(widget)
+
+    bars = [item for item in widget.graph_widget.items() if isinstance(item, pg.BarGraphItem)]
+    assert bars[0].opts['height'] == [300]
+
+    widget.dropdown.setCurrentIndex(1)
+    bars = [item for item in widget.graph_widget.items() if isinstance(item, pg.BarGraphItem)]
+    assert bars[0].opts['height'] == [400]
+
+    widget.dropdown.setCurrentIndex(2)
+    bars = [item for item in widget.graph_widget.items() if isinstance(item, pg.BarGraphItem)]
+    assert bars[0].opts['height'] == [500, 400]
@@ -0,0 +1,119 @@
+from Backend.analysis_cache import AnalysisCache, build_cache_entry
+from Backend.analysis_worker import AnalysisWorker, LOADING_STAGE
+from Backend.analyze_module import AnalyzeModule
+from Backend.instrumentation import Instrumentation
+from unittest.mock import patch
+import pytest
+import os
+
+def make_log(tmp_path, name="log.csv", content="timestamp,X,Y,clicked\n"):
+    log_file = tmp_path / name
+    log_file.write_text(content)
+    return str(log_file)
+
+def make_entry(value):
+    return {"error": None, "validation_summary": {}, "pause_segments": [], "end_points": [],
+            "movement_data": {"analysis_result": [], "total_distance": value}}
+
+
+def test_put_and_get(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache"))
+    log_file = make_log(tmp_path)
+    assert cache.get(log_file, 1920, 1080) is None
+
+    cache.put(log_file, 1920, 1080, make_entry(12.5))
+    assert cache.get(log_file, 1920, 1080) == make_entry(12.5)
+
+    # Persists across instances
+    assert AnalysisCache(str(tmp_path / "cache")).get(log_file, 1920, 1080) == make_entry(12.5)
+
+def test_changed_log_misses(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache"))
+    log_file = make_log(tmp_path)
+    cache.put(log_file, 1920, 1080, make_entry(1.0))
+
+    with open(log_file, "a") as f:
+        f.write("1,2,3,0\n")
+    assert cache.get(log_file, 1920, 1080) is None
+
+def test_screen_size_is_part_of_key(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache"))
+    log_file = make_log(tmp_path)
+    cache.put(log_file, 1920, 1080, make_entry(1.0))
+    assert cache.get(log_file, 3840, 2160) is None
+
+def test_lru_eviction(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache"), max_entries=2)
+    logs = [make_log(tmp_path, f"log{i}.csv") for i in range(3)]
+    cache.put(logs[0], 1920, 1080, make_entry(0.0))
+    cache.put(logs[1], 1920, 1080, make_entry(1.0))
+
+    # Using log0 makes log1 the least recently used
+    assert cache.get(logs[0], 1920, 1080) is not None
+    cache.put(logs[2], 1920, 1080, make_entry(2.0))
+
+    assert len(cache) == 2
+    assert cache.get(logs[1], 1920, 1080) is None
+    assert cache.get(logs[0], 1920, 1080) is not None
+    assert cache.get(logs[2], 1920, 1080) is not None
+    assert len([f for f in os.listdir(tmp_path / "cache") if f != "index.json"]) == 2
+
+@pytest.mark.parametrize("parameter", ["Backend.analyze_module.ANALYSIS_VERSION", "Backend.kernels.SEGMENT_WINDOW",
+                                       "Backend.kernels.TRACE_PAUSE_THRESHOLD", "Backend.kernels.OVERSHOOT_ANGLE",
+                                       "Backend.kernels.START_ANGLE"])
+def test_parameter_change_invalidates(tmp_path, parameter):
+    cache = AnalysisCache(str(tmp_path / "cache"))
+    log_file = make_log(tmp_path)
+    cache.put(log_file, 1920, 1080, make_entry(1.0))
+
+    with patch(parameter, 999):
+        reopened = AnalysisCache(str(tmp_path / "cache"))
+        assert len(reopened) == 0
+        assert reopened.get(log_file, 1920, 1080) is None
+
+def test_build_cache_entry(create_valid_log_file):
+    with patch("Backend.analyze_module.os.path.dirname", return_value=create_valid_log_file):
+        analyzer = AnalyzeModule(profile_id=1, session="sessionA", screen_width=1920, screen_height=1080)
+        movement_data = analyzer.analyze_tracking_data()
+        pause_segments = analyzer.get_pause_segments()
+        end_points = analyzer.find_end_points()
+        entry = build_cache_entry(analyzer, movement_data, pause_segments, end_points)
+
+    assert entry["error"] is None
+    assert entry["movement_data"] == movement_data
+    assert entry["pause_segments"] == pause_segments
+    assert entry["end_points"] == end_points
+    assert entry["validation_summary"]["sample_count"] == 100
+
+def test_worker_runs_each_stage_once_with_cache(qtbot, create_valid_log_file, tmp_path):
+    instrumentation = Instrumentation()
+    with patch("Backend.analyze_module.os.path.dirname", return_value=create_valid_log_file):
+        worker = AnalysisWorker(profile_id=1, session="sessionA", screen_width=1920, screen_height=1080,
+                                cache=AnalysisCache(str(tmp_path / "cache")), instrumentation=instrumentation)
+        with qtbot.waitSignal(worker.analysis_finished, timeout=10000):
+            worker.start()
+        worker.wait()
+
+    # Storing the result reuses the pauses and end points instead of finding them again
+    stages = {record["stage"]: record for record in instrumentation.get_report()["stages"]}
+    assert stages["get_pause_segments"]["calls"] == 1
+    assert stages["find_end_points"]["calls"] == 1
+
+def test_worker_uses_cache(qtbot, create_valid_log_file, tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache"))
+    with patch("Backend.analyze_module.os.path.dirname", return_value=create_valid_log_file):
+        first = AnalysisWorker(profile_id=1, session="sessionA", screen_width=1920, screen_height=1080, cache=cache)
+        with qtbot.waitSignal(first.analysis_finished, timeout=10000) as first_result:
+            first.start()
+        first.wait()
+
+        second = AnalysisWorker(profile_id=1, session="sessionA", screen_width=1920, screen_height=1080, cache=cache)
+        stages = []
+        second.progress.connect(stages.append)
+        with qtbot.waitSignal(second.analysis_finished, timeout=10000) as second_result:
+            second.start()
+        second.wait()
+
+    assert second_result.args == first_result.args
+    assert stages == [LOADING_STAGE]
+    assert second.analyzer is None
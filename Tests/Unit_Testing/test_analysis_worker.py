@@ -0,0 +1,51 @@
+from Backend.analysis_worker import AnalysisWorker, ANALYSIS_STAGES
+from Backend.analyze_module import AnalyzeModule
+from unittest.mock import patch
+
+def run_worker(qtbot, worker):
+    events = {"progress": [], "finished": [], "failed": [], "cancelled": 0}
+    worker.progress.connect(events["progress"].append)
+    worker.analysis_finished.connect(events["finished"].append)
+    worker.analysis_failed.connect(events["failed"].append)
+    worker.cancelled.connect(lambda: events.__setitem__("cancelled", events["cancelled"] + 1))
+
+    with qtbot.waitSignal(worker.finished, timeout=10000):
+        worker.start()
+    qtbot.wait(10) # Deliver the queued signals to the GUI thread
+    return events
+
+
+def test_worker_reports_stages_and_result(qtbot, create_valid_log_file):
+    with patch("Backend.analyze_module.os.path.dirname", return_value=create_valid_log_file):
+        worker = AnalysisWorker(profile_id=1, session="sessionA", screen_width=1920, screen_height=1080)
+        events = run_worker(qtbot, worker)
+        expected = AnalyzeModule(profile_id=1, session="sessionA", screen_width=1920, screen_height=1080).analyze_tracking_data()
+
+    assert events["progress"] == list(ANALYSIS_STAGES)
+    assert events["finished"] == [expected]
+    assert events["failed"] == [] and events["cancelled"] == 0
+
+def test_worker_reports_validation_error(qtbot, create_short_log_file):
+    with patch("Backend.analyze_module.os.path.dirname", return_value=create_short_log_file):
+        worker = AnalysisWorker(profile_id=1, session="sessionA", screen_width=1920, screen_height=1080)
+        events = run_worker(qtbot, worker)
+
+    assert "Cursor tracking data is not sufficient" in events["failed"][0]
+    assert events["finished"] == []
+
+def test_worker_reports_missing_log(qtbot, tmp_path):
+    with patch("Backend.analyze_module.os.path.dirname", return_value=str(tmp_path)):
+        worker = AnalysisWorker(profile_id=1, session="missing", screen_width=1920, screen_height=1080)
+        events = run_worker(qtbot, worker)
+
+    assert "Tracking log file not found" in events["failed"][0]
+
+def test_worker_cancel(qtbot, create_valid_log_file):
+    with patch("Backend.analyze_module.os.path.dirname", return_value=create_valid_log_file):
+        worker = AnalysisWorker(profile_id=1, session="sessionA", screen_width=1920, screen_height=1080)
+        worker.cancel()
+        events = run_worker(qtbot, worker)
+
+    assert events["cancelled"] == 1
+    assert events["finished"] == [] and events["failed"] == []
+    assert events["progress"] == []
@@ -1,6 +1,9 @@
 from unittest.mock import patch
-from Backend.analyze_module import AnalyzeModule
+from Backend.analyze_module import AnalyzeModule, AnalysisCancelled
+from Backend.session_log import parse_timestamp_ns
+from Tests.conftest import write_log_file, generate_paused_segment_rows
 import pytest
+import os
 
 def test_valid_log(create_valid_log_file):
     with patch("Backend.analyze_module.os.path.dirname", return_value=create_valid_log_file):
@@ -172,4 +175,73 @@ def test_pause_in_segment(create_paused_segment_log):
         end_positions = analyzer.find_end_points()
         segments = analyzer.analyze_all_segment(end_positions)
         
-        assert len(segments[0]["PD_list"]) > 0  # Should detect pauses
\ No newline at end of file
+        assert len(segments[0]["PD_list"]) > 0  # Should detect pauses
+
+def test_integer_timestamps_match_legacy(create_paused_segment_log):
+    # The tracker now logs integer nanoseconds; results must match the legacy string timestamps
+    logs_path = os.path.join(create_paused_segment_log, "storage", "logs")
+    rows = generate_paused_segment_rows()
+    write_log_file(os.path.join(logs_path, "id_2_cursor_log_sessionA.csv"),
+                   [[str(parse_timestamp_ns(row[0])), row[1], row[2], row[3]] for row in rows])
+
+    with patch("Backend.analyze_module.os.path.dirname", return_value=create_paused_segment_log):
+        legacy_analyzer = AnalyzeModule(profile_id=1, session="sessionA", screen_width=3840, screen_height=2160)
+        integer_analyzer = AnalyzeModule(profile_id=2, session="sessionA", screen_width=3840, screen_height=2160)
+
+        assert integer_analyzer.handle_error() == legacy_analyzer.handle_error()
+        assert integer_analyzer.get_pause_segments() == legacy_analyzer.get_pause_segments()
+        assert integer_analyzer.analyze_tracking_data() == legacy_analyzer.analyze_tracking_data()
+
+# Reference outputs of the list-of-dicts engine; the array engine must reproduce them exactly
+def test_analysis_result_paused_segment(create_paused_segment_log):
+    with patch("Backend.analyze_module.os.path.dirname", return_value=create_paused_segment_log):
+        analyzer = AnalyzeModule(profile_id=1, session="sessionA", screen_width=3840, screen_height=2160)
+        assert analyzer.analyze_tracking_data() == {
+            "analysis_result": [{"start_index": 0, "end_index": 80, "PD_list": [565.685424949238], "OS_distance": None, "TD": 2262.741699796952}],
+            "total_distance": 3309.2597359530528
+        }
+
+def test_analysis_result_multiple_segments(create_multiple_endpoint_log):
+    with patch("Backend.analyze_module.os.path.dirname", return_value=create_multiple_endpoint_log):
+        analyzer = AnalyzeModule(profile_id=1, session="sessionA", screen_width=3840, screen_height=2160)
+        assert analyzer.analyze_tracking_data() == {
+            "analysis_result": [
+                {"start_index": 0, "end_index": 20, "PD_list": [], "OS_distance": None, "TD": 1166.19037896906},
+                {"start_index": 35, "end_index": 60, "PD_list": [], "OS_distance": None, "TD": 1457.7379737113251},
+                {"start_index": 65, "end_index": 90, "PD_list": [], "OS_distance": None, "TD": 2948.9320100673735}
+            ],
+            "total_distance": 11576.728843287125
+        }
+
+def test_pause_distance_matches_full_scan(create_paused_segment_log):
+    with patch("Backend.analyze_module.os.path.dirname", return_value=create_paused_segment_log):
+        analyzer = AnalyzeModule(profile_id=1, session="sessionA", screen_width=3840, screen_height=2160)
+        pauses = analyzer.get_pause_segments()
+        last_index = len(analyzer.get_step_distances())
+
+        # Every range must select the same pauses as checking each pause in turn
+        for startpoint in range(0, last_index, 7):
+            for endpoint in range(startpoint, last_index + 1, 5):
+                selected = [startpoint] + [p["start_index"] for p in pauses
+                                           if startpoint <= p["start_index"] and endpoint >= p["end_index"]
+                                           and not (p["start_index"] <= endpoint <= p["end_index"])]
+                expected = [d for d in (analyzer.get_distance(a, b) for a, b in zip(selected, selected[1:])) if d > 0]
+                assert analyzer.get_pause_distance(startpoint, endpoint, endpoint) == expected
+
+def test_path_length(create_paused_segment_log):
+    with patch("Backend.analyze_module.os.path.dirname", return_value=create_paused_segment_log):
+        analyzer = AnalyzeModule(profile_id=1, session="sessionA", screen_width=3840, screen_height=2160)
+        last_index = len(analyzer.get_step_distances())
+
+        assert analyzer.get_path_length(0, last_index) == pytest.approx(analyzer.get_total_distance())
+        assert analyzer.get_path_length(10, 30) == pytest.approx(sum(analyzer.get_distance(i, i + 1) for i in range(10, 30)))
+        assert analyzer.get_path_length(30, 10) == analyzer.get_path_length(10, 30)
+
+        # The path is never shorter than the straight line
+        assert 0 < analyzer.get_path_efficiency(0, last_index) <= 1
+        assert analyzer.get_path_efficiency(0, 0) is None
+
+def test_cancel_while_loading(create_valid_log_file):
+    with patch("Backend.analyze_module.os.path.dirname", return_value=create_valid_log_file):
+        with pytest.raises(AnalysisCancelled):
+            AnalyzeModule(profile_id=1, session="sessionA", screen_width=1920, screen_height=1080, should_cancel=lambda: True)
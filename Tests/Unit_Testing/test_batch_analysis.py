@@ -0,0 +1,127 @@
+from Backend.batch_analysis import find_sessions, analyze_session_log, analyze_profiles, write_results, main
+from Backend.analysis_cache import AnalysisCache, build_cache_entry
+from Backend.analyze_module import AnalyzeModule
+from Backend.calculate_module import DPICalculationModule
+from Backend.incremental_analysis import CheckpointStore
+from Backend.streaming_analysis import StreamingAnalyzer
+from Tests.conftest import write_log_file, generate_valid_rows, generate_abrupt_movement_rows
+from unittest.mock import patch
+import pytest
+import json
+import os
+
+SESSIONS = ["2026-01-01_10-00-00", "2026-01-02_10-00-00", "2026-01-03_10-00-00"]
+PROFILES = [{"_id": 1, "name": "A", "DPI": 800, "DPI_history": [], "session_total_distance": []},
+            {"_id": 2, "name": "B", "DPI": 1600, "DPI_history": [], "session_total_distance": []}]
+
+def create_logs(logs_path):
+    for session in SESSIONS:
+        write_log_file(os.path.join(logs_path, f"id_1_cursor_log_{session}.csv"), generate_valid_rows())
+    write_log_file(os.path.join(logs_path, "id_1_cursor_log_2026-01-04_10-00-00.csv"), generate_abrupt_movement_rows())
+    write_log_file(os.path.join(logs_path, "id_2_cursor_log_2026-01-01_12-00-00.csv"), generate_valid_rows())
+    write_log_file(os.path.join(logs_path, "id_12_cursor_log_2026-01-01_12-00-00.csv"), generate_valid_rows())
+
+
+def test_find_sessions(temp_log_dir):
+    _, logs_path = temp_log_dir
+    create_logs(logs_path)
+    assert find_sessions(1, logs_path) == SESSIONS + ["2026-01-04_10-00-00"]
+    assert find_sessions(2, logs_path) == ["2026-01-01_12-00-00"]
+    assert find_sessions(3, logs_path) == []
+
+@pytest.mark.parametrize("session", [SESSIONS[0], "2026-01-04_10-00-00"])
+def test_analyze_session_log_matches_in_memory(temp_log_dir, session):
+    temp_dir, logs_path = temp_log_dir
+    create_logs(logs_path)
+    log_file = os.path.join(logs_path, f"id_1_cursor_log_{session}.csv")
+
+    with patch("Backend.analyze_module.os.path.dirname", return_value=temp_dir):
+        analyzer = AnalyzeModule(1, session, 1920, 1080)
+    movement_data = None
+    if 'error' not in analyzer.handle_error():
+        movement_data = analyzer.analyze_tracking_data()
+    expected = build_cache_entry(analyzer, movement_data, analyzer.get_pause_segments(), analyzer.find_end_points())
+
+    assert analyze_session_log(1, session, log_file, 1920, 1080) == expected
+
+def test_analyze_session_log_missing_file(tmp_path):
+    entry = analyze_session_log(1, "sessionA", str(tmp_path / "missing.csv"), 1920, 1080)
+    assert "not found" in entry["error"]
+    assert entry["validation_summary"] is None
+
+def test_analyze_session_log_resumes_from_checkpoint(temp_log_dir, tmp_path):
+    temp_dir, logs_path = temp_log_dir
+    log_file = os.path.join(logs_path, f"id_1_cursor_log_{SESSIONS[0]}.csv")
+    rows = generate_valid_rows()
+    checkpoints = CheckpointStore(str(tmp_path / "checkpoints"))
+
+    write_log_file(log_file, rows[:60])
+    assert analyze_session_log(1, SESSIONS[0], log_file, 1920, 1080, checkpoints.checkpoint_dir)["error"]
+
+    # Only the appended rows are read
+    write_log_file(log_file, rows)
+    with patch("Backend.streaming_analysis.StreamingAnalyzer.feed", autospec=True,
+               side_effect=StreamingAnalyzer.feed) as feed:
+        entry = analyze_session_log(1, SESSIONS[0], log_file, 1920, 1080, checkpoints.checkpoint_dir)
+    assert sum(len(call.args[1]) for call in feed.call_args_list) == len(rows) - 60
+    assert entry == analyze_session_log(1, SESSIONS[0], log_file, 1920, 1080)
+
+    with patch("Backend.analyze_module.os.path.dirname", return_value=temp_dir):
+        expected = AnalyzeModule(1, SESSIONS[0], 1920, 1080).analyze_tracking_data()
+    assert entry["movement_data"] == expected
+
+def test_analyze_profiles(temp_log_dir):
+    temp_dir, logs_path = temp_log_dir
+    create_logs(logs_path)
+    results = analyze_profiles([1, 2], 1920, 1080, profiles=PROFILES, logs_dir=logs_path, max_workers=2)
+
+    with patch("Backend.analyze_module.os.path.dirname", return_value=temp_dir):
+        expected = AnalyzeModule(1, SESSIONS[0], 1920, 1080).analyze_tracking_data()
+
+    sessions = results[1]["sessions"]
+    assert list(sessions) == SESSIONS + ["2026-01-04_10-00-00"]
+    assert sessions[SESSIONS[0]]["movement_data"] == expected
+    assert "Abrupt movement" in sessions["2026-01-04_10-00-00"]["error"]
+    assert sessions["2026-01-04_10-00-00"]["movement_data"] is None
+
+    # One recommendation from the segments of every valid session
+    assert results[1]["dpi"] == DPICalculationModule(PROFILES[0], expected["analysis_result"] * 3).dpi
+    assert list(results[2]["sessions"]) == ["2026-01-01_12-00-00"]
+
+def test_analyze_profiles_uses_cache(temp_log_dir, tmp_path):
+    _, logs_path = temp_log_dir
+    create_logs(logs_path)
+    cache = AnalysisCache(str(tmp_path / "cache"))
+    first = analyze_profiles([1], 1920, 1080, profiles=PROFILES, logs_dir=logs_path, max_workers=2, cache=cache)
+    assert len(cache) == 4
+
+    # Everything is cached, so no worker process is started
+    with patch("Backend.batch_analysis.ProcessPoolExecutor") as executor:
+        second = analyze_profiles([1], 1920, 1080, profiles=PROFILES, logs_dir=logs_path, cache=cache)
+        executor.assert_not_called()
+    assert second == first
+
+def test_write_results(temp_log_dir, tmp_path):
+    _, logs_path = temp_log_dir
+    create_logs(logs_path)
+    results = analyze_profiles([1], 1920, 1080, profiles=PROFILES, logs_dir=logs_path, max_workers=1)
+    written = write_results(results, str(tmp_path / "out"))
+
+    assert len(written) == 5
+    with open(tmp_path / "out" / "id_1_summary.json") as f:
+        summary = json.load(f)
+    assert summary["session_count"] == 4
+    assert summary["valid_session_count"] == 3
+    assert list(summary["errors"]) == ["2026-01-04_10-00-00"]
+    assert summary["dpi"] == results[1]["dpi"]
+
+def test_main(temp_log_dir, tmp_path, capsys):
+    _, logs_path = temp_log_dir
+    create_logs(logs_path)
+    with patch("Backend.batch_analysis.get_logs_dir", return_value=logs_path), \
+         patch("Backend.batch_analysis.ProfileHandler") as profile_handler:
+        profile_handler.return_value.get_profiles.return_value = PROFILES
+        assert main(["1", "--width", "1920", "--height", "1080", "--output", str(tmp_path / "out"), "--no-cache", "--workers", "1"]) == 0
+
+    assert "Profile 1: 4 sessions" in capsys.readouterr().out
+    assert os.path.exists(tmp_path / "out" / "id_1_summary.json")
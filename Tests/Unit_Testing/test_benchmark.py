@@ -0,0 +1,30 @@
+from Tests.Benchmark.benchmark import run_benchmarks, compare_to_baseline, main
+import json
+
+def make_report(times):
+    return {"results": [{"benchmark": name, "size": size, "min_seconds": seconds} for (name, size), seconds in times.items()]}
+
+
+def test_run_benchmarks_reports_every_benchmark(qtbot):
+    report = run_benchmarks([2000], repeat=1)
+    names = [result["benchmark"] for result in report["results"]]
+
+    assert names == ["analyze_module_init", "analyze_tracking_data", "dpi_calculation", "profile_updates", "dt_graph"]
+    assert all(result["size"] == 2000 and result["min_seconds"] >= 0 for result in report["results"])
+    json.dumps(report)
+
+def test_compare_to_baseline_flags_regressions():
+    baseline = make_report({("analyze_tracking_data", 1000): 1.0, ("dpi_calculation", 1000): 1.0, ("dt_graph", 1000): 0.0})
+    report = make_report({("analyze_tracking_data", 1000): 1.5, ("dpi_calculation", 1000): 1.1,
+                          ("dt_graph", 1000): 1.0, ("profile_updates", 1000): 9.0})
+
+    regressions = compare_to_baseline(report, baseline, tolerance=0.25)
+    assert [(regression["benchmark"], regression["ratio"]) for regression in regressions] == [("analyze_tracking_data", 1.5)]
+
+def test_main_fails_on_regression(tmp_path):
+    baseline_file = tmp_path / "baseline.json"
+    baseline_file.write_text(json.dumps(make_report({("analyze_tracking_data", 2000): 1e-9})))
+
+    assert main(["--sizes", "2000", "--repeat", "1", "--no-graph", "--output", str(tmp_path / "out.json")]) == 0
+    assert main(["--sizes", "2000", "--repeat", "1", "--no-graph", "--output", str(tmp_path / "out.json"),
+                 "--baseline", str(baseline_file)]) == 1
@@ -0,0 +1,73 @@
+from Backend.cursor_log import CursorLog, CursorSample
+from Backend.analyze_module import AnalyzeModule
+from unittest.mock import patch
+import numpy as np
+import pytest
+
+def make_log(n=10):
+    return CursorLog(np.arange(n) * 10, np.arange(n) + 100, np.arange(n) + 200, np.arange(n) % 2)
+
+
+def test_index_returns_sample():
+    log = make_log()
+
+    assert log[3] == CursorSample(30, 103, 203, 1)
+    assert log[-1] == CursorSample(90, 109, 209, 1)
+    assert isinstance(log[3].x, int)
+    with pytest.raises(IndexError):
+        log[10]
+
+def test_samples_use_slots():
+    sample = make_log()[0]
+    with pytest.raises(AttributeError):
+        sample.other = 1
+    assert not hasattr(sample, "__dict__")
+
+def test_slice_shares_columns():
+    log = make_log()
+    window = log[2:5]
+
+    assert len(window) == 3
+    assert list(window) == [log[2], log[3], log[4]]
+    assert np.shares_memory(window.xs, log.xs)
+
+def test_iteration_yields_every_sample():
+    log = make_log(10000)
+    samples = list(log)
+
+    assert len(samples) == 10000
+    assert samples[5000] == log[5000]
+
+def test_columns_are_compact_and_read_only():
+    log = make_log()
+
+    assert log.timestamps.dtype == np.int64 and log.xs.dtype == np.int32 and log.clicked.dtype == np.int8
+    assert log.nbytes == 10 * 17
+    with pytest.raises(ValueError):
+        log.xs[0] = 5
+
+def test_huge_coordinates_stay_exact():
+    log = CursorLog([0, 1], [0, 2**40], [0, 0], [0, 0])
+
+    assert log.xs.dtype == np.int64
+    assert log[1].x == 2**40
+
+def test_from_chunks_joins_chunks():
+    chunks = [(np.array([0, 1]), np.array([5, 6]), np.array([7, 8]), np.array([0, 1])),
+              (np.array([2]), np.array([9]), np.array([10]), np.array([0]))]
+    log = CursorLog.from_chunks(chunks)
+
+    assert list(log) == [CursorSample(0, 5, 7, 0), CursorSample(1, 6, 8, 1), CursorSample(2, 9, 10, 0)]
+    assert len(CursorLog.from_chunks([])) == 0
+
+def test_columns_must_match():
+    with pytest.raises(ValueError):
+        CursorLog([0, 1], [0], [0, 1], [0, 1])
+
+def test_analyzer_stores_cursor_log(create_valid_log_file):
+    with patch("Backend.analyze_module.os.path.dirname", return_value=create_valid_log_file):
+        analyzer = AnalyzeModule(profile_id=1, session="sessionA", screen_width=1920, screen_height=1080)
+    log = analyzer.get_cursor_log()
+
+    assert len(log) == 100
+    assert (log[1].x, log[1].y, log[1].clicked) == (100, 100, 1)
@@ -0,0 +1,47 @@
+from Backend.distance_rollups import make_rollups, add_to_rollups, get_rollups, compact_profile, get_compaction_cutoff
+from datetime import datetime
+
+def make_entries():
+    return [
+        {"timestamp": "2025-03-01 09:15:00", "total_distance": 100},
+        {"timestamp": "2025-03-01 09:45:00", "total_distance": 50},
+        {"timestamp": "2025-03-01 22:00:00", "total_distance": 25},
+        {"timestamp": "2025-03-03 08:00:00", "total_distance": 10}
+    ]
+
+
+def test_make_rollups():
+    assert make_rollups(make_entries()) == {
+        "hourly": {"2025-03-01 09:00:00": 150, "2025-03-01 22:00:00": 25, "2025-03-03 08:00:00": 10},
+        "daily": {"2025-03-01": 175, "2025-03-03": 10}
+    }
+
+def test_add_to_rollups_matches_make_rollups():
+    entries = make_entries()
+    rollups = make_rollups(entries[:2])
+    for entry in entries[2:]:
+        add_to_rollups(rollups, entry)
+    assert rollups == make_rollups(entries)
+
+def test_get_rollups_prefers_stored_rollups():
+    stored = make_rollups()
+    assert get_rollups({"session_total_distance": make_entries(), "session_distance_rollups": stored}) is stored
+    assert get_rollups({"session_total_distance": make_entries()}) == make_rollups(make_entries())
+
+def test_compact_profile():
+    entries = make_entries()
+    profile = {"session_total_distance": entries, "session_distance_rollups": make_rollups(entries)}
+
+    assert compact_profile(profile, "2025-03-01 09:30:00")
+    assert profile["session_total_distance"] == entries[1:]
+    # The 09:00 hour had not ended at the cutoff, so its total stays
+    assert list(profile["session_distance_rollups"]["hourly"]) == ["2025-03-01 09:00:00", "2025-03-01 22:00:00",
+                                                                   "2025-03-03 08:00:00"]
+    assert profile["session_distance_rollups"]["daily"] == {"2025-03-01": 175, "2025-03-03": 10}
+
+    assert compact_profile(profile, "2025-03-02 00:00:00")
+    assert profile["session_total_distance"] == entries[3:]
+    assert not compact_profile(profile, "2025-03-02 00:00:00")
+
+def test_get_compaction_cutoff():
+    assert get_compaction_cutoff(30, datetime(2025, 3, 31, 12, 0, 0)) == "2025-03-01 12:00:00"
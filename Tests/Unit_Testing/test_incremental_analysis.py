@@ -0,0 +1,166 @@
+from Backend.incremental_analysis import analyze_incrementally, resume_analysis, CheckpointStore
+from Backend.streaming_analysis import analyze_log_in_chunks
+from Backend import incremental_analysis, validation_module
+from Tests.trajectory_generator import generate_session, write_session
+from unittest.mock import patch
+import pytest
+import json
+import os
+
+def write_prefix(data, path, length):
+    with open(path, "wb") as file:
+        file.write(data[:length])
+
+def make_log(tmp_path, log_format, sample_count=4000, seed=0):
+    extension = ".sflog" if log_format == "binary" else ".csv"
+    full_log = str(tmp_path / ("full" + extension))
+    write_session(generate_session(sample_count, seed=seed), full_log, log_format)
+    with open(full_log, "rb") as file:
+        return file.read(), str(tmp_path / ("id_1_cursor_log_growing" + extension))
+
+
+@pytest.mark.parametrize("log_format", ["csv", "binary"])
+def test_appended_log_matches_full_analysis(tmp_path, log_format):
+    data, log_file = make_log(tmp_path, log_format)
+    checkpoint = None
+
+    # Cuts in the middle of lines and records as well
+    for length in (len(data) // 3 + 5, len(data) // 2 + 11, len(data)):
+        write_prefix(data, log_file, length)
+        result, checkpoint = analyze_incrementally(log_file, 1920, 1080, checkpoint)
+        assert result == analyze_log_in_chunks(log_file, 1920, 1080)
+
+    assert result["analysis_result"]
+    assert checkpoint["byte_offset"] == len(data)
+
+@pytest.mark.parametrize("log_format", ["csv", "binary"])
+def test_only_the_tail_is_read(tmp_path, log_format):
+    data, log_file = make_log(tmp_path, log_format)
+    write_prefix(data, log_file, len(data) // 2)
+    _, checkpoint = analyze_incrementally(log_file, 1920, 1080)
+    first_sample_count = checkpoint["sample_count"]
+
+    write_prefix(data, log_file, len(data))
+    with patch("Backend.streaming_analysis.StreamingAnalyzer.feed", autospec=True,
+               side_effect=incremental_analysis.StreamingAnalyzer.feed) as feed:
+        _, checkpoint = analyze_incrementally(log_file, 1920, 1080, checkpoint)
+
+    fed = sum(len(call.args[1]) for call in feed.call_args_list)
+    assert fed == checkpoint["sample_count"] - first_sample_count
+
+def test_rewritten_log_starts_over(tmp_path):
+    data, log_file = make_log(tmp_path, "csv")
+    write_prefix(data, log_file, len(data))
+    _, checkpoint = analyze_incrementally(log_file, 1920, 1080)
+
+    other_data, _ = make_log(tmp_path, "csv", seed=1)
+    write_prefix(other_data, log_file, len(other_data))
+    result, _ = analyze_incrementally(log_file, 1920, 1080, checkpoint)
+
+    assert result == analyze_log_in_chunks(log_file, 1920, 1080)
+
+def test_other_settings_start_over(tmp_path):
+    data, log_file = make_log(tmp_path, "binary")
+    write_prefix(data, log_file, len(data))
+    _, checkpoint = analyze_incrementally(log_file, 1920, 1080)
+
+    with patch.object(validation_module, "MIN_SAMPLE_COUNT", 10**6):
+        assert not incremental_analysis.is_checkpoint_usable(checkpoint, log_file, 1920, 1080)
+    assert not incremental_analysis.is_checkpoint_usable(checkpoint, log_file, 3840, 2160)
+    assert incremental_analysis.is_checkpoint_usable(checkpoint, log_file, 1920, 1080)
+
+def test_short_log_becomes_valid_when_appended(tmp_path):
+    data, log_file = make_log(tmp_path, "csv")
+    write_prefix(data, log_file, 500)
+    result, checkpoint = analyze_incrementally(log_file, 1920, 1080)
+    assert result == {"error": validation_module.INSUFFICIENT_DATA_ERROR}
+
+    write_prefix(data, log_file, len(data))
+    result, _ = analyze_incrementally(log_file, 1920, 1080, checkpoint)
+    assert "analysis_result" in result
+
+def test_invalid_prefix_stays_invalid(tmp_path):
+    log_file = str(tmp_path / "invalid.csv")
+    with open(log_file, "w") as file:
+        file.write("timestamp,X,Y,clicked\n1000,5,5,0\n2000,900,900,0\n")
+    result, checkpoint = analyze_incrementally(log_file, 1920, 1080)
+    assert result == {"error": validation_module.ABRUPT_MOVEMENT_ERROR}
+    assert checkpoint["error"] == validation_module.ABRUPT_MOVEMENT_ERROR
+
+    with open(log_file, "a") as file:
+        file.write("3000,901,900,0\n")
+    assert analyze_incrementally(log_file, 1920, 1080, checkpoint) == ({"error": validation_module.ABRUPT_MOVEMENT_ERROR}, checkpoint)
+
+@pytest.mark.parametrize("log_format", ["csv", "binary"])
+def test_fixed_invalid_log_is_analyzed_again(tmp_path, log_format):
+    data, log_file = make_log(tmp_path, log_format)
+    session = generate_session(4000, seed=0)
+    # The same session with one sample off the screen
+    session.xs[100] = 5000
+    write_session(session, log_file, log_format)
+
+    store = CheckpointStore(str(tmp_path / "checkpoints"))
+    assert store.analyze(log_file, 1920, 1080) == {"error": validation_module.POSITION_ERROR}
+    assert store.get(log_file, 1920, 1080)["byte_offset"] > 0
+
+    write_prefix(data, log_file, len(data))
+    assert store.analyze(log_file, 1920, 1080) == analyze_log_in_chunks(log_file, 1920, 1080)
+
+def test_unreadable_checkpoint_state_starts_over(tmp_path):
+    data, log_file = make_log(tmp_path, "binary")
+    write_prefix(data, log_file, len(data) // 2)
+    _, checkpoint = analyze_incrementally(log_file, 1920, 1080)
+
+    # As if written by a version of the analyzer that kept other state
+    checkpoint["state"]["analyzer"] = {"points": []}
+    write_prefix(data, log_file, len(data))
+    result, checkpoint = analyze_incrementally(log_file, 1920, 1080, checkpoint)
+    assert result == analyze_log_in_chunks(log_file, 1920, 1080)
+    assert checkpoint["byte_offset"] == len(data)
+
+def test_store_keeps_checkpoints(tmp_path):
+    data, log_file = make_log(tmp_path, "binary")
+    store = CheckpointStore(str(tmp_path / "checkpoints"))
+    assert store.get(log_file, 1920, 1080) is None
+
+    write_prefix(data, log_file, len(data) // 2)
+    store.analyze(log_file, 1920, 1080)
+    assert store.get(log_file, 1920, 1080)["byte_offset"] < len(data)
+
+    write_prefix(data, log_file, len(data))
+    assert store.analyze(log_file, 1920, 1080) == analyze_log_in_chunks(log_file, 1920, 1080)
+    assert store.get(log_file, 1920, 1080)["byte_offset"] == len(data)
+    assert len(os.listdir(store.checkpoint_dir)) == 1
+
+    # Checkpoints are plain JSON
+    with open(os.path.join(store.checkpoint_dir, os.listdir(store.checkpoint_dir)[0]), "r") as file:
+        assert json.load(file) == store.get(log_file, 1920, 1080)
+
+def test_unreadable_checkpoint_file_starts_over(tmp_path):
+    data, log_file = make_log(tmp_path, "binary")
+    write_prefix(data, log_file, len(data))
+    store = CheckpointStore(str(tmp_path / "checkpoints"))
+    store.analyze(log_file, 1920, 1080)
+
+    for name in os.listdir(store.checkpoint_dir):
+        with open(os.path.join(store.checkpoint_dir, name), "w") as file:
+            file.write('{"version": 2, "log_')
+    assert store.get(log_file, 1920, 1080) is None
+    assert store.analyze(log_file, 1920, 1080) == analyze_log_in_chunks(log_file, 1920, 1080)
+
+@pytest.mark.parametrize("log_format", ["csv", "binary"])
+def test_resumed_state_matches_full_analysis(tmp_path, log_format):
+    data, log_file = make_log(tmp_path, log_format)
+    write_prefix(data, log_file, len(data) // 2)
+    _, _, _, checkpoint = resume_analysis(log_file, 1920, 1080)
+
+    # The checkpoint goes through JSON, as it does in a CheckpointStore
+    write_prefix(data, log_file, len(data))
+    validator, analyzer, error, _ = resume_analysis(log_file, 1920, 1080, json.loads(json.dumps(checkpoint)))
+
+    full_validator, full_analyzer, _, _ = resume_analysis(log_file, 1920, 1080)
+    assert error is None
+    assert validator.get_summary() == full_validator.get_summary()
+    assert analyzer.get_result() == full_analyzer.get_result()
+    assert analyzer.pause_segments == full_analyzer.pause_segments
+    assert analyzer.end_points == full_analyzer.end_points
@@ -0,0 +1,77 @@
+from Backend.instrumentation import Instrumentation, NO_INSTRUMENTATION
+from Backend.analyze_module import AnalyzeModule
+from Backend.calculate_module import DPICalculationModule
+from unittest.mock import patch
+import pstats
+import tracemalloc
+import pytest
+
+def analyze(log_dir, instrumentation=None):
+    with patch("Backend.analyze_module.os.path.dirname", return_value=log_dir):
+        analyzer = AnalyzeModule(profile_id=1, session="sessionA", screen_width=1920, screen_height=1080,
+                                 instrumentation=instrumentation)
+        movement_data = analyzer.analyze_tracking_data()
+        analyzer.get_pause_segments()
+        dpi = DPICalculationModule({"DPI": 800}, movement_data["analysis_result"], instrumentation=instrumentation).dpi
+    return movement_data, dpi
+
+
+def test_report_covers_every_stage(create_valid_log_file):
+    instrumentation = Instrumentation()
+    analyze(create_valid_log_file, instrumentation)
+    stages = {record["stage"]: record for record in instrumentation.get_report()["stages"]}
+
+    assert list(stages) == ["load", "validate_feed", "validate_finish", "find_end_points", "analyze_all_segment",
+                            "get_pause_segments", "get_total_distance", "calculate_dpi"]
+    assert stages["load"]["items"] == 100
+    assert stages["validate_feed"]["items"] == 100
+    assert stages["get_total_distance"]["items"] == 100
+    # analyze_tracking_data finds the pauses once, and the test asks for them once more
+    assert stages["get_pause_segments"]["calls"] == 2
+    for record in stages.values():
+        assert record["wall_time"] >= 0 and record["cpu_time"] >= 0 and record["peak_memory"] >= 0
+
+def test_results_are_the_same_with_instrumentation(create_valid_log_file):
+    assert analyze(create_valid_log_file, Instrumentation(profile=True)) == analyze(create_valid_log_file)
+
+def test_nested_stage_peak_includes_inner_stage():
+    instrumentation = Instrumentation()
+    with instrumentation.stage("outer"):
+        with instrumentation.stage("inner"):
+            data = bytearray(1_000_000)
+        del data
+    stages = {record["stage"]: record for record in instrumentation.get_report()["stages"]}
+
+    assert stages["inner"]["peak_memory"] > 900_000
+    assert stages["outer"]["peak_memory"] > 900_000
+    assert not tracemalloc.is_tracing()
+
+def test_items_and_calls_accumulate():
+    instrumentation = Instrumentation(trace_memory=False)
+    for count in (3, 4):
+        with instrumentation.stage("chunk") as stage:
+            stage.items = count
+
+    assert instrumentation.get_report()["stages"] == [
+        {"stage": "chunk", "calls": 2, "wall_time": pytest.approx(0, abs=1), "cpu_time": pytest.approx(0, abs=1),
+         "peak_memory": 0, "items": 7}
+    ]
+
+def test_dump_stats_writes_pstats_file(create_valid_log_file, tmp_path):
+    instrumentation = Instrumentation(profile=True)
+    analyze(create_valid_log_file, instrumentation)
+    stats_file = str(tmp_path / "analysis.pstats")
+    instrumentation.dump_stats(stats_file)
+
+    function_names = {function[2] for function in pstats.Stats(stats_file).stats}
+    assert "find_pause_runs" in function_names
+
+def test_dump_stats_needs_profiling():
+    with pytest.raises(ValueError):
+        Instrumentation().dump_stats("unused.pstats")
+
+def test_disabled_instrumentation_records_nothing():
+    with NO_INSTRUMENTATION.stage("load") as stage:
+        stage.items = 5
+    assert NO_INSTRUMENTATION.stage("load") is NO_INSTRUMENTATION.stage("find_end_points")
+    assert not hasattr(NO_INSTRUMENTATION, "get_report")
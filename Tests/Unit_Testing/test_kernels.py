@@ -0,0 +1,77 @@
+from Backend.kernels import (
+    HAVE_NUMBA, NO_INDEX, trace_segment_kernel, find_pause_runs, _find_pause_runs_loop, _find_pause_runs_numpy,
+)
+import numpy as np
+import random
+import pytest
+
+def python_version(function):
+    # The uncompiled function when Numba is installed, the function itself otherwise
+    return getattr(function, "py_func", function)
+
+def generate_points(n, seed):
+    # Moves in random directions mixed with pauses, with timestamps 10ms apart
+    rng = random.Random(seed)
+    xs, ys = [], []
+    x, y = 960, 540
+    vx, vy = 0, 0
+    for i in range(n):
+        if i % 40 == 0:
+            vx, vy = rng.choice([(0, 0), (0, 0), (8, 0), (-8, 3), (0, 9), (5, -5), (-3, -7)])
+        x = min(max(x + vx + rng.randint(-2, 2), 0), 1919)
+        y = min(max(y + vy + rng.randint(-2, 2), 0), 1079)
+        xs.append(x)
+        ys.append(y)
+    timestamps = np.arange(n, dtype=np.int64) * 10_000_000
+    return np.array(xs, dtype=np.int64), np.array(ys, dtype=np.int64), timestamps
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_pause_runs_match_between_implementations(seed):
+    xs, ys, timestamps = generate_points(2000, seed)
+    expected_starts, expected_ends = _find_pause_runs_numpy(xs, ys, timestamps, 15, 100_000_000)
+
+    for implementation in (_find_pause_runs_loop, python_version(_find_pause_runs_loop)):
+        starts, ends = implementation(xs, ys, timestamps, 15.0, 100_000_000)
+        assert starts.tolist() == expected_starts.tolist()
+        assert ends.tolist() == expected_ends.tolist()
+
+def test_pause_runs_keep_short_final_pause():
+    xs = np.array([0, 100, 200, 201, 202], dtype=np.int64)
+    ys = np.zeros(5, dtype=np.int64)
+    timestamps = np.arange(5, dtype=np.int64)
+
+    starts, ends = find_pause_runs(xs, ys, timestamps, 15, 100_000_000)
+    assert starts.tolist() == [2]
+    assert ends.tolist() == [4]
+
+def test_pause_runs_with_too_few_points():
+    starts, ends = find_pause_runs(np.array([5]), np.array([5]), np.array([0]), 15, 100_000_000)
+    assert len(starts) == 0 and len(ends) == 0
+
+@pytest.mark.parametrize("seed", range(5))
+def test_trace_segment_matches_python(seed):
+    xs, ys, _ = generate_points(2000, seed)
+    interpreted = python_version(trace_segment_kernel)
+
+    prev_click_point = 0
+    for end_position in range(60, 2000, 97):
+        expected = interpreted(xs, ys, end_position, prev_click_point, 0)
+        assert trace_segment_kernel(xs, ys, end_position, prev_click_point, 0) == expected
+
+        # The same scan on a window that starts just before the previous click
+        offset = max(prev_click_point - 1, 0)
+        assert trace_segment_kernel(xs[offset:], ys[offset:], end_position, prev_click_point, offset) == expected
+        prev_click_point = expected[1]
+
+def test_trace_segment_without_overshoot():
+    # A straight line has no overshoot and starts at the beginning of the data
+    xs = np.arange(0, 2000, 20, dtype=np.int64)
+    ys = np.zeros(100, dtype=np.int64)
+
+    assert trace_segment_kernel(xs, ys, 99, 0, 0) == (0, 99, NO_INDEX)
+
+@pytest.mark.skipif(not HAVE_NUMBA, reason="Numba is not installed")
+def test_kernels_are_compiled():
+    assert hasattr(trace_segment_kernel, "py_func")
+    assert hasattr(_find_pause_runs_loop, "py_func")
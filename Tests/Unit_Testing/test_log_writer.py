@@ -0,0 +1,82 @@
+from Backend.log_writer import SessionLogWriter, FLUSH_EACH_BATCH, FSYNC_PERIODIC, FSYNC_ON_CLOSE
+from unittest.mock import patch
+import pytest
+import csv
+import time
+
+
+def read_rows(path):
+    with open(path, 'r') as f:
+        return list(csv.reader(f))
+
+def test_header_written_on_init(tmp_path):
+    log_file = tmp_path / "log.csv"
+    writer = SessionLogWriter(str(log_file), header=["timestamp", "X", "Y", "clicked"])
+    assert read_rows(log_file) == [["timestamp", "X", "Y", "clicked"]]
+    writer.close()
+
+def test_rows_written_on_close(tmp_path):
+    log_file = tmp_path / "log.csv"
+    writer = SessionLogWriter(str(log_file), header=["timestamp", "X", "Y", "clicked"], batch_size=1000, flush_interval=60)
+    for i in range(250):
+        writer.write([i, i, i, 0])
+    writer.close()
+
+    rows = read_rows(log_file)
+    assert len(rows) == 251
+    assert rows[-1] == ["249", "249", "249", "0"]
+    assert writer.is_closed()
+
+def test_batch_flushed_by_count(tmp_path):
+    log_file = tmp_path / "log.csv"
+    writer = SessionLogWriter(str(log_file), batch_size=10, flush_interval=60)
+    for i in range(10):
+        writer.write([i, i, i, 0])
+
+    deadline = time.monotonic() + 2
+    while len(read_rows(log_file)) < 10 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(read_rows(log_file)) == 10
+    writer.close()
+
+def test_batch_flushed_by_time(tmp_path):
+    log_file = tmp_path / "log.csv"
+    writer = SessionLogWriter(str(log_file), batch_size=1000, flush_interval=0.05)
+    writer.write([1, 2, 3, 0])
+
+    deadline = time.monotonic() + 2
+    while len(read_rows(log_file)) < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert read_rows(log_file) == [["1", "2", "3", "0"]]
+    writer.close()
+
+@pytest.mark.parametrize("durability, expected_fsyncs", [(FLUSH_EACH_BATCH, 0), (FSYNC_PERIODIC, 2), (FSYNC_ON_CLOSE, 1)])
+def test_durability_modes(tmp_path, durability, expected_fsyncs):
+    log_file = tmp_path / "log.csv"
+    with patch("Backend.log_writer.os.fsync") as mock_fsync:
+        writer = SessionLogWriter(str(log_file), batch_size=1, durability=durability, fsync_interval=0)
+        writer.write([1, 2, 3, 0])
+        deadline = time.monotonic() + 2
+        while len(read_rows(log_file)) < 1 and durability != FSYNC_ON_CLOSE and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        writer.close()
+        assert mock_fsync.call_count == expected_fsyncs
+
+def test_invalid_durability(tmp_path):
+    with pytest.raises(ValueError):
+        SessionLogWriter(str(tmp_path / "log.csv"), durability="never")
+
+def test_full_queue_drops_rows(tmp_path):
+    log_file = tmp_path / "log.csv"
+    writer = SessionLogWriter(str(log_file), max_queue_size=1, batch_size=1)
+    with patch.object(writer, "_write_rows", side_effect=lambda rows: time.sleep(0.2)):
+        results = [writer.write([i, i, i, 0]) for i in range(50)]
+    assert False in results
+    assert writer.dropped_rows > 0
+    writer.close()
+
+def test_write_after_close(tmp_path):
+    writer = SessionLogWriter(str(tmp_path / "log.csv"))
+    writer.close()
+    assert writer.write([1, 2, 3, 0]) is False
@@ -6,7 +6,7 @@ import random
 from tempfile import TemporaryDirectory
 import os
 from unittest.mock import patch
-from datetime import datetime
+from datetime import datetime, timedelta
 
 @pytest.fixture
 def make_temp_dir():
@@ -196,3 +196,102 @@ def test_update_session_total_distance_non_existent(make_temp_dir, make_profile_
     profile_handler = make_profile_handler(temp_dir, profiles_path)
     response = profile_handler.update_session_total_distance(1, datetime.now().strftime("%Y-%m-%d_%H-%M-%S"), 1000)
     assert "error" in response
+
+def test_custom_storage_dir(tmp_path):
+    profile_handler = ProfileHandler(storage_dir=str(tmp_path), backend="json")
+    profile_handler.create_profile("test profile", "1000")
+    profile_handler.flush()
+
+    with open(tmp_path / "profiles.json", "r") as file:
+        assert json.load(file)[0]["name"] == "test profile"
+
+def test_sqlite_backend_keeps_changes(tmp_path):
+    profile_handler = ProfileHandler(storage_dir=str(tmp_path), compaction_days=None)
+    profile_handler.create_profile("test profile", "1000")
+    profile_handler.update_dpi(1, 1400)
+    profile_handler.update_session_total_distance(1, "2025-01-01_12-00-00", 1000)
+    profile_handler.close()
+
+    profile_handler = ProfileHandler(storage_dir=str(tmp_path), compaction_days=None)
+    profile = profile_handler.find_profile("test profile")
+    assert profile["DPI"] == 1400
+    assert profile["session_total_distance"] == [{"timestamp": "2025-01-01 12:00:00", "total_distance": 1000}]
+    assert profile_handler.refresh_profile(1) == profile
+    assert not os.path.exists(tmp_path / "profiles.json")
+
+@pytest.mark.parametrize("backend", ["sqlite", "json", "journal"])
+def test_refresh_profile_sees_external_changes(tmp_path, backend):
+    profile_handler = ProfileHandler(storage_dir=str(tmp_path), backend=backend, save_delay=0, compaction_days=None)
+    profile_handler.create_profile("test profile", "1000")
+    profiles = profile_handler.get_profiles()
+
+    # Served from memory while nothing else changes the storage
+    with patch("Backend.profile_storage.json.load") as json_load:
+        assert profile_handler.refresh_profile(1) is profile_handler.find_profile("test profile")
+        json_load.assert_not_called()
+
+    other_handler = ProfileHandler(storage_dir=str(tmp_path), backend=backend, save_delay=0, compaction_days=None)
+    other_handler.update_session_total_distance(1, "2025-01-01_12-00-00", 1000)
+    other_handler.create_profile("other profile", "800")
+    other_handler.close()
+
+    profile = profile_handler.refresh_profile(1)
+    assert profile["session_total_distance"] == [{"timestamp": "2025-01-01 12:00:00", "total_distance": 1000}]
+    assert profile_handler.find_profile("other profile")["DPI"] == 800
+    assert profiles is profile_handler.get_profiles() and len(profiles) == 2
+    profile_handler.close()
+
+def test_json_refresh_keeps_pending_save(tmp_path):
+    profile_handler = ProfileHandler(storage_dir=str(tmp_path), backend="json", save_delay=60, compaction_days=None)
+    profile_handler.create_profile("test profile", "800")
+    profile_handler.flush()
+    profile_handler.update_dpi(1, 1500)
+
+    # Touched by another process while the save is still pending
+    stat = os.stat(tmp_path / "profiles.json")
+    os.utime(tmp_path / "profiles.json", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert profile_handler.refresh_profile(1)["DPI"] == 1500
+    with open(tmp_path / "profiles.json", "r") as file:
+        assert json.load(file)[0]["DPI"] == 1500
+    profile_handler.close()
+
+def test_lookups_follow_changes(tmp_path):
+    profile_handler = ProfileHandler(storage_dir=str(tmp_path))
+    profile_handler.create_profile("first", "1000")
+    profile_handler.create_profile("second", "1000")
+    profile_handler.delete_profile("first")
+
+    assert "error" in profile_handler.find_profile("first")
+    assert "error" in profile_handler.update_dpi(1, 1200)
+    assert profile_handler.update_dpi(2, 1200)["message"] == "Profile updated successfully"
+    assert profile_handler.find_profile("second")["DPI"] == 1200
+    assert profile_handler.create_profile("first", "800")["profile"]["_id"] == 3
+    assert profile_handler.refresh_profile(3)["name"] == "first"
+    profile_handler.close()
+
+@pytest.mark.parametrize("backend", ["sqlite", "json", "journal"])
+def test_old_session_entries_are_compacted(tmp_path, backend):
+    now = datetime.now()
+    profile_handler = ProfileHandler(storage_dir=str(tmp_path), backend=backend, save_delay=0, compaction_days=None)
+    profile_handler.create_profile("test profile", "1000")
+    for days_ago, distance in ((40, 100), (40, 200), (35, 300), (2, 400)):
+        timestamp = (now - timedelta(days=days_ago)).strftime("%Y-%m-%d_%H-%M-%S")
+        profile_handler.update_session_total_distance(1, timestamp, distance)
+    profile_handler.close()
+
+    profile_handler = ProfileHandler(storage_dir=str(tmp_path), backend=backend, save_delay=0, compaction_days=30)
+    profile = profile_handler.find_profile("test profile")
+    assert [entry["total_distance"] for entry in profile["session_total_distance"]] == [400]
+    assert len(profile["session_distance_rollups"]["hourly"]) == 1
+    assert sorted(profile["session_distance_rollups"]["daily"].values()) == [300, 300, 400]
+
+    # A new session keeps the rollups up to date, and the compaction survives reopening
+    profile_handler.update_session_total_distance(1, now.strftime("%Y-%m-%d_%H-%M-%S"), 500)
+    profile_handler.close()
+    profile_handler = ProfileHandler(storage_dir=str(tmp_path), backend=backend, compaction_days=None)
+    profile = profile_handler.find_profile("test profile")
+    assert [entry["total_distance"] for entry in profile["session_total_distance"]] == [400, 500]
+    assert sum(profile["session_distance_rollups"]["daily"].values()) == 1500
+    assert sum(profile["session_distance_rollups"]["hourly"].values()) == 900
+    profile_handler.close()
@@ -0,0 +1,344 @@
+from Backend.profile_storage import open_profile_storage, SQLiteProfileStorage, JSONProfileStorage, JournalProfileStorage
+from Backend.distance_rollups import make_rollups, add_to_rollups, compact_profile
+import sqlite3
+import time
+import pytest
+import json
+import os
+from unittest.mock import patch
+
+def make_profile(profile_id, name="profile", history_length=3, rollups=True):
+    profile = {
+        "_id": profile_id,
+        "name": f"{name}_{profile_id}",
+        "DPI": 800 + profile_id,
+        "DPI_history": [{"timestamp": f"2025-01-0{i + 1} 12:00:00", "DPI": 800 + i} for i in range(history_length)],
+        "session_total_distance": [{"timestamp": f"2025-01-0{i + 1} 13:00:00", "total_distance": 1000 * i}
+                                   for i in range(history_length)]
+    }
+    if rollups:
+        profile["session_distance_rollups"] = make_rollups(profile["session_total_distance"])
+    return profile
+
+def write_profiles_file(storage_dir, profiles):
+    with open(os.path.join(storage_dir, "profiles.json"), "w") as file:
+        json.dump(profiles, file, indent=4)
+
+
+def test_json_file_is_migrated(tmp_path):
+    profiles = [make_profile(1), make_profile(2, history_length=0), make_profile(5)]
+    # Files written before there were rollups get them during the migration
+    write_profiles_file(tmp_path, [make_profile(1, rollups=False)] + profiles[1:])
+
+    storage = open_profile_storage(str(tmp_path))
+    assert isinstance(storage, SQLiteProfileStorage)
+    assert storage.load() == profiles
+    assert not os.path.exists(tmp_path / "profiles.json")
+    assert os.path.exists(tmp_path / "profiles.json.migrated")
+    storage.close()
+
+    # Reopening neither migrates again nor loses anything
+    storage = open_profile_storage(str(tmp_path))
+    assert storage.load() == profiles
+    storage.close()
+
+def test_invalid_json_file_is_not_marked_migrated(tmp_path):
+    with open(tmp_path / "profiles.json", "w") as file:
+        file.write("[{")
+
+    with pytest.raises(json.JSONDecodeError):
+        open_profile_storage(str(tmp_path))
+
+    # Once the file is fixed, the migration runs
+    write_profiles_file(tmp_path, [make_profile(1)])
+    storage = open_profile_storage(str(tmp_path))
+    assert storage.load() == [make_profile(1)]
+    storage.close()
+
+def test_changes_survive_reopening(tmp_path):
+    storage = open_profile_storage(str(tmp_path))
+    first, second = make_profile(1), make_profile(2)
+    storage.profile_created([first], first)
+    storage.profile_created([first, second], second)
+
+    first["DPI"] = 1200
+    history_entry = {"timestamp": "2025-02-01 12:00:00", "DPI": 1200}
+    first["DPI_history"].append(history_entry)
+    storage.dpi_updated([first, second], first, history_entry)
+
+    second["DPI"] = 400
+    storage.dpi_updated([first, second], second)
+
+    entry = {"timestamp": "2025-02-01 13:00:00", "total_distance": 5000}
+    second["session_total_distance"].append(entry)
+    add_to_rollups(second["session_distance_rollups"], entry)
+    storage.session_distance_added([first, second], second, entry)
+    storage.close()
+
+    storage = open_profile_storage(str(tmp_path))
+    assert storage.load() == [first, second]
+    assert storage.load_profile(2) == second
+    assert storage.load_profile(3) is None
+    storage.close()
+
+def test_schema_1_database_gets_rollups(tmp_path):
+    connection = sqlite3.connect(tmp_path / "profiles.db")
+    connection.executescript("""
+        CREATE TABLE profiles (id INTEGER PRIMARY KEY, name TEXT NOT NULL, dpi INTEGER NOT NULL);
+        CREATE TABLE dpi_history (id INTEGER PRIMARY KEY AUTOINCREMENT, profile_id INTEGER NOT NULL,
+                                  timestamp TEXT NOT NULL, dpi INTEGER NOT NULL);
+        CREATE TABLE session_distances (id INTEGER PRIMARY KEY AUTOINCREMENT, profile_id INTEGER NOT NULL,
+                                        timestamp TEXT NOT NULL, total_distance INTEGER NOT NULL);
+        INSERT INTO profiles VALUES (1, 'profile_1', 800);
+        INSERT INTO session_distances (profile_id, timestamp, total_distance) VALUES
+            (1, '2025-01-01 13:10:00', 100), (1, '2025-01-01 13:50:00', 200), (1, '2025-01-01 15:00:00', 300);
+        PRAGMA user_version = 1;
+    """)
+    connection.close()
+
+    storage = open_profile_storage(str(tmp_path))
+    assert storage.load()[0]["session_distance_rollups"] == {
+        "hourly": {"2025-01-01 13:00:00": 300, "2025-01-01 15:00:00": 300},
+        "daily": {"2025-01-01": 600}
+    }
+    storage.close()
+
+def test_compaction_is_stored(tmp_path):
+    storage = open_profile_storage(str(tmp_path))
+    profile = make_profile(1)
+    storage.profile_created([profile], profile)
+    storage.session_distances_compacted([profile], profile, "2025-01-02 13:30:00")
+    stored = storage.load()[0]
+    assert [entry["timestamp"] for entry in stored["session_total_distance"]] == ["2025-01-03 13:00:00"]
+    assert list(stored["session_distance_rollups"]["hourly"]) == ["2025-01-02 13:00:00", "2025-01-03 13:00:00"]
+    assert stored["session_distance_rollups"]["daily"] == profile["session_distance_rollups"]["daily"]
+    storage.close()
+
+def test_delete_removes_histories(tmp_path):
+    storage = open_profile_storage(str(tmp_path))
+    profile = make_profile(1)
+    storage.profile_created([profile], profile)
+    storage.profile_deleted([], profile)
+    assert storage.load() == []
+    storage.close()
+
+    connection = sqlite3.connect(tmp_path / "profiles.db")
+    assert connection.execute("SELECT COUNT(*) FROM dpi_history").fetchone()[0] == 0
+    assert connection.execute("SELECT COUNT(*) FROM session_distances").fetchone()[0] == 0
+    assert connection.execute("SELECT COUNT(*) FROM distance_rollups").fetchone()[0] == 0
+    connection.close()
+
+def test_database_uses_wal_and_indexes(tmp_path):
+    open_profile_storage(str(tmp_path)).close()
+
+    connection = sqlite3.connect(tmp_path / "profiles.db")
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    indexes = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"profiles_name", "dpi_history_profile", "session_distances_profile"} <= indexes
+    connection.close()
+
+def test_json_backend(tmp_path):
+    storage = open_profile_storage(str(tmp_path), "json")
+    assert isinstance(storage, JSONProfileStorage)
+    assert storage.load() == []
+
+    profile = make_profile(1)
+    storage.profile_created([profile], profile)
+    assert storage.load_profile(1) == profile
+    assert not os.path.exists(tmp_path / "profiles.db")
+
+def test_unknown_backend(tmp_path):
+    with pytest.raises(ValueError, match="Unknown profile storage backend"):
+        open_profile_storage(str(tmp_path), "xml")
+
+def test_json_changes_are_saved_together(tmp_path):
+    storage = open_profile_storage(str(tmp_path), "json", save_delay=60)
+    storage.load()
+    profile = make_profile(1)
+
+    with patch.object(storage, "save", wraps=storage.save) as save:
+        storage.profile_created([profile], profile)
+        profile["DPI"] = 1200
+        storage.dpi_updated([profile], profile)
+        assert save.call_count == 0
+
+        storage.flush()
+        assert save.call_count == 1
+        storage.flush()
+        assert save.call_count == 1
+
+    with open(tmp_path / "profiles.json", "r") as file:
+        assert json.load(file) == [profile]
+
+def test_json_changes_are_saved_after_delay(tmp_path):
+    storage = open_profile_storage(str(tmp_path), "json", save_delay=0.05)
+    profile = make_profile(1)
+    storage.profile_created([profile], profile)
+
+    for _ in range(100):
+        if os.path.exists(tmp_path / "profiles.json"):
+            break
+        time.sleep(0.05)
+    with open(tmp_path / "profiles.json", "r") as file:
+        assert json.load(file) == [profile]
+
+def test_json_load_profile_sees_pending_changes(tmp_path):
+    storage = open_profile_storage(str(tmp_path), "json", save_delay=60)
+    profile = make_profile(1)
+    storage.profile_created([profile], profile)
+    assert storage.load_profile(1) == profile
+
+def test_failed_json_save_keeps_old_file(tmp_path):
+    storage = open_profile_storage(str(tmp_path), "json", save_delay=0)
+    profile = make_profile(1)
+    storage.profile_created([profile], profile)
+
+    # Fails halfway through writing, after part of the file was written
+    with patch("Backend.profile_storage.json.dump", side_effect=lambda data, file, indent: file.write("[{") and 1 / 0):
+        with pytest.raises(ZeroDivisionError):
+            storage.profile_created([profile, make_profile(2)], make_profile(2))
+
+    with open(tmp_path / "profiles.json", "r") as file:
+        assert json.load(file) == [profile]
+
+def make_journal_changes(storage, profiles):
+    # Returns the profiles as they are after the changes
+    first, second = make_profile(1), make_profile(2, history_length=0)
+    profiles += [first, second]
+    storage.profile_created(profiles[:1], first)
+    storage.profile_created(profiles, second)
+
+    first["DPI"] = 1200
+    history_entry = {"timestamp": "2025-02-01 12:00:00", "DPI": 1200}
+    first["DPI_history"].append(history_entry)
+    storage.dpi_updated(profiles, first, history_entry)
+
+    entry = {"timestamp": "2025-02-01 13:00:00", "total_distance": 5000}
+    second["session_total_distance"].append(entry)
+    add_to_rollups(second["session_distance_rollups"], entry)
+    storage.session_distance_added(profiles, second, entry)
+
+    storage.session_distances_compacted(profiles, first, "2025-01-02 13:30:00")
+    compact_profile(first, "2025-01-02 13:30:00")
+
+    profiles.remove(second)
+    storage.profile_deleted(profiles, second)
+    return profiles
+
+def test_journal_replays_changes(tmp_path):
+    storage = open_profile_storage(str(tmp_path), "journal")
+    assert isinstance(storage, JournalProfileStorage)
+    profiles = make_journal_changes(storage, storage.load())
+    storage.close()
+
+    events = list(storage.read_events())
+    assert [event["event"] for event in events] == ["created", "created", "dpi_updated", "session_distance_added",
+                                                    "compacted", "deleted"]
+    assert [event["sequence"] for event in events] == [1, 2, 3, 4, 5, 6]
+
+    storage = open_profile_storage(str(tmp_path), "journal")
+    assert storage.load() == profiles
+    assert storage.load_profile(1) == profiles[0]
+    storage.close()
+
+def test_journal_writes_snapshots(tmp_path):
+    storage = JournalProfileStorage(str(tmp_path), snapshot_interval=4)
+    profiles = make_journal_changes(storage, storage.load())
+    storage.close()
+
+    # The snapshot holds the first four changes, the journal the other two
+    assert [event["sequence"] for event in storage.read_events()] == [5, 6]
+    with open(tmp_path / "profiles.snapshot.json", "r") as file:
+        assert json.load(file)["sequence"] == 4
+
+    # The events before the snapshot are kept in a segment
+    assert [os.path.basename(path) for path in storage.get_segment_files()] == ["profiles.journal.0000000004.jsonl"]
+    assert [event["sequence"] for event in storage.read_all_events()] == [1, 2, 3, 4, 5, 6]
+
+    storage = JournalProfileStorage(str(tmp_path), snapshot_interval=4)
+    assert storage.load() == profiles
+    storage.close()
+
+def test_journal_survives_crashes(tmp_path):
+    storage = JournalProfileStorage(str(tmp_path), snapshot_interval=1000)
+    profiles = make_journal_changes(storage, storage.load())
+    storage.close()
+    with open(tmp_path / "profiles.journal.jsonl", "r") as file:
+        journal = file.read()
+
+    # Crash after writing a snapshot but before clearing the journal
+    storage = JournalProfileStorage(str(tmp_path))
+    storage.load()
+    storage.write_snapshot(profiles)
+    storage.close()
+    with open(tmp_path / "profiles.journal.jsonl", "w") as file:
+        file.write(journal)
+
+    # Crash in the middle of appending an event
+    with open(tmp_path / "profiles.journal.jsonl", "a") as file:
+        file.write('{"sequence": 7, "event": "del')
+
+    storage = JournalProfileStorage(str(tmp_path))
+    assert storage.load() == profiles
+
+    # The cut-off line is not joined with the next event
+    profile = profiles[0]
+    profile["DPI"] = 1600
+    storage.dpi_updated(profiles, profile)
+    storage.close()
+
+    storage = JournalProfileStorage(str(tmp_path))
+    assert storage.load() == profiles
+    assert [event["sequence"] for event in storage.read_events()][-1] == 7
+    storage.close()
+
+def test_journal_reload_follows_snapshot_of_other_storage(tmp_path):
+    storage = JournalProfileStorage(str(tmp_path), snapshot_interval=1000)
+    profiles = storage.load()
+    profile = make_profile(1)
+    profiles.append(profile)
+    storage.profile_created(profiles, profile)
+
+    # Another storage on the same directory writes a snapshot, which moves the journal aside
+    other_storage = JournalProfileStorage(str(tmp_path), snapshot_interval=2)
+    other_profiles = other_storage.load()
+    other_profiles[0]["DPI"] = 905
+    other_storage.dpi_updated(other_profiles, other_profiles[0])
+    other_storage.close()
+    assert len(storage.get_segment_files()) == 1
+
+    # Changes made after reloading go to the new journal and survive reopening
+    assert storage.has_external_changes()
+    profiles = storage.load()
+    profiles[0]["DPI"] = 1234
+    storage.dpi_updated(profiles, profiles[0])
+    storage.close()
+
+    storage = JournalProfileStorage(str(tmp_path))
+    assert storage.load()[0]["DPI"] == 1234
+    assert [event["sequence"] for event in storage.read_all_events()] == [1, 2, 3]
+    storage.close()
+
+def test_journal_migrates_json_file(tmp_path):
+    profiles = [make_profile(1), make_profile(2)]
+    write_profiles_file(tmp_path, profiles)
+
+    storage = open_profile_storage(str(tmp_path), "journal")
+    assert storage.load() == profiles
+    assert os.path.exists(tmp_path / "profiles.json.migrated")
+    storage.close()
+
+def test_journal_appends_without_rewriting(tmp_path):
+    storage = open_profile_storage(str(tmp_path), "journal")
+    profile = make_profile(1)
+    storage.profile_created([profile], profile)
+    snapshot_state = os.stat(tmp_path / "profiles.snapshot.json").st_mtime_ns
+
+    for i in range(20):
+        entry = {"timestamp": "2025-02-01 13:00:00", "total_distance": i}
+        storage.session_distance_added([profile], profile, entry)
+
+    assert os.stat(tmp_path / "profiles.snapshot.json").st_mtime_ns == snapshot_state
+    assert len(list(storage.read_events())) == 21
+    assert not storage.has_external_changes()
+    storage.close()
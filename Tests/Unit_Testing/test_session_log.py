@@ -0,0 +1,114 @@
+from Backend.session_log import (
+    BinarySessionLogWriter, SessionLogHeader, read_binary_log, read_binary_header, export_csv, get_log_file, parse_timestamp_ns,
+    FORMAT_VERSION, HEADER_STRUCT, RECORD_DTYPE
+)
+from Backend import session_log
+import numpy as np
+from Backend.analyze_module import AnalyzeModule
+from Tests.conftest import generate_paused_segment_rows
+from unittest.mock import patch
+from datetime import datetime, timedelta
+import pytest
+import csv
+import os
+
+ANCHOR_NS = 1_700_000_000_000_000_000
+
+def make_header(profile_id=1):
+    return SessionLogHeader(FORMAT_VERSION, 3840, 2160, 100, profile_id, ANCHOR_NS)
+
+def write_binary_log(path, rows, header=None):
+    writer = BinarySessionLogWriter(str(path), header=header or make_header())
+    for row in rows:
+        writer.write(row)
+    writer.close()
+
+def csv_rows_to_binary_rows(rows):
+    start = datetime.strptime(rows[0][0], "%Y-%m-%d %H:%M:%S.%f")
+    binary_rows = []
+    for timestamp, x, y, clicked in rows:
+        offset = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S.%f") - start
+        binary_rows.append([offset // timedelta(microseconds=1) * 1000, int(x), int(y), int(clicked)])
+    return binary_rows
+
+
+def test_header_roundtrip(tmp_path):
+    log_file = tmp_path / "log.sflog"
+    write_binary_log(log_file, [], header=make_header(profile_id=7))
+    header = read_binary_header(str(log_file))
+    assert header == make_header(profile_id=7)
+
+def test_records_roundtrip(tmp_path):
+    log_file = tmp_path / "log.sflog"
+    write_binary_log(log_file, [[0, 10, 20, 0], [10_000_000, 11, 21, 1], [20_000_000, 12, 22, 0]])
+    header, records = read_binary_log(str(log_file))
+
+    assert records["t_ns"].tolist() == [0, 10_000_000, 20_000_000]
+    assert records["x"].tolist() == [10, 11, 12]
+    assert records["y"].tolist() == [20, 21, 22]
+    assert records["flags"].tolist() == [0, 1, 0]
+
+def test_record_size(tmp_path):
+    log_file = tmp_path / "log.sflog"
+    write_binary_log(log_file, [[i, 100, 100, 0] for i in range(1000)])
+    assert os.path.getsize(log_file) == HEADER_STRUCT.size + 1000 * RECORD_DTYPE.itemsize
+    assert RECORD_DTYPE.itemsize == 13
+
+def test_bulk_write_matches_writer(tmp_path):
+    rows = [[i * 10_000_000, i, 40000 if i == 2 else 2 * i, i % 2] for i in range(5)]
+    write_binary_log(tmp_path / "writer.sflog", rows)
+    columns = np.array(rows).T
+    count = session_log.write_binary_log(str(tmp_path / "bulk.sflog"), make_header(), *columns)
+
+    assert count == 5
+    assert (tmp_path / "bulk.sflog").read_bytes() == (tmp_path / "writer.sflog").read_bytes()
+
+def test_partial_record_ignored(tmp_path):
+    log_file = tmp_path / "log.sflog"
+    write_binary_log(log_file, [[0, 10, 20, 0], [1, 11, 21, 0]])
+    with open(log_file, "ab") as f:
+        f.write(b"\x01\x02\x03")
+    _, records = read_binary_log(str(log_file))
+    assert len(records) == 2
+
+def test_invalid_magic(tmp_path):
+    log_file = tmp_path / "log.sflog"
+    log_file.write_bytes(b"\x00" * HEADER_STRUCT.size)
+    with pytest.raises(ValueError):
+        read_binary_header(str(log_file))
+
+def test_export_csv(tmp_path):
+    log_file = tmp_path / "log.sflog"
+    csv_file = tmp_path / "log.csv"
+    write_binary_log(log_file, [[0, 10, 20, 0], [10_000_000, 11, 21, 1]])
+
+    assert export_csv(str(log_file), str(csv_file)) == 2
+    with open(csv_file, "r") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["timestamp", "X", "Y", "clicked"]
+    assert rows[2][1:] == ["11", "21", "1"]
+    first = datetime.strptime(rows[1][0], "%Y-%m-%d %H:%M:%S.%f")
+    second = datetime.strptime(rows[2][0], "%Y-%m-%d %H:%M:%S.%f")
+    assert (second - first).total_seconds() == pytest.approx(0.01)
+
+def test_analyze_binary_log_matches_csv(create_paused_segment_log):
+    rows = generate_paused_segment_rows()
+    logs_path = os.path.join(create_paused_segment_log, "storage", "logs")
+    write_binary_log(get_log_file(logs_path, 2, "sessionA", "binary"), csv_rows_to_binary_rows(rows))
+
+    with patch("Backend.analyze_module.os.path.dirname", return_value=create_paused_segment_log):
+        binary_analyzer = AnalyzeModule(profile_id=2, session="sessionA", screen_width=3840, screen_height=2160)
+        csv_analyzer = AnalyzeModule(profile_id=1, session="sessionA", screen_width=3840, screen_height=2160)
+
+        assert binary_analyzer.handle_error() == csv_analyzer.handle_error()
+        assert binary_analyzer.analyze_tracking_data() == csv_analyzer.analyze_tracking_data()
+
+def test_parse_timestamp_ns():
+    assert parse_timestamp_ns("1700000000123456789") == 1700000000123456789
+    legacy_start = parse_timestamp_ns("2026-10-18 13:32:00.123456")
+    legacy_end = parse_timestamp_ns("2026-10-18 13:32:01.000000")
+    assert legacy_end - legacy_start == 876_544_000
+
+def test_parse_invalid_timestamp():
+    with pytest.raises(ValueError):
+        parse_timestamp_ns("yesterday")
@@ -0,0 +1,138 @@
+from Backend.streaming_analysis import StreamingAnalyzer, LiveAnalyzer, analyze_log_in_chunks
+from Backend.analyze_module import AnalyzeModule, iter_log_chunks, get_session_log_file
+from Backend.validation_module import StreamingValidator
+from Tests.conftest import write_log_file
+from unittest.mock import patch
+from datetime import datetime, timedelta
+import threading
+import random
+import time
+import pytest
+import os
+
+def generate_long_session_rows(n, seed=0, click_every=200):
+    # Straight moves and pauses in random directions, with a click at the end of every move
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, 12, 0, 0)
+    rows = []
+    x, y = 960, 540
+    vx, vy = 5, 0
+    for i in range(n):
+        if i % 50 == 0:
+            vx, vy = rng.choice([(0, 0), (6, 0), (-6, 0), (0, 6), (0, -6), (4, 4), (-4, -4)])
+        x = min(max(x + vx + rng.randint(-1, 1), 0), 1919)
+        y = min(max(y + vy + rng.randint(-1, 1), 0), 1079)
+        clicked = '1' if i % click_every == click_every - 1 else '0'
+        rows.append([(start + timedelta(milliseconds=i * 10)).strftime('%Y-%m-%d %H:%M:%S.%f'), x, y, clicked])
+    return rows
+
+def analyze_in_memory(temp_dir):
+    with patch("Backend.analyze_module.os.path.dirname", return_value=temp_dir):
+        analyzer = AnalyzeModule(profile_id=1, session="sessionA", screen_width=1920, screen_height=1080)
+        return analyzer.handle_error(), analyzer.analyze_tracking_data(), get_session_log_file(1, "sessionA")
+
+def feed_in_chunks(log_file, chunk_size):
+    validator = StreamingValidator(1920, 1080)
+    analyzer = StreamingAnalyzer()
+    for timestamps, x, y, clicked in iter_log_chunks(log_file, validator.parse_rows, chunk_size):
+        analyzer.feed(timestamps, x, y, clicked)
+    return analyzer
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 25, 100, 4096])
+def test_chunked_matches_in_memory(temp_log_dir, chunk_size):
+    temp_dir, logs_path = temp_log_dir
+    write_log_file(os.path.join(logs_path, "id_1_cursor_log_sessionA.csv"), generate_long_session_rows(3000))
+    error, expected, log_file = analyze_in_memory(temp_dir)
+
+    assert error == {"message": "Data points are valid!"}
+    assert len(expected["analysis_result"]) == 15
+    analyzer = feed_in_chunks(log_file, chunk_size)
+    assert analyzer.finish() == expected
+    assert analyze_log_in_chunks(log_file, 1920, 1080, chunk_size) == expected
+
+    # Every pause and end point is kept, though only the recent ones stay buffered
+    with patch("Backend.analyze_module.os.path.dirname", return_value=temp_dir):
+        in_memory = AnalyzeModule(profile_id=1, session="sessionA", screen_width=1920, screen_height=1080)
+    assert analyzer.pause_segments == in_memory.get_pause_segments()
+    assert analyzer.end_points == in_memory.find_end_points()
+
+@pytest.mark.parametrize("fixture", ["create_paused_segment_log", "create_multiple_endpoint_log", "create_overshoot_log", "create_edge_clicks_log"])
+def test_chunked_core_matches_fixtures(request, fixture):
+    # These fixtures do not all pass validation, but the analysis itself must still agree
+    temp_dir = request.getfixturevalue(fixture)
+    _, expected, log_file = analyze_in_memory(temp_dir)
+    for chunk_size in (1, 3, 30):
+        assert feed_in_chunks(log_file, chunk_size).finish() == expected
+
+def test_chunked_memory_is_bounded(temp_log_dir):
+    temp_dir, logs_path = temp_log_dir
+    log_file = os.path.join(logs_path, "id_1_cursor_log_sessionA.csv")
+    write_log_file(log_file, generate_long_session_rows(20000, click_every=100))
+
+    validator = StreamingValidator(1920, 1080)
+    analyzer = StreamingAnalyzer()
+    largest_buffer = 0
+    for timestamps, x, y, clicked in iter_log_chunks(log_file, validator.parse_rows, 500):
+        analyzer.feed(timestamps, x, y, clicked)
+        largest_buffer = max(largest_buffer, analyzer.get_buffered_sample_count())
+
+    # Never more than a chunk plus the stretch since the last click
+    assert largest_buffer <= 500 + 100 + 1
+    assert analyzer.finish()["total_distance"] > 0
+
+def test_chunked_reports_validation_error(create_abrupt_movement_log):
+    log_file = os.path.join(create_abrupt_movement_log, "storage", "logs", "id_1_cursor_log_sessionA.csv")
+    result = analyze_log_in_chunks(log_file, 1920, 1080, 10)
+    assert "Unusual cursor movement (Abrupt movement)" in result["error"]
+
+def test_empty_session():
+    analyzer = StreamingAnalyzer()
+    assert analyzer.finish() == {"analysis_result": [], "total_distance": 0}
+
+@pytest.mark.parametrize("batch_size", [1, 7, 100])
+def test_live_analyzer_matches_in_memory(temp_log_dir, batch_size):
+    temp_dir, logs_path = temp_log_dir
+    rows = generate_long_session_rows(1000)
+    write_log_file(os.path.join(logs_path, "id_1_cursor_log_sessionA.csv"), rows)
+    _, expected, log_file = analyze_in_memory(temp_dir)
+
+    live_analyzer = LiveAnalyzer(1920, 1080, batch_size=batch_size)
+    validator = StreamingValidator(1920, 1080)
+    for timestamps, x, y, clicked in iter_log_chunks(log_file, validator.parse_rows, 1):
+        live_analyzer.add_sample(int(timestamps[0]), int(x[0]), int(y[0]), int(clicked[0]))
+
+    assert live_analyzer.finish() == expected
+
+    # Samples after finish are ignored
+    live_analyzer.add_sample(0, 0, 0, 1)
+    assert live_analyzer.finish() == expected
+
+def test_live_analyzer_validation_error():
+    live_analyzer = LiveAnalyzer(1920, 1080, batch_size=10)
+    for i in range(200):
+        live_analyzer.add_sample(i * 10_000_000, 100 if i < 50 else 900, 100, 0)
+    assert "Abrupt movement" in live_analyzer.finish()["error"]
+
+def test_live_analyzer_does_not_block_add_sample(temp_log_dir):
+    temp_dir, logs_path = temp_log_dir
+    rows = generate_long_session_rows(1000)
+    write_log_file(os.path.join(logs_path, "id_1_cursor_log_sessionA.csv"), rows)
+    _, expected, log_file = analyze_in_memory(temp_dir)
+
+    # While the analysis is stuck, samples are still accepted right away
+    release = threading.Event()
+    original_feed = StreamingAnalyzer.feed
+    def slow_feed(self, *columns):
+        release.wait(5)
+        original_feed(self, *columns)
+
+    live_analyzer = LiveAnalyzer(1920, 1080, batch_size=10)
+    validator = StreamingValidator(1920, 1080)
+    with patch.object(StreamingAnalyzer, "feed", slow_feed):
+        start = time.monotonic()
+        for timestamps, x, y, clicked in iter_log_chunks(log_file, validator.parse_rows, 1):
+            live_analyzer.add_sample(int(timestamps[0]), int(x[0]), int(y[0]), int(clicked[0]))
+        assert time.monotonic() - start < 2
+        release.set()
+        assert live_analyzer.finish() == expected
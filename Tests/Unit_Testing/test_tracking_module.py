@@ -1,9 +1,16 @@
 from unittest.mock import patch
-from Backend.tracking_module import CursorTracker
+from Backend.tracking_module import CursorTracker, CursorSampler, sleep_until
+from Backend.analyze_module import AnalyzeModule
+from pynput.mouse import Button
 import pytest
 import os
 import csv
+import math
+import time
 from datetime import datetime
+from collections import namedtuple
+
+Point = namedtuple('Point', ['x', 'y'])
 
 
 def test_csv_initialization(tmp_path, qtbot):
@@ -37,4 +44,164 @@ def test_error_logging(mock_position, tmp_path, qtbot):
             last_row = rows[-1]
             assert last_row[1] == "X"
             assert last_row[2] == "Y"
-            assert last_row[3] == "clicked"
\ No newline at end of file
+            assert last_row[3] == "clicked"
+
+def read_log_rows(tracker):
+    with open(tracker._CursorTracker__log_file, 'r') as f:
+        return list(csv.reader(f))[1:]
+
+@patch("pyautogui.position")
+def test_event_capture_min_interval(mock_position, tmp_path, qtbot):
+    mock_position.return_value = Point(100, 200)
+    with patch("os.path.realpath", return_value=str(tmp_path)):
+        tracker = CursorTracker(1, capture_mode="event", min_interval_ms=60000, heartbeat_ms=60000)
+        qtbot.addWidget(tracker)
+
+        # Both moves arrive within the minimum interval of the first sample and are coalesced
+        tracker.on_move(101, 201)
+        tracker.on_move(102, 202)
+        tracker.close()
+
+        rows = read_log_rows(tracker)
+        assert [row[1:] for row in rows] == [["100", "200", "0"], ["102", "202", "0"]]
+
+@patch("pyautogui.position")
+def test_event_capture_without_coalescing(mock_position, tmp_path, qtbot):
+    mock_position.return_value = Point(100, 200)
+    with patch("os.path.realpath", return_value=str(tmp_path)):
+        tracker = CursorTracker(1, capture_mode="event", min_interval_ms=60000, heartbeat_ms=60000, coalesce=False)
+        qtbot.addWidget(tracker)
+
+        tracker.on_move(101, 201)
+        tracker.close()
+
+        assert len(read_log_rows(tracker)) == 1
+
+@patch("pyautogui.position")
+def test_event_capture_click_and_heartbeat(mock_position, tmp_path, qtbot):
+    mock_position.return_value = Point(100, 200)
+    with patch("os.path.realpath", return_value=str(tmp_path)):
+        tracker = CursorTracker(1, capture_mode="event", min_interval_ms=0, heartbeat_ms=0)
+        qtbot.addWidget(tracker)
+
+        tracker.sampler.stop()              # Drive the heartbeat by hand
+        tracker.on_click(150, 250, Button.left, True)
+        tracker.flush_pending_position()    # Idle: repeats the last position
+        tracker.close()
+
+        rows = read_log_rows(tracker)
+        assert [row[1:] for row in rows] == [["100", "200", "0"], ["150", "250", "1"], ["150", "250", "0"]]
+
+def test_invalid_capture_mode(tmp_path, qtbot):
+    with patch("os.path.realpath", return_value=str(tmp_path)):
+        with pytest.raises(ValueError):
+            CursorTracker(1, capture_mode="telepathy")
+
+def test_sampler_keeps_rate(qtbot):
+    timestamps = []
+    sampler = CursorSampler(lambda: timestamps.append(time.monotonic_ns()), 5_000_000)
+    sampler.start()
+    qtbot.waitUntil(lambda: len(timestamps) >= 20, timeout=2000)
+    sampler.stop()
+
+    # Deadline scheduling: no drift, the n-th sample is taken n intervals after the first
+    elapsed = timestamps[19] - timestamps[0]
+    assert 19 * 5_000_000 <= elapsed < 19 * 5_000_000 + 50_000_000
+
+def coarse_sleep(seconds, sleep=time.sleep):
+    # Like time.sleep on Windows before Python 3.11: rounded up to the 15.6 ms timer tick
+    sleep(math.ceil(seconds / 0.0156) * 0.0156)
+
+@pytest.mark.parametrize("high_resolution_sleep", [True, False])
+def test_sampler_achieves_sample_rate(qtbot, high_resolution_sleep):
+    timestamps = []
+    sample_rate = 100
+    sleep = time.sleep if high_resolution_sleep else coarse_sleep
+    with patch("Backend.tracking_module.HIGH_RESOLUTION_SLEEP", high_resolution_sleep), \
+         patch("Backend.tracking_module.time.sleep", side_effect=sleep):
+        sampler = CursorSampler(lambda: timestamps.append(time.monotonic_ns()), 1_000_000_000 // sample_rate)
+        sampler.start()
+        qtbot.waitUntil(lambda: len(timestamps) >= 101, timeout=5000)
+        sampler.stop()
+
+    # A coarse 15.6 ms timer gives about 64Hz. A tick skipped when the machine stalls only moves the overall
+    # rate, so the spacing of the samples is checked more tightly than the rate over the whole second.
+    intervals = sorted(timestamps[i + 1] - timestamps[i] for i in range(100))
+    assert abs(1e9 / intervals[50] - sample_rate) <= sample_rate * 0.05
+    achieved_rate = 100 / ((timestamps[100] - timestamps[0]) / 1e9)
+    assert abs(achieved_rate - sample_rate) <= sample_rate * 0.15
+
+def test_sleep_until_reaches_deadline():
+    for high_resolution_sleep in (True, False):
+        with patch("Backend.tracking_module.HIGH_RESOLUTION_SLEEP", high_resolution_sleep):
+            deadline = time.monotonic_ns() + 3_000_000
+            sleep_until(deadline)
+            assert time.monotonic_ns() >= deadline
+
+def test_sampler_reports_errors(qtbot):
+    def fail():
+        raise ValueError("no cursor")
+
+    sampler = CursorSampler(fail, 5_000_000)
+    with qtbot.waitSignal(sampler.error_occurred, timeout=2000) as blocker:
+        sampler.start()
+    sampler.stop()
+    assert blocker.args == ["no cursor"]
+
+@patch("pyautogui.position")
+def test_polling_runs_off_gui_thread(mock_position, tmp_path, qtbot):
+    mock_position.return_value = Point(100, 200)
+    with patch("os.path.realpath", return_value=str(tmp_path)):
+        tracker = CursorTracker(1, sample_rate=200)
+        qtbot.addWidget(tracker)
+        assert tracker.sampler.isRunning()
+
+        qtbot.wait(100)
+        tracker.close()
+        assert tracker.sampler is None
+
+        # Timestamps are monotonic integer nanoseconds
+        timestamps = [int(row[0]) for row in read_log_rows(tracker)]
+        assert len(timestamps) > 5
+        assert timestamps == sorted(timestamps)
+
+@patch("pyautogui.position")
+def test_live_analysis_matches_log(mock_position, tmp_path, qtbot):
+    mock_position.return_value = Point(100, 200)
+    with patch("os.path.realpath", return_value=str(tmp_path)):
+        tracker = CursorTracker(1, capture_mode="event", min_interval_ms=0, heartbeat_ms=60000, screen_size=(1920, 1080))
+        qtbot.addWidget(tracker)
+
+        # Moves right with a pause in the middle, then clicks
+        for i in range(300):
+            tracker.on_move(100 + min(i, 100) + max(i - 150, 0), 200)
+        tracker.on_click(350, 200, Button.left, True)
+        tracker.close()
+
+        live_analysis = tracker.get_live_analysis()
+        analyzer = AnalyzeModule(1, tracker.get_current_session(), 1920, 1080)
+
+    assert analyzer.handle_error() == {"message": "Data points are valid!"}
+    assert live_analysis == analyzer.analyze_tracking_data()
+    assert len(live_analysis["analysis_result"]) == 1
+
+@patch("pyautogui.position")
+def test_live_analysis_reports_validation_error(mock_position, tmp_path, qtbot):
+    mock_position.return_value = Point(100, 200)
+    with patch("os.path.realpath", return_value=str(tmp_path)):
+        tracker = CursorTracker(1, capture_mode="event", min_interval_ms=0, heartbeat_ms=60000, screen_size=(1920, 1080))
+        qtbot.addWidget(tracker)
+        tracker.on_move(101, 200)
+        tracker.close()
+
+    assert "Cursor tracking data is not sufficient" in tracker.get_live_analysis()["error"]
+
+@patch("pyautogui.position")
+def test_live_analysis_disabled(mock_position, tmp_path, qtbot):
+    mock_position.return_value = Point(100, 200)
+    with patch("os.path.realpath", return_value=str(tmp_path)):
+        tracker = CursorTracker(1, live_analysis=False)
+        qtbot.addWidget(tracker)
+        tracker.close()
+
+    assert tracker.get_live_analysis() is None
@@ -0,0 +1,78 @@
+from Tests.trajectory_generator import generate_session, write_session, score_detection
+from Backend.analyze_module import AnalyzeModule
+from Backend.validation_module import StreamingValidator
+import numpy as np
+import pytest
+
+def analyze_generated(tmp_path, session, log_format="binary"):
+    log_file = str(tmp_path / ("id_1_cursor_log_generated" + (".sflog" if log_format == "binary" else ".csv")))
+    write_session(session, log_file, log_format)
+    analyzer = AnalyzeModule(profile_id=1, session="generated", screen_width=1920, screen_height=1080, log_file=log_file)
+    return analyzer.handle_error(), analyzer.analyze_tracking_data()
+
+
+@pytest.mark.parametrize("sample_rate", [60, 125, 1000])
+def test_session_has_requested_length_and_is_valid(sample_rate):
+    session = generate_session(20000, seed=1, sample_rate=sample_rate)
+    validator = StreamingValidator(1920, 1080)
+    validator.feed(session.timestamps, session.xs, session.ys)
+    validator.finish()
+
+    assert len(session.timestamps) == len(session.xs) == len(session.ys) == len(session.clicked) == 20000
+    assert np.all(np.diff(session.timestamps) > 0)
+    assert int(session.clicked.sum()) == len(session.segments)
+
+def test_same_seed_same_session():
+    first = generate_session(5000, seed=7)
+    second = generate_session(5000, seed=7)
+
+    assert np.array_equal(first.xs, second.xs) and np.array_equal(first.ys, second.ys)
+    assert first.segments == second.segments
+    assert not np.array_equal(first.xs, generate_session(5000, seed=8).xs)
+
+def test_ground_truth_matches_samples():
+    session = generate_session(20000, seed=2, overshoot_probability=0.5, pause_probability=0.5)
+
+    for segment in session.segments:
+        target = (session.xs[segment["end_index"]], session.ys[segment["end_index"]])
+        assert target == segment["target"]
+        assert session.clicked[segment["click_index"]] == 1
+        assert segment["start_index"] < segment["end_index"] <= segment["click_index"]
+        for pause_start, pause_end in segment["pauses"]:
+            assert len(set(session.xs[pause_start:pause_end + 1])) == 1
+    assert any(segment["overshoot_index"] is not None for segment in session.segments)
+    assert any(segment["pauses"] for segment in session.segments)
+
+def test_options_can_be_turned_off():
+    session = generate_session(10000, seed=3, overshoot_probability=0, pause_probability=0)
+
+    assert all(segment["overshoot_index"] is None and segment["pauses"] == [] for segment in session.segments)
+
+def test_csv_and_binary_logs_analyze_the_same(tmp_path):
+    session = generate_session(5000, seed=4)
+    binary_error, binary_result = analyze_generated(tmp_path, session, "binary")
+    csv_error, csv_result = analyze_generated(tmp_path, session, "csv")
+
+    assert binary_error == csv_error == {"message": "Data points are valid!"}
+    assert binary_result == csv_result
+
+def test_analysis_finds_generated_segments(tmp_path):
+    session = generate_session(30000, seed=5)
+    _, movement_data = analyze_generated(tmp_path, session)
+    score = score_detection(session.segments, movement_data["analysis_result"])
+
+    assert score["detected"] == score["segments"] > 0
+    assert score["overshoot_true_positive"] > 0
+    assert score["overshoot_false_positive"] == score["overshoot_false_negative"] == 0
+
+def test_score_detection_counts_mistakes():
+    segments = [{"start_index": 0, "end_index": 50, "overshoot_index": 40},
+                {"start_index": 60, "end_index": 120, "overshoot_index": None},
+                {"start_index": 130, "end_index": 200, "overshoot_index": None}]
+    analysis_result = [{"start_index": 5, "end_index": 51, "OS_distance": None},
+                       {"start_index": 60, "end_index": 120, "OS_distance": 12.0}]
+
+    assert score_detection(segments, analysis_result) == {
+        "segments": 3, "detected": 2, "overshoot_true_positive": 0, "overshoot_false_positive": 1,
+        "overshoot_false_negative": 1, "start_index_error": 2.5
+    }
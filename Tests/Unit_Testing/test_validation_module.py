@@ -0,0 +1,90 @@
+from Backend.validation_module import (
+    StreamingValidator, ValidationError,
+    INSUFFICIENT_DATA_ERROR, TIMESTAMP_ERROR, POSITION_ERROR, ABRUPT_MOVEMENT_ERROR, NO_MOVEMENT_ERROR, RESTLESS_MOVEMENT_ERROR
+)
+import numpy as np
+import pytest
+
+def columns(timestamps, x, y):
+    return np.array(timestamps, dtype=np.int64), np.array(x, dtype=np.int64), np.array(y, dtype=np.int64)
+
+def feed_in_chunks(validator, timestamps, x, y, chunk_size):
+    for start in range(0, len(timestamps), chunk_size):
+        validator.feed(*columns(timestamps[start:start + chunk_size], x[start:start + chunk_size], y[start:start + chunk_size]))
+
+def natural_session(count=200):
+    # Moves right one pixel at a time and pauses on every fifth sample
+    timestamps = [i * 10_000_000 for i in range(count)]
+    x = [100 + i - i // 5 for i in range(count)]
+    y = [100] * count
+    return timestamps, x, y
+
+
+def test_valid_session_summary():
+    validator = StreamingValidator(1920, 1080)
+    timestamps, x, y = natural_session()
+    feed_in_chunks(validator, timestamps, x, y, 64)
+    summary = validator.finish()
+
+    assert summary["sample_count"] == 200
+    assert summary["bounding_box"] == {"min_x": 100, "max_x": max(x), "min_y": 100, "max_y": 100}
+    assert summary["first_timestamp"] == 0
+    assert summary["last_timestamp"] == 199 * 10_000_000
+    assert summary["moved"] and summary["paused"]
+    assert summary["max_jump"] == 1.0
+
+def test_timestamp_order_across_chunks():
+    validator = StreamingValidator(1920, 1080)
+    validator.feed(*columns([0, 10, 20], [1, 2, 3], [1, 1, 1]))
+    with pytest.raises(ValidationError, match="timestamp"):
+        validator.feed(*columns([15, 30], [4, 5], [1, 1]))
+
+def test_abrupt_movement_across_chunks():
+    validator = StreamingValidator(1920, 1080)
+    validator.feed(*columns([0, 10], [10, 10], [10, 10]))
+    with pytest.raises(ValidationError) as error:
+        validator.feed(*columns([20, 30], [600, 600], [10, 10]))
+    assert str(error.value) == ABRUPT_MOVEMENT_ERROR
+
+def test_out_of_screen():
+    validator = StreamingValidator(1920, 1080)
+    with pytest.raises(ValidationError) as error:
+        validator.feed(*columns([0, 10], [10, 1920], [10, 10]))
+    assert str(error.value) == POSITION_ERROR
+
+def test_first_violation_stops_validation():
+    validator = StreamingValidator(1920, 1080)
+    with pytest.raises(ValidationError):
+        validator.feed(*columns([0, 10], [10, 900], [10, 10]))
+    # The failing chunk is not counted
+    assert validator.sample_count == 0
+
+@pytest.mark.parametrize("x, expected", [
+    ([100] * 200, NO_MOVEMENT_ERROR),
+    ([100 + i for i in range(200)], RESTLESS_MOVEMENT_ERROR),
+    ([100 + i for i in range(50)], INSUFFICIENT_DATA_ERROR),
+])
+def test_finish_errors(x, expected):
+    validator = StreamingValidator(1920, 1080)
+    validator.feed(*columns([i * 10 for i in range(len(x))], x, [100] * len(x)))
+    with pytest.raises(ValidationError) as error:
+        validator.finish()
+    assert str(error.value) == expected
+
+def test_parse_rows():
+    validator = StreamingValidator(1920, 1080)
+    timestamps, x, y, clicked = validator.parse_rows([["1000", "1", "2", "0"], ["2000", "3", "4", "1"], ["3000", "5", "6", "x"]])
+    assert timestamps.tolist() == [1000, 2000, 3000]
+    assert x.tolist() == [1, 3, 5]
+    assert y.tolist() == [2, 4, 6]
+    assert clicked.tolist() == [0, 1, 0]
+
+@pytest.mark.parametrize("row, expected", [
+    (["soon", "1", "2", "0"], TIMESTAMP_ERROR),
+    (["1000", "", "2", "0"], POSITION_ERROR),
+])
+def test_parse_invalid_rows(row, expected):
+    validator = StreamingValidator(1920, 1080)
+    with pytest.raises(ValidationError) as error:
+        validator.parse_rows([row])
+    assert str(error.value) == expected
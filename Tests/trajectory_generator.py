@@ -0,0 +1,233 @@
+"""
+Seeded generator of realistic cursor sessions, for load and accuracy testing.
+
+A session is a sequence of aiming movements towards random targets. Each
+movement follows a minimum-jerk position profile whose duration follows
+Fitts' law, may overshoot the target and correct back, may stop halfway
+for a pause, and ends with a short dwell and a click on the target. Idle
+periods are mixed in between movements.
+
+Next to the samples, the ground truth of every movement is returned, so the
+analysis can be scored against it with score_detection().
+"""
+import math
+from collections import namedtuple
+import numpy as np
+
+from Backend.session_log import SessionLogHeader, FORMAT_VERSION, write_binary_log, write_csv_log
+
+GeneratedSession = namedtuple("GeneratedSession", ["timestamps", "xs", "ys", "clicked", "segments", "sample_rate"])
+
+DEFAULT_SAMPLE_RATE = 125               # Hz
+MAX_STEP = 300                          # Largest step between two samples; the validator rejects jumps over 500 pixels
+MIN_TARGET_DISTANCE = 150               # Targets closer than this are not an aiming movement
+FITTS_A = 0.1                           # Fitts' law: movement time = FITTS_A + FITTS_B * log2(distance / target width + 1)
+FITTS_B = 0.15
+
+
+def minimum_jerk(start: tuple, end: tuple, sample_count: int):
+    # Positions of the samples after start, ending exactly on end
+    tau = np.arange(1, sample_count + 1) / sample_count
+    progress = 10 * tau**3 - 15 * tau**4 + 6 * tau**5
+    return start[0] + (end[0] - start[0]) * progress, start[1] + (end[1] - start[1]) * progress
+
+
+class _SessionBuilder:
+    def __init__(self, rng, sample_rate: int, screen_width: int, screen_height: int, jitter: float) -> None:
+        self.rng = rng
+        self.sample_rate = sample_rate
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.jitter = jitter
+        self.position = (screen_width // 2, screen_height // 2)
+        self.xs = []
+        self.ys = []
+        self.clicks = []                    # Indices of the clicked samples
+        self.arrival_index = None           # First sample on the target of the last movement
+        self.count = 0
+
+    def samples_for(self, seconds: float) -> int:
+        return max(int(round(seconds * self.sample_rate)), 1)
+
+    def clamp(self, x: float, y: float) -> tuple:
+        return (int(min(max(round(x), 0), self.screen_width - 1)), int(min(max(round(y), 0), self.screen_height - 1)))
+
+    def stay(self, sample_count: int) -> None:
+        self.xs.append(np.full(sample_count, self.position[0], dtype=np.int64))
+        self.ys.append(np.full(sample_count, self.position[1], dtype=np.int64))
+        self.count += sample_count
+
+    def move(self, target: tuple, seconds: float) -> None:
+        distance = math.dist(self.position, target)
+        # The peak speed of a minimum-jerk movement is 1.875 times its average speed
+        sample_count = max(self.samples_for(seconds), math.ceil(1.875 * distance / MAX_STEP) + 1, 2)
+        xs, ys = minimum_jerk(self.position, target, sample_count)
+
+        # Hand tremor on the way; the movement still ends exactly on the target
+        if self.jitter > 0:
+            xs[:-1] += self.rng.normal(0, self.jitter, sample_count - 1)
+            ys[:-1] += self.rng.normal(0, self.jitter, sample_count - 1)
+
+        xs = np.clip(np.rint(xs), 0, self.screen_width - 1).astype(np.int64)
+        ys = np.clip(np.rint(ys), 0, self.screen_height - 1).astype(np.int64)
+        self.xs.append(xs)
+        self.ys.append(ys)
+
+        # The slow end of the movement can round onto the target a few samples early
+        on_target = (xs == target[0]) & (ys == target[1])
+        arrival = sample_count - 1
+        while arrival > 0 and on_target[arrival - 1]:
+            arrival -= 1
+        self.arrival_index = self.count + arrival
+
+        self.count += sample_count
+        self.position = target
+
+    def click(self) -> None:
+        self.clicks.append(self.count - 1)
+
+
+def get_movement_time(distance: float, target_width: float) -> float:
+    return FITTS_A + FITTS_B * math.log2(distance / target_width + 1)
+
+
+def generate_session(sample_count: int, seed: int = 0, sample_rate: int = DEFAULT_SAMPLE_RATE,
+                     screen_width: int = 1920, screen_height: int = 1080, target_width: float = 40,
+                     overshoot_probability: float = 0.3, overshoot_range: tuple = (0.08, 0.2),
+                     pause_probability: float = 0.3, pause_range: tuple = (0.15, 0.4),
+                     idle_probability: float = 0.05, idle_range: tuple = (1.0, 5.0), jitter: float = 0.5) -> GeneratedSession:
+    """
+    Generates a session of exactly sample_count samples.
+
+    Probabilities are per movement; ranges are (low, high) and are drawn from
+    uniformly. Times are in seconds, overshoot_range is a fraction of the
+    movement's distance and jitter is the standard deviation of the tremor in
+    pixels.
+
+    Returns:
+        GeneratedSession: timestamps (int64 nanoseconds since the start), xs, ys
+        and clicked as NumPy arrays, and segments, one dict per complete
+        movement with start_index (last sample before the cursor left),
+        end_index (first sample on the target), click_index, target,
+        overshoot_index (turning point or None) and pauses (list of
+        (start_index, end_index) of the pauses on the way).
+    """
+    rng = np.random.default_rng(seed)
+    builder = _SessionBuilder(rng, sample_rate, screen_width, screen_height, jitter)
+    segments = []
+
+    # Start at rest, so every session has stationary samples
+    builder.stay(builder.samples_for(0.2))
+
+    while builder.count < sample_count:
+        if rng.random() < idle_probability:
+            builder.stay(builder.samples_for(rng.uniform(*idle_range)))
+
+        # A target far enough away to aim for
+        while True:
+            target = builder.clamp(rng.uniform(target_width, screen_width - target_width),
+                                   rng.uniform(target_width, screen_height - target_width))
+            if math.dist(builder.position, target) >= MIN_TARGET_DISTANCE:
+                break
+
+        start = builder.position
+        distance = math.dist(start, target)
+        direction = ((target[0] - start[0]) / distance, (target[1] - start[1]) / distance)
+        segment = {"start_index": builder.count - 1, "end_index": None, "click_index": None, "target": target,
+                   "overshoot_index": None, "pauses": []}
+
+        # Optionally stop on the way, slightly off the straight line
+        if rng.random() < pause_probability:
+            fraction = rng.uniform(0.4, 0.7)
+            offset = rng.normal(0, distance * 0.03)
+            waypoint = builder.clamp(start[0] + direction[0] * distance * fraction - direction[1] * offset,
+                                     start[1] + direction[1] * distance * fraction + direction[0] * offset)
+            builder.move(waypoint, get_movement_time(math.dist(start, waypoint), target_width))
+            pause_start = builder.count - 1
+            builder.stay(builder.samples_for(rng.uniform(*pause_range)))
+            segment["pauses"].append((pause_start, builder.count - 1))
+
+        # Optionally fly past the target and come back
+        if rng.random() < overshoot_probability:
+            overshoot = distance * rng.uniform(*overshoot_range)
+            turning_point = builder.clamp(target[0] + direction[0] * overshoot, target[1] + direction[1] * overshoot)
+            builder.move(turning_point, get_movement_time(math.dist(builder.position, turning_point), target_width))
+            segment["overshoot_index"] = builder.count - 1
+            builder.move(target, get_movement_time(math.dist(turning_point, target), target_width))
+        else:
+            builder.move(target, get_movement_time(math.dist(builder.position, target), target_width))
+        segment["end_index"] = builder.arrival_index
+
+        # Dwell on the target and click
+        builder.stay(builder.samples_for(rng.uniform(0.1, 0.3)))
+        builder.click()
+        segment["click_index"] = builder.count - 1
+        segments.append(segment)
+
+    timestamps = np.rint(np.arange(sample_count) * (1e9 / sample_rate)).astype(np.int64)
+    clicked = np.zeros(sample_count, dtype=np.int8)
+    clicks = np.array(builder.clicks, dtype=np.int64)
+    clicked[clicks[clicks < sample_count]] = 1
+
+    # Movements cut off at the end of the session are not part of the ground truth
+    segments = [segment for segment in segments if segment["click_index"] < sample_count]
+    return GeneratedSession(timestamps, np.concatenate(builder.xs)[:sample_count], np.concatenate(builder.ys)[:sample_count],
+                            clicked, segments, sample_rate)
+
+
+def write_session(session: GeneratedSession, log_file: str, log_format: str = "csv", profile_id: int = 1,
+                  screen_width: int = 1920, screen_height: int = 1080, anchor_ns: int = 1_700_000_000_000_000_000) -> int:
+    """
+    Writes a generated session as a CSV log (anchor_ns + offset timestamps) or a
+    binary log (offsets, with anchor_ns in the header).
+
+    Returns:
+        int: Number of written samples.
+    """
+    if log_format == "binary":
+        header = SessionLogHeader(FORMAT_VERSION, screen_width, screen_height, session.sample_rate, profile_id, anchor_ns)
+        return write_binary_log(log_file, header, session.timestamps, session.xs, session.ys, session.clicked)
+    return write_csv_log(log_file, session.timestamps + anchor_ns, session.xs, session.ys, session.clicked)
+
+
+def score_detection(segments: list[dict], analysis_result: list[dict], tolerance: int = 2) -> dict:
+    """
+    Scores the segments found by the analysis against the ground truth.
+
+    An analyzed segment matches a generated one when their end indices are at
+    most tolerance samples apart.
+
+    Returns:
+        dict: segments and detected (matched) counts, overshoot true positives,
+        false positives and false negatives over the matched segments, and the
+        mean absolute error of the matched start indices (None without matches).
+    """
+    analyzed_by_end = {segment["end_index"]: segment for segment in analysis_result}
+    score = {"segments": len(segments), "detected": 0, "overshoot_true_positive": 0, "overshoot_false_positive": 0,
+             "overshoot_false_negative": 0, "start_index_error": None}
+    start_errors = []
+
+    for truth in segments:
+        analyzed = None
+        for end_index in range(truth["end_index"] - tolerance, truth["end_index"] + tolerance + 1):
+            if end_index in analyzed_by_end:
+                analyzed = analyzed_by_end[end_index]
+                break
+        if analyzed is None:
+            continue
+
+        score["detected"] += 1
+        start_errors.append(abs(analyzed["start_index"] - truth["start_index"]))
+
+        detected_overshoot = analyzed["OS_distance"] is not None
+        has_overshoot = truth["overshoot_index"] is not None
+        if detected_overshoot and has_overshoot:
+            score["overshoot_true_positive"] += 1
+        elif detected_overshoot:
+            score["overshoot_false_positive"] += 1
+        elif has_overshoot:
+            score["overshoot_false_negative"] += 1
+
+    if start_errors:
+        score["start_index_error"] = sum(start_errors) / len(start_errors)
+    return score